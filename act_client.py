@@ -8,6 +8,7 @@ import subprocess
 from typing import Optional  # 添加新导入
 
 # 导入唤醒词检测相关模块
+from src.audio_processing.vosk_model_cache import preload_wake_word_model
 from src.audio_processing.wake_word_detect import WakeWordDetector
 from src.utils.config_manager import ConfigManager  # 添加配置管理
 
@@ -234,6 +235,8 @@ async def main(args=None):
     try:
         # 配置唤醒词参数
         config_manager.update_config("WAKE_WORD_OPTIONS", WAKE_CONFIG)
+        # 唤醒词模型在后台加载，与音频初始化并行
+        preload_wake_word_model()
         
         logger.info("正在初始化音频编解码器...")
         await audio_codec.initialize()
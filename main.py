@@ -4,6 +4,7 @@ import sys
 import time
 
 from src.application import Application
+from src.audio_processing.vosk_model_cache import preload_wake_word_model
 from src.utils.logging_config import get_logger, setup_logging
 
 logger = get_logger(__name__)
@@ -174,6 +175,9 @@ async def main():
 
     logger.info("启动小智AI客户端")
 
+    # 唤醒词模型在后台线程加载，与激活和组件初始化并行
+    preload_wake_word_model()
+
     # 处理激活流程
     if not args.skip_activation:
         activation_success = await handle_activation(args.mode)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+回声消除工具.
+
+calibrate: 播放探测扫频并同时录音，按与运行时相同的方式（录音流和播放流各自独立，
+    以回调时间对齐）估计回声路径延迟，可保存为当前设备组合的初始延迟.
+benchmark: 不需要声卡，把远端（播放）WAV和近端（麦克风）WAV按时间对齐送入WebRTCProcessor，
+    对比多个预设的回声损耗增强（ERLE）、残余回声能量和每10ms帧的CPU耗时.
+    近端录音最好只含回声（无人说话），否则ERLE会把近端语音也算作残余回声.
+
+用法:
+    python scripts/aec_tool.py calibrate
+    python scripts/aec_tool.py calibrate --input 1 --output 3 --repeats 5 --save
+    python scripts/aec_tool.py benchmark far.wav near.wav
+    python scripts/aec_tool.py benchmark far.wav near.wav --presets aec mobile \
+        --delay-ms 120 --save-audio out/
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_processing.delay_estimator import (  # noqa: E402
+    EchoDelayEstimator,
+    device_delay_key,
+    estimate_delay,
+)
+from src.constants.constants import AudioConfig  # noqa: E402
+
+SAMPLE_RATE = AudioConfig.INPUT_SAMPLE_RATE
+# APM子帧长度（10ms）
+SUBFRAME = SAMPLE_RATE // 100
+# 远端能量超过该值（dBFS）的子帧视为有回声，参与ERLE统计
+ECHO_ACTIVE_DB = -50.0
+
+
+def _ns_high(config):
+    config.NoiseSuppress.NoiseLevel = 2  # NoiseSuppressionLevel.High
+
+
+def _mobile_mode(config):
+    config.Echo.MobileMode = True
+
+
+# 基准预设：WebRTCProcessor参数，tweak在创建后修改APM配置
+PRESETS = {
+    "aec": {"noise_suppression": False, "gain_control": False},
+    "aec_ns": {"noise_suppression": True, "gain_control": False},
+    "default": {"noise_suppression": True, "gain_control": True},
+    "ns_high": {"noise_suppression": True, "gain_control": False, "tweak": _ns_high},
+    "mobile": {
+        "noise_suppression": True,
+        "gain_control": False,
+        "tweak": _mobile_mode,
+    },
+}
+
+
+def make_chirp(rate: int, duration: float, level_db: float = -12.0) -> np.ndarray:
+    """
+    生成200Hz-6kHz对数扫频（首尾10ms淡入淡出）.
+    """
+    t = np.arange(int(rate * duration)) / rate
+    f0, f1 = 200.0, 6000.0
+    k = np.log(f1 / f0)
+    phase = 2 * np.pi * f0 * duration / k * (np.exp(t * k / duration) - 1)
+    chirp = np.sin(phase) * 32767 * 10 ** (level_db / 20)
+    fade = int(rate * 0.01)
+    ramp = np.linspace(0.0, 1.0, fade)
+    chirp[:fade] *= ramp
+    chirp[-fade:] *= ramp[::-1]
+    return chirp.astype(np.int16)
+
+
+def play_and_record(probe: np.ndarray, input_device, output_device, tail: float):
+    """播放探测信号并录音，流参数与AudioCodec一致.
+
+    Returns:
+        (播放样本, 播放流首次回调时间, 录音样本, 录音流首次回调时间, 录音采样率)
+    """
+    import sounddevice as sd
+
+    input_rate = int(sd.query_devices(input_device, "input")["default_samplerate"])
+    rendered, captured = [], []
+    first = {}
+    position = [0]
+    done = threading.Event()
+    total = len(probe) + int(AudioConfig.OUTPUT_SAMPLE_RATE * tail)
+
+    def output_callback(outdata, frames, time_info, status):
+        first.setdefault("render", time.monotonic())
+        start = position[0]
+        block = probe[start : start + frames]
+        outdata[: len(block), 0] = block
+        outdata[len(block) :, 0] = 0
+        rendered.append(outdata[:, 0].copy())
+        position[0] = start + frames
+        if position[0] >= total:
+            done.set()
+
+    def input_callback(indata, frames, time_info, status):
+        first.setdefault("capture", time.monotonic())
+        captured.append(indata[:, 0].copy())
+
+    input_stream = sd.InputStream(
+        device=input_device,
+        samplerate=input_rate,
+        channels=1,
+        dtype=np.int16,
+        blocksize=int(input_rate * AudioConfig.FRAME_DURATION / 1000),
+        callback=input_callback,
+        latency="low",
+    )
+    output_stream = sd.OutputStream(
+        device=output_device,
+        samplerate=AudioConfig.OUTPUT_SAMPLE_RATE,
+        channels=1,
+        dtype=np.int16,
+        blocksize=AudioConfig.OUTPUT_FRAME_SIZE,
+        callback=output_callback,
+        latency="low",
+    )
+    with input_stream, output_stream:
+        done.wait(total / AudioConfig.OUTPUT_SAMPLE_RATE + 5)
+
+    return (
+        np.concatenate(rendered),
+        first["render"],
+        np.concatenate(captured),
+        first["capture"],
+        input_rate,
+    )
+
+
+def align_streams(reference, reference_start, capture, capture_start):
+    """
+    按两个流首次回调的时间对齐到同一时间轴（与运行时处理线程同时读取两者等效）.
+    """
+    offset = int(round((capture_start - reference_start) * SAMPLE_RATE))
+    if offset > 0:
+        capture = np.concatenate([np.zeros(offset, dtype=capture.dtype), capture])
+    elif offset < 0:
+        reference = np.concatenate(
+            [np.zeros(-offset, dtype=reference.dtype), reference]
+        )
+    length = min(len(reference), len(capture))
+    return reference[:length], capture[:length]
+
+
+def calibrate(args):
+    """
+    播放扫频测量回声路径延迟.
+    """
+    import sounddevice as sd
+    import soxr
+
+    input_device = args.input if args.input is not None else sd.default.device[0]
+    output_device = args.output if args.output is not None else sd.default.device[1]
+    input_name = sd.query_devices(input_device, "input")["name"]
+    output_name = sd.query_devices(output_device, "output")["name"]
+    print(f"录音设备: {input_name}")
+    print(f"播放设备: {output_name}")
+
+    # 前导静音 + (扫频 + 间隔) * 重复次数
+    render_rate = AudioConfig.OUTPUT_SAMPLE_RATE
+    chirp = make_chirp(render_rate, args.chirp_ms / 1000, args.level_db)
+    gap = np.zeros(int(render_rate * args.gap_ms / 1000), dtype=np.int16)
+    lead = np.zeros(int(render_rate * 0.5), dtype=np.int16)
+    probe = np.concatenate([lead] + [chirp, gap] * args.repeats)
+
+    print(f"播放探测信号 {len(probe) / render_rate:.1f}s，请保持安静...")
+    rendered, render_start, captured, capture_start, input_rate = play_and_record(
+        probe, input_device, output_device, tail=args.max_delay_ms / 1000
+    )
+    reference = soxr.resample(rendered, render_rate, SAMPLE_RATE, quality="HQ")
+    capture = soxr.resample(captured, input_rate, SAMPLE_RATE, quality="HQ")
+    reference, capture = align_streams(
+        reference.astype(np.float32),
+        render_start,
+        capture.astype(np.float32),
+        capture_start,
+    )
+
+    # 每次扫频单独估计：录音窗口覆盖扫频及其最大延迟后的回声
+    max_lag = int(SAMPLE_RATE * args.max_delay_ms / 1000)
+    chirp_len = int(SAMPLE_RATE * args.chirp_ms / 1000)
+    period = int(SAMPLE_RATE * (args.chirp_ms + args.gap_ms) / 1000)
+    window = chirp_len + max_lag
+    delays = []
+    for index in range(args.repeats):
+        end = int(SAMPLE_RATE * 0.5) + index * period + window
+        if end > len(capture):
+            break
+        lag, confidence = estimate_delay(
+            reference[end - window - max_lag : end],
+            capture[end - window : end],
+            max_lag,
+        )
+        delay_ms = lag * 1000 / SAMPLE_RATE
+        accepted = confidence >= EchoDelayEstimator.MIN_CONFIDENCE
+        print(
+            f"  第{index + 1}次: {delay_ms:6.1f}ms  置信度 {confidence:5.1f}"
+            f"{'' if accepted else '  (丢弃)'}"
+        )
+        if accepted:
+            delays.append(delay_ms)
+
+    if len(delays) < 2:
+        print("有效测量不足，请提高音量或靠近麦克风后重试")
+        return 1
+
+    delay_ms = int(round(float(np.median(delays))))
+    spread = max(delays) - min(delays)
+    print(f"回声路径延迟: {delay_ms}ms（{len(delays)}次有效，极差 {spread:.1f}ms）")
+
+    if args.save:
+        from src.utils.config_manager import ConfigManager
+
+        config = ConfigManager.get_instance()
+        delays_by_device = dict(
+            config.get_config("AUDIO_OPTIONS.AEC.DEVICE_DELAYS", {}) or {}
+        )
+        key = device_delay_key(input_name, output_name)
+        delays_by_device[key] = delay_ms
+        saved = config.update_config(
+            "AUDIO_OPTIONS.AEC.DEVICE_DELAYS", delays_by_device
+        )
+        if not saved:
+            print("保存配置失败")
+            return 1
+        print(f"已保存到 AUDIO_OPTIONS.AEC.DEVICE_DELAYS[{key!r}]")
+    return 0
+
+
+def load_wav(path):
+    """
+    读取WAV并转换为16kHz单声道int16.
+    """
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM: {path}")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != SAMPLE_RATE:
+        import soxr
+
+        samples = soxr.resample(samples, rate, SAMPLE_RATE, quality="HQ")
+    return np.ascontiguousarray(samples, dtype=np.int16)
+
+
+def save_wav(path, samples):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(samples.tobytes())
+
+
+def subframe_power(samples):
+    """
+    每个10ms子帧的均方能量.
+    """
+    frames = samples[: len(samples) // SUBFRAME * SUBFRAME].astype(np.float64)
+    return np.mean(np.square(frames.reshape(-1, SUBFRAME)), axis=1)
+
+
+def detect_delay(far, near, fallback_ms: int) -> int:
+    """
+    用运行时的延迟估计器扫描整个文件，估计失败时返回fallback_ms.
+    """
+    estimator = EchoDelayEstimator(SAMPLE_RATE, fallback_ms)
+    chunk = SAMPLE_RATE // 10
+    for start in range(0, min(len(far), len(near)), chunk):
+        estimator.push_render(far[start : start + chunk])
+        estimator.push_capture(near[start : start + chunk])
+        estimator.update()
+    return estimator.delay_ms if estimator.updates else fallback_ms
+
+
+def run_preset(name, preset, far, near, delay_ms, warmup_s):
+    """用一个预设处理整段音频并统计指标.
+
+    Returns:
+        (指标字典, 处理后的音频)，APM不可用时返回(None, None)
+    """
+    from src.audio_processing.webrtc_processing import WebRTCProcessor
+
+    processor = WebRTCProcessor(
+        sample_rate=SAMPLE_RATE,
+        channels=1,
+        frame_size=SUBFRAME,
+        stream_delay_ms=delay_ms,
+        noise_suppression=preset["noise_suppression"],
+        gain_control=preset["gain_control"],
+    )
+    if not processor.initialized:
+        return None, None
+
+    length = min(len(far), len(near)) // SUBFRAME * SUBFRAME
+    output = np.zeros(length, dtype=np.int16)
+    chunk = processor.max_frames * SUBFRAME
+    cpu_per_frame = []
+    try:
+        if "tweak" in preset:
+            preset["tweak"](processor.config)
+            processor.apply_config()
+
+        wall_start = time.perf_counter()
+        for start in range(0, length, chunk):
+            stop = min(start + chunk, length)
+            cpu_start = time.thread_time()
+            processor.process_render(far[start:stop])
+            processor.process_capture(near[start:stop], out=output[start:stop])
+            frames = (stop - start) // SUBFRAME
+            cpu_per_frame.append((time.thread_time() - cpu_start) / frames)
+        wall = time.perf_counter() - wall_start
+    finally:
+        processor.close()
+
+    # 远端信号按延迟平移后确定有回声的子帧，跳过收敛期
+    far_power = subframe_power(far[:length])
+    near_power = subframe_power(near[:length])
+    out_power = subframe_power(output)
+    shift = int(round(delay_ms / 10))
+    echo_active = np.zeros(len(far_power), dtype=bool)
+    active = far_power >= (32768.0 * 10 ** (ECHO_ACTIVE_DB / 20)) ** 2
+    echo_active[shift:] = active[: len(active) - shift]
+    echo_active[: int(warmup_s * 100)] = False
+
+    cpu_us = np.array(cpu_per_frame) * 1e6
+    metrics = {
+        "preset": name,
+        "echo_frames": int(echo_active.sum()),
+        "erle_db": None,
+        "echo_level_dbfs": None,
+        "residual_echo_dbfs": None,
+        "cpu_us_per_frame_mean": round(float(cpu_us.mean()), 1),
+        "cpu_us_per_frame_p95": round(float(np.percentile(cpu_us, 95)), 1),
+        "realtime_factor": round(length / SAMPLE_RATE / wall, 1) if wall else None,
+    }
+    if echo_active.any():
+        echo = float(near_power[echo_active].mean())
+        residual = float(out_power[echo_active].mean())
+        full_scale = 32768.0**2
+        metrics["echo_level_dbfs"] = round(10 * np.log10(echo / full_scale + 1e-12), 1)
+        metrics["residual_echo_dbfs"] = round(
+            10 * np.log10(residual / full_scale + 1e-12), 1
+        )
+        metrics["erle_db"] = round(10 * np.log10((echo + 1e-9) / (residual + 1e-9)), 1)
+    return metrics, output
+
+
+def benchmark(args):
+    """
+    离线对比多个预设的回声消除效果和CPU耗时.
+    """
+    far = load_wav(args.far)
+    near = load_wav(args.near)
+    duration = min(len(far), len(near)) / SAMPLE_RATE
+    print(f"远端 {len(far) / SAMPLE_RATE:.1f}s，近端 {len(near) / SAMPLE_RATE:.1f}s")
+
+    delay_ms = args.delay_ms
+    if delay_ms is None:
+        delay_ms = detect_delay(far, near, fallback_ms=50)
+        print(f"估计回声路径延迟: {delay_ms}ms")
+
+    if args.save_audio:
+        args.save_audio.mkdir(parents=True, exist_ok=True)
+
+    runs = []
+    for name in args.presets:
+        metrics, output = run_preset(
+            name, PRESETS[name], far, near, delay_ms, args.warmup_s
+        )
+        if metrics is None:
+            print("WebRTC APM不可用，请检查libs/webrtc_apm下对应平台的动态库")
+            return 1
+        runs.append(metrics)
+        print(
+            f"{name:>8}: ERLE {metrics['erle_db']}dB, "
+            f"残余回声 {metrics['residual_echo_dbfs']}dBFS "
+            f"（输入 {metrics['echo_level_dbfs']}dBFS）, "
+            f"CPU {metrics['cpu_us_per_frame_mean']}us/帧 "
+            f"(p95 {metrics['cpu_us_per_frame_p95']}us), "
+            f"{metrics['realtime_factor']}x实时"
+        )
+        if args.save_audio:
+            save_wav(args.save_audio / f"{name}.wav", output)
+
+    output = args.output
+    if output is None:
+        log_dir = project_root / "logs"
+        log_dir.mkdir(exist_ok=True)
+        output = log_dir / time.strftime("aec_benchmark_%Y%m%d_%H%M%S.json")
+    report = {
+        "far": str(args.far),
+        "near": str(args.near),
+        "duration_s": round(duration, 2),
+        "stream_delay_ms": delay_ms,
+        "warmup_s": args.warmup_s,
+        "runs": runs,
+    }
+    output.write_text(
+        json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"报告已写入: {output}")
+    return 0
+
+
+def main():
+    """
+    主函数.
+    """
+    parser = argparse.ArgumentParser(description="回声消除工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = subparsers.add_parser("calibrate", help="测量设备的回声路径延迟")
+    calibrate_parser.add_argument("--input", type=int, help="录音设备编号，默认系统设备")
+    calibrate_parser.add_argument("--output", type=int, help="播放设备编号，默认系统设备")
+    calibrate_parser.add_argument("--repeats", type=int, default=3, help="扫频次数")
+    calibrate_parser.add_argument(
+        "--chirp-ms", type=int, default=500, help="每次扫频时长（毫秒）"
+    )
+    calibrate_parser.add_argument(
+        "--gap-ms", type=int, default=700, help="两次扫频之间的间隔（毫秒）"
+    )
+    calibrate_parser.add_argument(
+        "--level-db", type=float, default=-12.0, help="扫频电平（dBFS）"
+    )
+    calibrate_parser.add_argument(
+        "--max-delay-ms", type=int, default=500, help="搜索的最大延迟（毫秒）"
+    )
+    calibrate_parser.add_argument(
+        "--save", action="store_true", help="保存为当前设备组合的初始延迟"
+    )
+    calibrate_parser.set_defaults(handler=calibrate)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="离线回声消除基准")
+    benchmark_parser.add_argument("far", type=Path, help="远端（播放）WAV")
+    benchmark_parser.add_argument("near", type=Path, help="近端（麦克风）WAV")
+    benchmark_parser.add_argument(
+        "--presets",
+        nargs="+",
+        choices=list(PRESETS),
+        default=list(PRESETS),
+        help="要对比的预设",
+    )
+    benchmark_parser.add_argument(
+        "--delay-ms", type=int, help="回声路径延迟（毫秒），默认从音频估计"
+    )
+    benchmark_parser.add_argument(
+        "--warmup-s", type=float, default=2.0, help="不计入ERLE的收敛时间（秒）"
+    )
+    benchmark_parser.add_argument(
+        "--save-audio", type=Path, help="保存各预设处理后音频的目录"
+    )
+    benchmark_parser.add_argument(
+        "--output", type=Path, help="JSON报告路径，默认写入logs目录"
+    )
+    benchmark_parser.set_defaults(handler=benchmark)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
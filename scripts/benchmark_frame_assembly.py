@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+输入帧组装微基准 对比逐样本deque组帧与FrameAssembler切片组帧的单次回调耗时.
+
+用法:
+    python scripts/benchmark_frame_assembly.py
+    python scripts/benchmark_frame_assembly.py --rates 44100 48000 --seconds 30
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.frame_assembler import FrameAssembler  # noqa: E402
+
+TARGET_RATE = 16000
+
+
+def make_resampled_chunks(device_rate: int, frame_ms: int, seconds: float):
+    """
+    生成每次回调的重采样输出，优先使用soxr得到真实的块长度分布.
+    """
+    block = int(device_rate * frame_ms / 1000)
+    callbacks = int(seconds * 1000 / frame_ms)
+    rng = np.random.default_rng(0)
+    source = rng.integers(-3000, 3000, block * callbacks, dtype=np.int16)
+
+    try:
+        import soxr
+
+        resampler = soxr.ResampleStream(
+            device_rate, TARGET_RATE, 1, dtype="int16", quality="QQ"
+        )
+        return [
+            resampler.resample_chunk(source[i * block : (i + 1) * block], last=False)
+            for i in range(callbacks)
+        ]
+    except ImportError:
+        # 没有soxr时按比例模拟块长度，误差累积到下一块
+        chunks, carry = [], 0.0
+        for i in range(callbacks):
+            exact = block * TARGET_RATE / device_rate + carry
+            size = int(exact)
+            carry = exact - size
+            chunks.append(source[i * block : i * block + size])
+        return chunks
+
+
+def legacy_assembly(chunks, frame_size):
+    """
+    原实现：逐样本放入deque，再逐个popleft组成一帧.
+    """
+    buffer = deque()
+    timings = []
+    frames = 0
+    for chunk in chunks:
+        start = time.perf_counter()
+        buffer.extend(chunk.astype(np.int16))
+        if len(buffer) >= frame_size:
+            frame_data = []
+            for _ in range(frame_size):
+                frame_data.append(buffer.popleft())
+            np.array(frame_data, dtype=np.int16)
+            frames += 1
+        timings.append(time.perf_counter() - start)
+    return timings, frames
+
+
+def vectorized_assembly(chunks, frame_size):
+    """
+    新实现：连续numpy累加区 + 切片取帧.
+    """
+    assembler = FrameAssembler(frame_size)
+    timings = []
+    frames = 0
+    for chunk in chunks:
+        start = time.perf_counter()
+        frames += len(assembler.push(chunk))
+        timings.append(time.perf_counter() - start)
+    return timings, frames
+
+
+def summarize(timings):
+    """
+    统计单次回调耗时（微秒）.
+    """
+    values = np.asarray(timings) * 1e6
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def main():
+    """
+    主函数.
+    """
+    parser = argparse.ArgumentParser(description="输入帧组装微基准")
+    parser.add_argument(
+        "--rates",
+        type=int,
+        nargs="+",
+        default=[44100, 48000],
+        help="设备输入采样率列表",
+    )
+    parser.add_argument(
+        "--frame-ms", type=int, default=60, help="帧长（毫秒），与FRAME_DURATION一致"
+    )
+    parser.add_argument("--seconds", type=float, default=60.0, help="模拟音频时长")
+    args = parser.parse_args()
+
+    frame_size = int(TARGET_RATE * args.frame_ms / 1000)
+    print(
+        f"帧长 {args.frame_ms}ms ({frame_size} 样本 @16kHz)，"
+        f"模拟 {args.seconds}s 音频"
+    )
+    print(
+        f"{'设备采样率':>10} {'实现':>8} {'帧数':>6} {'均值us':>9} "
+        f"{'p50us':>9} {'p99us':>9} {'最大us':>9}"
+    )
+
+    for rate in args.rates:
+        chunks = make_resampled_chunks(rate, args.frame_ms, args.seconds)
+        results = {
+            "deque": legacy_assembly(chunks, frame_size),
+            "numpy": vectorized_assembly(chunks, frame_size),
+        }
+        for name, (timings, frames) in results.items():
+            s = summarize(timings)
+            print(
+                f"{rate:>10} {name:>8} {frames:>6} {s['mean']:>9.1f} "
+                f"{s['p50']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}"
+            )
+
+        speedup = summarize(results["deque"][0])["mean"] / max(
+            summarize(results["numpy"][0])["mean"], 1e-9
+        )
+        print(f"{rate:>10} 加速比: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+唤醒词准确率与延迟基准 将标注好的WAV语料逐帧送入WakeWordDetector，统计检出率、误唤醒和CPU占用.
+
+语料目录结构:
+    corpus/
+        labels.json          # 正样本标注，未列出的WAV均视为负样本
+        positive/xxx.wav
+        negative/yyy.wav
+
+labels.json格式（时间单位为秒，start可省略）:
+    {
+        "positive/xxx.wav": {"wake_word": "你好小智", "start": 0.8, "end": 1.9},
+        "negative/yyy.wav": null
+    }
+
+用法:
+    python scripts/benchmark_wake_word.py corpus/
+    python scripts/benchmark_wake_word.py corpus/ --threshold 0.8 0.85 0.9 \
+        --max-edit-distance 0 1 2
+    python scripts/benchmark_wake_word.py corpus/ --speed 1.0 --output report.json
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_processing.wake_word_detect import WakeWordDetector  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+from src.utils.config_manager import ConfigManager  # noqa: E402
+
+SAMPLE_RATE = AudioConfig.INPUT_SAMPLE_RATE
+FRAME_SIZE = AudioConfig.INPUT_FRAME_SIZE
+
+
+class OverrideConfig:
+    """
+    在ConfigManager之上覆盖部分配置项，不修改配置文件.
+    """
+
+    def __init__(self, overrides):
+        self.base = ConfigManager.get_instance()
+        self.overrides = overrides
+
+    def get_config(self, path, default=None):
+        if path in self.overrides:
+            return self.overrides[path]
+        return self.base.get_config(path, default)
+
+
+class BenchmarkDetector(WakeWordDetector):
+    """
+    不启动识别线程，由基准程序直接送帧，并记录检测结果.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.detections = []
+        # 当前文件第0秒对应的time.monotonic()时间
+        self.origin = 0.0
+
+    def _emit_detection(self, wake_word, text, captured_at):
+        self.detections.append(
+            {
+                "wake_word": wake_word,
+                "text": text,
+                "time": round(captured_at - self.origin, 3),
+            }
+        )
+
+    def reset_stream(self):
+        """
+        开始新文件前清空识别器和门控状态.
+        """
+        self.recognizer.Reset()
+        if self._speech_gate:
+            self._speech_gate.reset()
+        self._recent_texts.clear()
+        self.last_detection_time = float("-inf")
+        self.detections = []
+        self.origin = time.monotonic()
+
+
+def load_wav(path):
+    """
+    读取WAV并转换为16kHz单声道int16.
+    """
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM: {path}")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != SAMPLE_RATE:
+        import soxr
+
+        samples = soxr.resample(samples, rate, SAMPLE_RATE, quality="HQ")
+    return np.ascontiguousarray(samples, dtype=np.int16)
+
+
+def load_corpus(corpus_dir):
+    """
+    扫描语料目录，返回[(相对路径, 标注或None)].
+    """
+    labels_path = corpus_dir / "labels.json"
+    labels = {}
+    if labels_path.exists():
+        labels = json.loads(labels_path.read_text(encoding="utf-8"))
+
+    items = []
+    for path in sorted(corpus_dir.rglob("*.wav")):
+        rel = path.relative_to(corpus_dir).as_posix()
+        items.append((rel, labels.get(rel)))
+    return items
+
+
+def stream_file(detector, samples, speed, batch_frames):
+    """将一个文件按帧送入检测器.
+
+    Returns:
+        Tuple[float, list]: (音频时长, 检测结果列表，附带处理耗时)
+    """
+    detector.reset_stream()
+    frame_count = len(samples) // FRAME_SIZE
+    frames = samples[: frame_count * FRAME_SIZE].reshape(frame_count, FRAME_SIZE)
+    frame_duration = FRAME_SIZE / SAMPLE_RATE
+
+    # 采集时间按音频位置换算到time.monotonic()，实时送帧时检测滞后统计才有意义
+    origin = detector.origin
+    results = []
+    for start in range(0, frame_count, batch_frames):
+        batch = [
+            (frames[i], origin + (i + 1) * frame_duration)
+            for i in range(start, min(start + batch_frames, frame_count))
+        ]
+        if speed > 0:
+            # 按实时（或指定倍速）节奏送帧
+            due = origin + (batch[-1][1] - origin) / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        before = len(detector.detections)
+        batch_start = time.perf_counter()
+        detector._process_batch(batch)
+        elapsed = time.perf_counter() - batch_start
+        for detection in detector.detections[before:]:
+            detection["processing_ms"] = round(elapsed * 1000, 2)
+            results.append(detection)
+
+    # 语音在文件末尾结束时，取出识别器中剩余的结果
+    before = len(detector.detections)
+    detector._finish_utterance(origin + frame_count * frame_duration)
+    for detection in detector.detections[before:]:
+        detection["processing_ms"] = 0.0
+        results.append(detection)
+    return frame_count * frame_duration, results
+
+
+def evaluate(detector, corpus, corpus_dir, args):
+    """
+    运行一组参数，返回汇总与逐文件结果.
+    """
+    files = []
+    positives = hits = misses = false_accepts = 0
+    negative_seconds = total_seconds = 0.0
+    latencies = []
+
+    cpu_seconds = 0.0
+    for rel, label in corpus:
+        samples = load_wav(corpus_dir / rel)
+        cpu_start = time.process_time()
+        duration, detections = stream_file(
+            detector, samples, args.speed, args.batch_frames
+        )
+        cpu_seconds += time.process_time() - cpu_start
+        total_seconds += duration
+
+        entry = {"file": rel, "duration": round(duration, 2), "detections": detections}
+        if label and label.get("wake_word"):
+            positives += 1
+            start = label.get("start", 0.0)
+            end = label["end"]
+            window_end = end + args.tolerance
+            matched = next(
+                (
+                    d
+                    for d in detections
+                    if d["wake_word"] == label["wake_word"]
+                    and start <= d["time"] <= window_end
+                ),
+                None,
+            )
+            if matched:
+                hits += 1
+                latency = matched["time"] - end + matched["processing_ms"] / 1000
+                latencies.append(latency)
+                entry["latency_ms"] = round(latency * 1000, 1)
+            else:
+                misses += 1
+            extra = [d for d in detections if d is not matched]
+            false_accepts += len(extra)
+            entry.update(
+                {
+                    "label": label,
+                    "hit": matched is not None,
+                    "false_accepts": len(extra),
+                }
+            )
+        else:
+            negative_seconds += duration
+            false_accepts += len(detections)
+            entry.update({"label": None, "false_accepts": len(detections)})
+        files.append(entry)
+
+    audio_hours = max(total_seconds / 3600, 1e-9)
+    negative_hours = negative_seconds / 3600
+    summary = {
+        "files": len(corpus),
+        "audio_seconds": round(total_seconds, 1),
+        "positives": positives,
+        "hits": hits,
+        "misses": misses,
+        "recall": round(hits / positives, 4) if positives else None,
+        "false_accepts": false_accepts,
+        "false_accepts_per_hour": (
+            round(false_accepts / negative_hours, 3) if negative_hours else None
+        ),
+        "cpu_seconds_per_audio_hour": round(cpu_seconds / audio_hours, 1),
+        "detector": detector.get_performance_stats(),
+    }
+    if latencies:
+        values = np.asarray(latencies) * 1000
+        summary["latency_ms"] = {
+            "mean": round(float(values.mean()), 1),
+            "p50": round(float(np.percentile(values, 50)), 1),
+            "p95": round(float(np.percentile(values, 95)), 1),
+            "max": round(float(values.max()), 1),
+        }
+    return summary, files
+
+
+def main():
+    """
+    主函数.
+    """
+    parser = argparse.ArgumentParser(description="唤醒词准确率与延迟基准")
+    parser.add_argument("corpus", type=Path, help="语料目录")
+    parser.add_argument("--model", help="Vosk模型路径，默认使用配置文件中的MODEL_PATH")
+    parser.add_argument("--wake-words", nargs="+", help="唤醒词列表，默认使用配置文件")
+    parser.add_argument(
+        "--threshold", type=float, nargs="+", default=[None], help="相似度阈值（可多个）"
+    )
+    parser.add_argument(
+        "--max-edit-distance",
+        type=int,
+        nargs="+",
+        default=[None],
+        help="最大编辑距离（可多个）",
+    )
+    parser.add_argument(
+        "--mode", choices=["grammar", "open"], help="识别模式，默认使用配置文件"
+    )
+    parser.add_argument(
+        "--no-gate", action="store_true", help="关闭识别前的语音门控"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="送帧速度倍数，1.0为实时，0为不等待（尽可能快）",
+    )
+    parser.add_argument("--batch-frames", type=int, default=1, help="每批送入的帧数")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.5, help="唤醒词结束后允许的检出时间（秒）"
+    )
+    parser.add_argument("--output", type=Path, help="JSON报告路径，默认写入logs目录")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"语料目录中没有WAV文件: {args.corpus}")
+        return 1
+
+    base = {"WAKE_WORD_OPTIONS.USE_WAKE_WORD": True}
+    if args.model:
+        base["WAKE_WORD_OPTIONS.MODEL_PATH"] = args.model
+    if args.wake_words:
+        base["WAKE_WORD_OPTIONS.WAKE_WORDS"] = args.wake_words
+    if args.mode:
+        base["WAKE_WORD_OPTIONS.RECOGNIZER_MODE"] = args.mode
+    if args.no_gate:
+        base["WAKE_WORD_OPTIONS.SPEECH_GATE.ENABLED"] = False
+
+    runs = []
+    for threshold, max_edit in itertools.product(
+        args.threshold, args.max_edit_distance
+    ):
+        overrides = dict(base)
+        if threshold is not None:
+            overrides["WAKE_WORD_OPTIONS.SIMILARITY_THRESHOLD"] = threshold
+        if max_edit is not None:
+            overrides["WAKE_WORD_OPTIONS.MAX_EDIT_DISTANCE"] = max_edit
+
+        detector = BenchmarkDetector(OverrideConfig(overrides))
+        if not detector.enabled or not detector.load_model():
+            print("唤醒词检测器初始化失败，请检查模型路径")
+            return 1
+
+        summary, files = evaluate(detector, corpus, args.corpus, args)
+        params = {
+            "similarity_threshold": detector.similarity_threshold,
+            "max_edit_distance": detector.max_edit_distance,
+            "recognizer_mode": detector.recognizer_mode,
+            "speech_gate": detector._speech_gate is not None,
+        }
+        runs.append({"params": params, "summary": summary, "files": files})
+        print(
+            f"阈值 {params['similarity_threshold']:.2f} "
+            f"编辑距离 {params['max_edit_distance']}: "
+            f"检出 {summary['hits']}/{summary['positives']}, "
+            f"误唤醒 {summary['false_accepts']} "
+            f"({summary['false_accepts_per_hour']}/小时), "
+            f"延迟p50 {summary.get('latency_ms', {}).get('p50')}ms, "
+            f"CPU {summary['cpu_seconds_per_audio_hour']}s/音频小时"
+        )
+
+    output = args.output
+    if output is None:
+        log_dir = project_root / "logs"
+        log_dir.mkdir(exist_ok=True)
+        output = log_dir / time.strftime("wakeword_benchmark_%Y%m%d_%H%M%S.json")
+    report = {
+        "corpus": str(args.corpus),
+        "speed": args.speed,
+        "batch_frames": args.batch_frames,
+        "tolerance": args.tolerance,
+        "runs": runs,
+    }
+    output.write_text(
+        json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"报告已写入: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
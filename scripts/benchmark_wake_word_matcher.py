@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+唤醒词匹配微基准 对比原difflib+逐对编辑距离匹配与预编译PhraseIndex的单条文本耗时.
+
+用法:
+    python scripts/benchmark_wake_word_matcher.py
+    python scripts/benchmark_wake_word_matcher.py --phrases 10 100 500 --texts 300
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pypinyin import Style, lazy_pinyin
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.phrase_index import PhraseIndex  # noqa: E402
+
+VARIANTS = {
+    "standard": Style.NORMAL,
+    "initials": Style.FIRST_LETTER,
+    "tone": Style.TONE,
+    "finals": Style.FINALS,
+}
+
+BASE_WAKE_WORDS = ["你好小明", "你好小智", "你好小天", "小爱同学", "贾维斯"]
+
+CHAR_POOL = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动"
+    "同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自"
+    "二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日"
+)
+
+
+def pinyin_variants(text):
+    """
+    计算文本的四种拼音变体（与WakeWordDetector一致）.
+    """
+    return {
+        name: "".join(lazy_pinyin(text, style=style)).lower()
+        for name, style in VARIANTS.items()
+    }
+
+
+def levenshtein_distance(s1, s2):
+    """
+    原实现的编辑距离.
+    """
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def legacy_similarity(text_variants, pattern, max_edit_distance):
+    """
+    原实现：逐变体计算SequenceMatcher相似度和编辑距离.
+    """
+    max_similarity = 0.0
+    for variant_type in ("standard", "tone", "initials", "finals"):
+        text_variant = text_variants.get(variant_type, "")
+        pattern_variant = pattern.get(variant_type, "")
+        if not text_variant or not pattern_variant:
+            continue
+        if pattern_variant in text_variant:
+            return 1.0
+        similarity = difflib.SequenceMatcher(
+            None, text_variant, pattern_variant
+        ).ratio()
+        if len(pattern_variant) <= 10:
+            distance = levenshtein_distance(text_variant, pattern_variant)
+            allowed = min(max_edit_distance, len(pattern_variant) // 2)
+            if distance <= allowed:
+                similarity = max(similarity, 1.0 - distance / len(pattern_variant))
+        max_similarity = max(max_similarity, similarity)
+    return max_similarity
+
+
+def make_phrases(count, rng):
+    """
+    生成唤醒词/指令短语列表，前几个为默认唤醒词.
+    """
+    phrases = list(BASE_WAKE_WORDS[:count])
+    seen = set(phrases)
+    while len(phrases) < count:
+        phrase = "".join(rng.choice(CHAR_POOL) for _ in range(rng.randint(2, 5)))
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases
+
+
+def make_texts(count, phrases, rng):
+    """
+    生成识别文本：约三分之一包含某个短语（其中一半替换一个字），其余为随机文本.
+    """
+    texts = []
+    for i in range(count):
+        filler = "".join(rng.choice(CHAR_POOL) for _ in range(rng.randint(2, 10)))
+        if i % 3 == 0:
+            phrase = rng.choice(phrases)
+            if i % 6 == 0:
+                pos = rng.randrange(len(phrase))
+                phrase = phrase[:pos] + rng.choice(CHAR_POOL) + phrase[pos + 1 :]
+            cut = rng.randrange(len(filler) + 1)
+            texts.append(filler[:cut] + phrase + filler[cut:])
+        else:
+            texts.append(filler)
+    return texts
+
+
+def run_legacy(patterns, text_variants, threshold, max_edit_distance):
+    timings, hits = [], []
+    for variants in text_variants:
+        start = time.perf_counter()
+        best, best_similarity = None, 0.0
+        for word, pattern in patterns.items():
+            similarity = legacy_similarity(variants, pattern, max_edit_distance)
+            if similarity > best_similarity and similarity >= threshold:
+                best, best_similarity = word, similarity
+        timings.append(time.perf_counter() - start)
+        hits.append(best)
+    return timings, hits
+
+
+def run_index(index, text_variants, threshold):
+    timings, hits, matches = [], [], 0
+    for variants in text_variants:
+        start = time.perf_counter()
+        best, best_similarity = None, 0.0
+        result = index.match(variants, threshold)
+        for word, match in result.items():
+            if match.similarity > best_similarity and match.similarity >= threshold:
+                best, best_similarity = word, match.similarity
+        timings.append(time.perf_counter() - start)
+        hits.append(best)
+        matches += len(result)
+    return timings, hits, matches / max(len(text_variants), 1)
+
+
+def check_edit_distance_monotonic(max_edit_distance):
+    """回归检查：调大最大编辑距离不能让任何唤醒词的单字误差匹配丢失或变差.
+
+    Returns:
+        List[str]: 不满足的用例描述，为空表示通过
+    """
+    failures = []
+    for word in BASE_WAKE_WORDS:
+        pattern = pinyin_variants(word)["standard"]
+        # 末尾字母替换为不同字母，模拟一个韵母识别错误
+        typo = pattern[:-1] + ("u" if pattern[-1] != "u" else "a")
+        results = []
+        for k in (max_edit_distance, max_edit_distance + 1):
+            index = PhraseIndex(k)
+            index.add(word, "standard", pattern)
+            match = index.match({"standard": typo}).get(word)
+            results.append(match.similarity if match else 0.0)
+        if results[1] < results[0]:
+            failures.append(
+                f"{word} ({pattern} -> {typo}): k={max_edit_distance} "
+                f"相似度 {results[0]:.3f}，k={max_edit_distance + 1} "
+                f"相似度 {results[1]:.3f}"
+            )
+    return failures
+
+
+def summarize(timings):
+    """
+    统计单条文本耗时（微秒）.
+    """
+    values = np.asarray(timings) * 1e6
+    return {
+        "mean": float(values.mean()),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+
+def main():
+    """
+    主函数.
+    """
+    parser = argparse.ArgumentParser(description="唤醒词匹配微基准")
+    parser.add_argument(
+        "--phrases",
+        type=int,
+        nargs="+",
+        default=[5, 50, 200, 500],
+        help="短语数量列表",
+    )
+    parser.add_argument("--texts", type=int, default=300, help="测试文本条数")
+    parser.add_argument("--threshold", type=float, default=0.85, help="相似度阈值")
+    parser.add_argument("--max-edit-distance", type=int, default=1, help="最大编辑距离")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    print(
+        f"{'短语数':>6} {'实现':>8} {'构建ms':>8} {'均值us':>10} {'p99us':>10} "
+        f"{'命中':>5} {'结果一致':>8}"
+    )
+    for count in args.phrases:
+        rng = random.Random(args.seed)
+        phrases = make_phrases(count, rng)
+        texts = make_texts(args.texts, phrases, rng)
+        text_variants = [pinyin_variants(text) for text in texts]
+        patterns = {phrase: pinyin_variants(phrase) for phrase in phrases}
+
+        start = time.perf_counter()
+        index = PhraseIndex(args.max_edit_distance)
+        for phrase, variants in patterns.items():
+            for variant, pattern in variants.items():
+                index.add(phrase, variant, pattern)
+        index.build()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy_timings, legacy_hits = run_legacy(
+            patterns, text_variants, args.threshold, args.max_edit_distance
+        )
+        index_timings, index_hits, matches_per_text = run_index(
+            index, text_variants, args.threshold
+        )
+        agree = sum(a == b for a, b in zip(legacy_hits, index_hits))
+
+        for name, timings, hits, build in (
+            ("legacy", legacy_timings, legacy_hits, 0.0),
+            ("index", index_timings, index_hits, build_ms),
+        ):
+            s = summarize(timings)
+            hit_count = sum(hit is not None for hit in hits)
+            print(
+                f"{count:>6} {name:>8} {build:>8.1f} {s['mean']:>10.1f} "
+                f"{s['p99']:>10.1f} {hit_count:>5} {agree:>4}/{len(texts)}"
+            )
+
+        speedup = summarize(legacy_timings)["mean"] / max(
+            summarize(index_timings)["mean"], 1e-9
+        )
+        # 短语越多，文本中真实出现的短语也越多，索引的开销随匹配数而不是短语总数增长
+        print(
+            f"{count:>6} 加速比: {speedup:.1f}x，"
+            f"索引每条文本返回 {matches_per_text:.1f} 个匹配"
+        )
+
+    failures = check_edit_distance_monotonic(args.max_edit_distance)
+    if failures:
+        print("回归检查失败：调大最大编辑距离后匹配变差")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(
+        f"回归检查通过：最大编辑距离 {args.max_edit_distance} -> "
+        f"{args.max_edit_distance + 1} 不会丢失单字误差匹配"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+纯逻辑模块自检 不依赖声卡和网络，用固定输入检查音频管线中可独立验证的部分.
+
+覆盖:
+    ring_buffer   环形缓冲区回绕、溢出、欠载与清空
+    jitter_buffer LBRR（带内FEC）TOC解析与丢包时的FEC/PLC补帧顺序
+    phrase_index  有界编辑距离与唤醒词匹配索引
+    delay         GCC-PHAT回声路径延迟估计
+    endpointer    本地端点检测的语音/尾部静音状态机
+
+用法:
+    python scripts/self_check.py
+    python scripts/self_check.py --only phrase_index delay
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import traceback
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer  # noqa: E402
+from src.audio_processing.delay_estimator import (  # noqa: E402
+    EchoDelayEstimator,
+    _SampleHistory,
+    estimate_delay,
+)
+from src.utils.phrase_index import PhraseIndex, bounded_edit_distance  # noqa: E402
+
+
+def expect(condition, message):
+    """
+    断言失败时抛出带说明的AssertionError.
+    """
+    if not condition:
+        raise AssertionError(message)
+
+
+# ---------------------------------------------------------------- ring_buffer
+
+
+def check_ring_buffer():
+    """
+    写入跨越存储区末尾时数据保持顺序，空间不足时拒绝写入且不覆盖未读数据.
+    """
+    ring = AudioRingBuffer(10, "check")
+    expect(ring.write(np.arange(7, dtype=np.int16)), "首次写入失败")
+    expect(np.array_equal(ring.read(5), np.arange(5)), "读取顺序错误")
+
+    # 写索引从7开始写6个样本，跨越容量10回绕
+    expect(ring.write(np.arange(7, 13, dtype=np.int16)), "回绕写入失败")
+    expect(ring.available == 8, f"回绕后可读样本数错误: {ring.available}")
+    expect(np.array_equal(ring.read(8), np.arange(5, 13)), "回绕后数据顺序错误")
+
+    # 溢出：放不下时整块丢弃
+    ring.write(np.full(8, 1, dtype=np.int16))
+    expect(not ring.write(np.full(3, 2, dtype=np.int16)), "溢出写入应失败")
+    expect(ring.overruns == 1 and ring.overrun_samples == 3, "溢出统计错误")
+    expect(np.array_equal(ring.read(8), np.full(8, 1)), "溢出覆盖了未读数据")
+
+    # 欠载：不足部分补零，只在播放中断流时计数
+    out = np.full(4, 9, dtype=np.int16)
+    expect(ring.read_into(out) == 0 and not out.any(), "空缓冲区应输出静音")
+    expect(ring.underruns == 0, "空闲时的静音不应计为欠载")
+    ring.write(np.array([5, 6], dtype=np.int16))
+    expect(ring.read_into(out) == 2, "部分读取的样本数错误")
+    expect(np.array_equal(out, [5, 6, 0, 0]), "部分读取后应补零")
+    expect(ring.underruns == 1 and ring.underrun_samples == 2, "欠载统计错误")
+
+    # 清空：跳过未读数据，之后写入的数据正常可读
+    ring.write(np.arange(6, dtype=np.int16))
+    expect(ring.clear() == 6, "清空返回的丢弃数错误")
+    expect(ring.available == 0 and ring.read(1) is None, "清空后仍有可读数据")
+    expect(ring.free == ring.capacity, "清空后可写空间未恢复")
+    ring.write(np.array([7, 8, 9], dtype=np.int16))
+    expect(np.array_equal(ring.read(3), [7, 8, 9]), "清空后写入的数据错误")
+
+
+# -------------------------------------------------------------- jitter_buffer
+
+
+class _LabelDecoder:
+    """
+    按解码方式输出不同常数帧的解码器：PLC为1，FEC为2，正常解码为10加数据包末字节.
+    """
+
+    def __init__(self, frame_size):
+        self.frame_size = frame_size
+
+    def decode(self, data, frame_size, decode_fec=False):
+        if not data:
+            value = 1
+        elif decode_fec:
+            value = 2
+        else:
+            value = 10 + data[-1]
+        return np.full(frame_size, value, dtype=np.int16).tobytes()
+
+
+def _silk_packet(lbrr: bool, marker: int) -> bytes:
+    """
+    构造单帧SILK宽带20ms数据包：TOC配置9、单声道、code 0，首字节第6位为LBRR标志.
+    """
+    return bytes([9 << 3, 0x40 if lbrr else 0x00, marker])
+
+
+def check_lbrr_parsing():
+    """
+    TOC解析与libopus 1.5的opus_packet_has_lbrr规则一致.
+    """
+    from src.audio_codecs.jitter_buffer import opus_packet_has_lbrr
+
+    cases = [
+        # (说明, 数据包, 期望)
+        ("SILK 20ms带LBRR", bytes([9 << 3, 0x40, 0]), True),
+        ("SILK 20ms无LBRR", bytes([9 << 3, 0x80, 0]), False),
+        ("SILK 40ms：两个SILK帧，LBRR在第5位", bytes([10 << 3, 0x20, 0]), True),
+        ("SILK 40ms：第6位是第二帧的VAD", bytes([10 << 3, 0x40, 0]), False),
+        ("SILK 60ms：三个SILK帧，LBRR在第4位", bytes([11 << 3, 0x10, 0]), True),
+        ("混合模式20ms带LBRR", bytes([13 << 3, 0x40, 0]), True),
+        ("CELT模式没有LBRR", bytes([31 << 3, 0xFF, 0xFF]), False),
+        ("立体声侧声道LBRR（第4位）", bytes([(9 << 3) | 0x4, 0x10, 0]), True),
+        ("code 1两帧等长", bytes([(9 << 3) | 1, 0x40, 0, 0x00, 0]), True),
+        ("code 2首帧长度2字节", bytes([(9 << 3) | 2, 2, 0x40, 0, 0x00]), True),
+        (
+            "code 3 VBR带填充",
+            bytes([(9 << 3) | 3, 0xC2, 2, 2, 0x40, 0, 0x00, 0, 0, 0]),
+            True,
+        ),
+        ("code 3 CBR两帧", bytes([(9 << 3) | 3, 0x02, 0x00, 0, 0x40, 0]), False),
+        ("只有TOC", bytes([9 << 3]), False),
+        ("空数据包", b"", False),
+    ]
+    for name, packet, expected in cases:
+        result = opus_packet_has_lbrr(packet)
+        expect(result == expected, f"{name}: 期望 {expected}，实际 {result}")
+
+
+def check_jitter_sequencing():
+    """
+    丢包时紧邻当前包的一帧仅在其携带LBRR时用FEC恢复，其余用PLC；迟到包丢弃.
+    """
+    from src.audio_codecs.jitter_buffer import JitterBuffer
+
+    frame = 160
+    jitter = JitterBuffer(16000, frame, capacity_frames=50)
+    jitter.set_decoder(_LabelDecoder(frame))
+
+    def played():
+        samples = jitter.ring.read(jitter.ring.available)
+        return [int(value) for value in samples[::frame]]
+
+    arrival = 100.0
+    for sequence, packet in (
+        (0, _silk_packet(False, 0)),
+        (1, _silk_packet(False, 1)),
+        # 丢失2、3：2用PLC，3由携带LBRR的4恢复
+        (4, _silk_packet(True, 4)),
+        # 丢失5：6不带LBRR，只能PLC
+        (6, _silk_packet(False, 6)),
+        # 迟到的5在补偿之后到达，丢弃
+        (5, _silk_packet(True, 5)),
+    ):
+        jitter.put_packet(packet, sequence, arrival)
+        arrival += 0.02
+
+    frames = played()
+    expect(frames == [10, 11, 1, 2, 14, 1, 16], f"补帧顺序错误: {frames}")
+    expect(jitter.fec_frames == 1, f"fec_frames应为1，实际 {jitter.fec_frames}")
+    expect(
+        jitter.concealed_frames == 2,
+        f"concealed_frames应为2，实际 {jitter.concealed_frames}",
+    )
+    expect(jitter.late_dropped == 1, "迟到包应被丢弃")
+
+    # 关闭FEC时即使携带LBRR也只用PLC
+    jitter.enable_fec = False
+    jitter.put_packet(_silk_packet(True, 8), 8, arrival)
+    frames = played()
+    expect(frames == [1, 18], f"关闭FEC后应使用PLC: {frames}")
+
+    # 间隔超过MAX_GAP_FRAMES视为断流，不逐帧补偿
+    gap = JitterBuffer.MAX_GAP_FRAMES + 1
+    jitter.put_packet(_silk_packet(True, 9), 9 + gap, arrival)
+    frames = played()
+    expect(frames == [19], f"断流后不应补帧: {frames}")
+
+
+# --------------------------------------------------------------- phrase_index
+
+
+def _substring_edit_distance(pattern, text):
+    """
+    逐格动态规划：pattern与text任意子串的最小编辑距离（对照实现）.
+    """
+    previous = [0] * (len(text) + 1)
+    for i, char in enumerate(pattern, 1):
+        current = [i] + [0] * len(text)
+        for j, other in enumerate(text, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other),
+            )
+        previous = current
+    return min(previous)
+
+
+def check_bounded_edit_distance():
+    """
+    Myers位并行结果与逐格动态规划一致，超过上限时返回None.
+    """
+    rng = random.Random(0)
+    for _ in range(2000):
+        pattern = "".join(rng.choice("abcd") for _ in range(rng.randint(1, 12)))
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 20)))
+        limit = rng.randint(0, 4)
+        expected = _substring_edit_distance(pattern, text)
+        result = bounded_edit_distance(pattern, text, limit)
+        want = expected if expected <= limit else None
+        expect(
+            result == want,
+            f"bounded_edit_distance({pattern!r}, {text!r}, {limit}) = {result}，"
+            f"期望 {want}",
+        )
+    expect(bounded_edit_distance("", "abc", 0) == 0, "空模式串的距离应为0")
+
+
+def check_phrase_index():
+    """
+    精确/模糊/首字母子序列匹配、编辑距离单调性与相同相似度时的顺序.
+    """
+    index = PhraseIndex(1, subsequence_score=0.8)
+    index.add("小智", "standard", "xiaozhi")
+    index.add("小智", "initials", "xz")
+    index.add("你好小明", "standard", "nihaoxiaoming")
+    index.add("你好小明", "initials", "nhxm")
+    index.build()
+
+    result = index.match({"standard": "aaxiaozhibb"})
+    expect(
+        list(result) == ["小智"] and result["小智"].similarity == 1.0,
+        f"精确匹配失败: {result}",
+    )
+
+    result = index.match({"standard": "woshuonihaoxiaomingle"})
+    expect(result.get("你好小明") and result["你好小明"].distance == 0, "子串精确匹配失败")
+
+    # 一处替换：相似度为1 - 1/13
+    result = index.match({"standard": "nihaoxiaoning"})
+    match = result.get("你好小明")
+    expect(match and match.distance == 1, f"模糊匹配失败: {result}")
+    expect(abs(match.similarity - 12 / 13) < 1e-9, "模糊匹配相似度错误")
+    # 调用方阈值高于可达相似度时不返回
+    result = index.match({"standard": "nihaoxiaoning"}, 0.95)
+    expect("你好小明" not in result, "阈值过滤失败")
+
+    # 首字母作为子序列出现
+    result = index.match({"initials": "nahxxm"})
+    match = result.get("你好小明")
+    expect(match and match.similarity == 0.8, f"首字母子序列匹配失败: {result}")
+
+    # 调大最大编辑距离不能让短短语的匹配丢失
+    for k in (1, 2, 3):
+        index = PhraseIndex(k)
+        index.add("贾维斯", "standard", "jiaweisi")
+        match = index.match({"standard": "jiaweisu"}).get("贾维斯")
+        expect(
+            match is not None and match.distance == 1,
+            f"max_edit_distance={k}时未匹配jiaweisu",
+        )
+    # 短于2*MIN_PIECE的变体只做精确匹配
+    index = PhraseIndex(2)
+    index.add("小智", "initials", "xz")
+    expect(not index.match({"initials": "xa"}), "短变体不应模糊匹配")
+
+    # 结果按短语添加顺序排列
+    index = PhraseIndex(1)
+    for key in ("b", "a", "c"):
+        index.add(key, "standard", "xiaozhi")
+    expect(
+        list(index.match({"standard": "xiaozhi"})) == ["b", "a", "c"],
+        "相同相似度的结果应按添加顺序排列",
+    )
+
+
+# ---------------------------------------------------------------------- delay
+
+
+def check_delay_estimator():
+    """
+    对已知延迟的白噪声回声，估计值与真实延迟一致，连续一致后才更新.
+    """
+    rate = 16000
+    rng = np.random.default_rng(0)
+
+    # _SampleHistory：多次回绕后视图仍是最近capacity个样本
+    history = _SampleHistory(100)
+    stream = np.arange(1000, dtype=np.float32)
+    for start in range(0, 1000, 37):
+        history.write(stream[start : start + 37])
+    expect(np.array_equal(history.view(), stream[-100:]), "滑动窗口内容错误")
+
+    # estimate_delay：capture[n] = 0.5 * reference[n - delay] + 噪声
+    for delay in (0, 37, 800, 2400):
+        max_lag = 4000
+        reference = rng.standard_normal(16000 + max_lag).astype(np.float32)
+        capture = 0.5 * reference[len(reference) - 16000 - delay :][:16000]
+        capture = capture + 0.05 * rng.standard_normal(16000)
+        lag, confidence = estimate_delay(reference, capture, max_lag)
+        expect(lag == delay, f"延迟估计错误: 期望 {delay}，实际 {lag}")
+        expect(confidence >= EchoDelayEstimator.MIN_CONFIDENCE, "置信度过低")
+
+    # EchoDelayEstimator：按帧写入，延迟120ms的回声应在连续一致后更新
+    delay_ms = 120
+    delay = rate * delay_ms // 1000
+    estimator = EchoDelayEstimator(rate, initial_delay_ms=50, interval_ms=250)
+    far = (rng.standard_normal(rate * 5 + delay) * 3000).astype(np.float32)
+    frame = rate // 100
+    updates = []
+    for start in range(delay, len(far) - frame, frame):
+        estimator.push_render(far[start : start + frame])
+        echo = 0.5 * far[start - delay : start - delay + frame]
+        estimator.push_capture(echo + rng.standard_normal(frame) * 30)
+        result = estimator.update()
+        if result is not None:
+            updates.append(result)
+    expect(updates == [delay_ms], f"延迟更新序列错误: {updates}")
+    expect(estimator.delay_ms == delay_ms, "估计器当前延迟错误")
+
+    # 静音时不估计
+    quiet = EchoDelayEstimator(rate, initial_delay_ms=50, interval_ms=250)
+    silence = np.zeros(frame, dtype=np.float32)
+    for _ in range(300):
+        quiet.push_render(silence)
+        quiet.push_capture(silence)
+        quiet.update()
+    expect(quiet.estimates == 0, "静音时不应估计延迟")
+
+
+# ----------------------------------------------------------------- endpointer
+
+
+class _DefaultConfig:
+    """
+    总是返回默认值的配置.
+    """
+
+    def get_config(self, key, default=None):
+        return default
+
+
+class _LabelClassifier:
+    """
+    以帧的首个样本作为是否为语音的标签.
+    """
+
+    def classify(self, frames):
+        return [bool(frame[0]) for frame in frames]
+
+
+class _ScriptedSubscription:
+    """
+    依次返回预先准备的批次，用完后模拟监听结束（取消检测循环）.
+    """
+
+    def __init__(self, batches):
+        self._batches = list(batches)
+
+    async def wait_async(self):
+        if not self._batches:
+            raise asyncio.CancelledError()
+
+    def drain(self):
+        return self._batches.pop(0)
+
+
+class _EndpointApp:
+    def __init__(self):
+        self.stops = 0
+
+    async def stop_listening_at_endpoint(self):
+        self.stops += 1
+
+
+def _run_endpointer(labels, batch_size=3):
+    """
+    按标签序列运行端点检测，返回(检测器, 应用).
+    """
+    from src.audio_processing.endpointer import SpeechEndpointer
+
+    app = _EndpointApp()
+    endpointer = SpeechEndpointer(None, app, config=_DefaultConfig())
+    endpointer.classifier = _LabelClassifier()
+    frames = [(np.full(4, int(label), dtype=np.int16), 0.0) for label in labels]
+    batches = [frames[i : i + batch_size] for i in range(0, len(frames), batch_size)]
+
+    async def run():
+        await endpointer._detection_loop(_ScriptedSubscription(batches))
+        # 让判定时创建的停止任务执行
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    return endpointer, app
+
+
+def check_endpointer():
+    """
+    语音足够长且尾部静音达到阈值时判定一次；短促声音和句中停顿不触发.
+    """
+    from src.audio_processing.endpointer import SpeechEndpointer
+
+    probe = SpeechEndpointer(None, _EndpointApp(), config=_DefaultConfig())
+    speech, silence = probe.min_speech_frames, probe.trailing_silence_frames
+    frame_ms = probe.get_stats()["min_speech_ms"] // speech
+
+    # 说完：语音 + 足够的尾部静音，之后的帧不再处理
+    endpointer, app = _run_endpointer([1] * speech + [0] * (silence + 5))
+    expect(app.stops == 1 and endpointer.local_endpoints == 1, "说完后应判定一次")
+    expect(endpointer.last_speech_ms == speech * frame_ms, "语音时长统计错误")
+    expect(
+        endpointer.frames_processed < speech + silence + 5,
+        "判定后应停止处理后续帧",
+    )
+
+    # 尾部静音不足
+    endpointer, app = _run_endpointer([1] * speech + [0] * (silence - 1))
+    expect(app.stops == 0, "尾部静音不足时不应判定")
+
+    # 句中停顿短于尾部静音，停顿前后的语音累计
+    labels = [1] * (speech - 1) + [0] * (silence - 1) + [1] + [0] * silence
+    endpointer, app = _run_endpointer(labels)
+    expect(app.stops == 1, "句中停顿后应继续累计语音")
+    expect(endpointer.last_speech_ms == speech * frame_ms, "停顿前后的语音应累计")
+
+    # 短促的声音在静音后清零，不与之后的语音累计
+    labels = [1] * (speech - 1) + [0] * silence + [1] * (speech - 1) + [0] * silence
+    endpointer, app = _run_endpointer(labels)
+    expect(app.stops == 0, "短促声音不应触发判定")
+
+
+CHECKS = {
+    "ring_buffer": [check_ring_buffer],
+    "jitter_buffer": [check_lbrr_parsing, check_jitter_sequencing],
+    "phrase_index": [check_bounded_edit_distance, check_phrase_index],
+    "delay": [check_delay_estimator],
+    "endpointer": [check_endpointer],
+}
+
+
+def main():
+    """
+    主函数.
+    """
+    parser = argparse.ArgumentParser(description="纯逻辑模块自检")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=sorted(CHECKS),
+        help="只运行指定模块的检查",
+    )
+    args = parser.parse_args()
+
+    failed = 0
+    for module in args.only or CHECKS:
+        for check in CHECKS[module]:
+            try:
+                check()
+            except Exception:
+                failed += 1
+                print(f"[失败] {module}.{check.__name__}")
+                traceback.print_exc()
+            else:
+                print(f"[通过] {module}.{check.__name__}")
+
+    if failed:
+        print(f"{failed} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import asyncio
 import json
 from re import sub
+import shlex
 import signal
 import subprocess
 import sys
 import threading
+import time
 import random
-from typing import Set
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Set
 
 try:
     import rclpy
@@ -17,13 +21,22 @@ try:
 except ImportError:
     ROS_AVAILABLE = False
 
-from src.constants.constants import AbortReason, DeviceState, ListeningMode
+from src.audio_codecs.pre_roll_buffer import PreRollBuffer
+from src.audio_processing.vosk_model_cache import VoskModelCache
+from src.constants.constants import (
+    AbortReason,
+    AudioConfig,
+    DeviceState,
+    ListeningMode,
+)
 from src.display import gui_display
 from src.mcp.mcp_server import McpServer
 from src.protocols.mqtt_protocol import MqttProtocol
+from src.protocols.outbound_audio_buffer import OutboundAudioBuffer
 from src.protocols.websocket_protocol import WebsocketProtocol
 from src.utils.common_utils import handle_verification_code
 from src.utils.config_manager import ConfigManager
+from src.utils.latency_monitor import LatencyMonitor
 from src.utils.logging_config import get_logger
 from src.utils.opus_loader import setup_opus
 # from src.utils.keyword_matcher import KeywordMatcher
@@ -102,6 +115,7 @@ class Application:
         self.device_state = DeviceState.IDLE
         self.voice_detected = False
         self.keep_listening = False
+        self.listening_mode = None
         self.aborted = False
         self.is_action_awake = False
 
@@ -116,6 +130,10 @@ class Application:
         self.protocol = None
         self.display = None
         self.wake_word_detector = None
+        self.vad_detector = None
+        self.endpointer = None
+        # 本地端点检测判定说完后停止上传，直到下一次开始监听
+        self._uplink_paused = False
         # 任务管理
         self.running = False
         self._main_tasks: Set[asyncio.Task] = set()
@@ -130,6 +148,26 @@ class Application:
         self._main_loop = None
         self.first_salute = False
 
+        # 上行音频发送统计（用于对比不同编码参数的带宽占用）
+        self._uplink_packets = 0
+        self._uplink_bytes = 0
+
+        # 唤醒词预录：检出唤醒词前的编码音频，开始监听后补发给服务器
+        self._pre_roll = None
+
+        # 上行缓冲：请求监听到音频通道就绪之间编码的音频
+        self._outbound_audio = OutboundAudioBuffer(
+            max_frames=self.config.get_config(
+                "AUDIO_OPTIONS.OUTBOUND_BUFFER.MAX_FRAMES", 200
+            ),
+            max_age_ms=self.config.get_config(
+                "AUDIO_OPTIONS.OUTBOUND_BUFFER.MAX_AGE_MS", 3000
+            ),
+        )
+
+        # 启动各阶段耗时（秒），用于分析启动慢的原因
+        self._startup_timings = {}
+
         # MCP服务器
         self.mcp_server = McpServer.get_instance()
 
@@ -295,30 +333,42 @@ class Application:
         初始化应用程序组件.
         """
         logger.info("正在初始化应用程序组件...")
+        started = time.perf_counter()
 
         # --- 新增：初始化ROS2 ---
-        self._initialize_ros2()
+        with self._startup_step("ros2"):
+            self._initialize_ros2()
 
         # 设置显示类型（必须在设备状态设置之前）
         self._set_display_type(mode)
 
         # 初始化MCP服务器
-        self._initialize_mcp_server()
+        with self._startup_step("mcp_server"):
+            self._initialize_mcp_server()
 
         # 设置设备状态
         await self._set_device_state(DeviceState.IDLE)
 
         # 初始化物联网设备
-        await self._initialize_iot_devices()
+        with self._startup_step("iot_devices"):
+            await self._initialize_iot_devices()
 
         # 初始化音频编解码器
-        await self._initialize_audio()
+        with self._startup_step("audio"):
+            await self._initialize_audio()
 
         # 设置协议
         self._set_protocol_type(protocol)
 
-        # 初始化唤醒词检测
-        await self._initialize_wake_word_detector()
+        # 初始化唤醒词检测（模型在后台加载，此处不等待）
+        with self._startup_step("wake_word_detector"):
+            await self._initialize_wake_word_detector()
+
+        # 初始化用户打断检测
+        self._initialize_barge_in()
+
+        # 初始化本地端点检测
+        self._initialize_endpointer()
 
         # # 初始化关键词匹配器
         # await self._initialize_keyword_matcher()
@@ -333,9 +383,12 @@ class Application:
         # await self._start_timer_service()
 
         # 初始化快捷键管理器
-        await self._initialize_shortcuts()
+        with self._startup_step("shortcuts"):
+            await self._initialize_shortcuts()
 
+        self._startup_timings["total"] = time.perf_counter() - started
         logger.info("应用程序组件初始化完成")
+        self._log_startup_stats()
 
         # --- 请确保有下面这段代码 ---
         # 等待1秒，以确保ROS2的DDS网络发现有足够的时间完成
@@ -345,6 +398,42 @@ class Application:
 
         logger.info("应用程序组件初始化完成")
 
+    @contextmanager
+    def _startup_step(self, name: str):
+        """
+        记录一个启动步骤的耗时.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._startup_timings[name] = time.perf_counter() - start
+
+    def get_startup_stats(self) -> dict:
+        """
+        获取启动耗时分解（毫秒），以及语音识别模型的后台加载/等待耗时.
+        """
+        return {
+            "steps_ms": {
+                name: round(seconds * 1000, 1)
+                for name, seconds in self._startup_timings.items()
+            },
+            "models": VoskModelCache.get_instance().get_stats(),
+        }
+
+    def _log_startup_stats(self):
+        """
+        输出启动耗时分解.
+        """
+        stats = self.get_startup_stats()
+        steps = ", ".join(f"{name}={ms}ms" for name, ms in stats["steps_ms"].items())
+        logger.info(f"启动耗时: {steps}")
+        for path, model in stats["models"].items():
+            logger.info(
+                f"语音模型 {Path(path).name}: 状态={model['state']}, "
+                f"加载耗时={model['load_seconds']}s, 等待={model['waited_seconds']}s"
+            )
+
     def _initialize_ros2(self):
         if not ROS_AVAILABLE:
             logger.warning("ROS2库未安装，将跳过ROS2功能。")
@@ -395,6 +484,10 @@ class Application:
             # 设置实时编码回调
             self.audio_codec.set_encoded_audio_callback(self._on_encoded_audio)
 
+            pre_roll_ms = self.config.get_config("WAKE_WORD_OPTIONS.PRE_ROLL_MS", 500)
+            if pre_roll_ms > 0:
+                self._pre_roll = PreRollBuffer(pre_roll_ms, AudioConfig.FRAME_DURATION)
+
             logger.info("音频编解码器初始化成功")
 
         except Exception as e:
@@ -405,40 +498,74 @@ class Application:
     def _on_encoded_audio(self, encoded_data: bytes):
         """
         处理编码后的音频数据回调.
-        
-        注意：这个回调在音频驱动线程中被调用，需要线程安全地调度到主事件循环。
+
+        编码线程按批次调度到主事件循环，这个回调在事件循环线程中被调用。
         """
         try:
+            # 音频通道就绪前（或缓冲尚未补发完毕）先缓存，保证发送顺序
+            if self._outbound_audio.active:
+                self._outbound_audio.push(encoded_data)
+                return
+
             # 只在监听状态且音频通道打开时发送数据
             if (self.device_state == DeviceState.LISTENING 
                     and self.protocol 
                     and self.protocol.is_audio_channel_opened()
+                    and not self._uplink_paused
                     and not getattr(self, '_transitioning', False)):
-                
-                # 线程安全地调度到主事件循环
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_send, encoded_data
-                    )
-                
+
+                # 创建异步任务发送音频数据
+                asyncio.create_task(
+                    self._send_encoded_audio(encoded_data, time.monotonic())
+                )
+            elif self._pre_roll:
+                self._pre_roll.push(encoded_data)
+
         except Exception as e:
             logger.error(f"处理编码音频数据回调失败: {e}")
 
-    def _schedule_audio_send(self, encoded_data: bytes):
+    async def _send_encoded_audio(self, encoded_data: bytes, dispatched_at: float):
         """
-        在主事件循环中调度音频发送任务.
+        发送一帧编码音频，并统计从事件循环调度到socket写入完成的耗时.
         """
-        try:
-            # 再次检查状态（可能在调度期间状态已改变）
-            if (self.device_state == DeviceState.LISTENING 
-                    and self.protocol 
-                    and self.protocol.is_audio_channel_opened()):
-                
-                # 创建异步任务发送音频数据
-                asyncio.create_task(self.protocol.send_audio(encoded_data))
-                
-        except Exception as e:
-            logger.error(f"调度音频发送失败: {e}")
+        await self.protocol.send_audio(encoded_data)
+        LatencyMonitor.get_instance().record("send", time.monotonic() - dispatched_at)
+        self._uplink_packets += 1
+        self._uplink_bytes += len(encoded_data)
+
+    async def _drain_outbound_audio(self, release: bool = True):
+        """按顺序补发音频通道就绪前缓存的音频.
+
+        Args:
+            release: 发送完毕后是否结束缓冲，恢复实时发送
+        """
+        await self._outbound_audio.drain(
+            lambda frame: self._send_encoded_audio(frame, time.monotonic()),
+            release=release,
+        )
+
+    def get_latency_stats(self) -> dict:
+        """
+        获取端到端音频延迟统计（各阶段p50/p95/p99，毫秒）.
+        """
+        return LatencyMonitor.get_instance().get_stats()
+
+    def get_uplink_stats(self) -> dict:
+        """
+        获取上行音频统计：已发送的包数/字节数，以及编码参数、码率和编码CPU占用.
+        """
+        stats = {
+            "packets_sent": self._uplink_packets,
+            "bytes_sent": self._uplink_bytes,
+        }
+        if self.audio_codec:
+            stats["encoder"] = self.audio_codec.get_buffer_stats()["encoder"]
+        stats["outbound_buffer"] = self._outbound_audio.get_stats()
+        if self._pre_roll:
+            stats["pre_roll"] = self._pre_roll.get_stats()
+        if self.endpointer:
+            stats["endpointer"] = self.endpointer.get_stats()
+        return stats
 
     def _set_protocol_type(self, protocol_type: str):
         """
@@ -521,6 +648,11 @@ class Application:
         # 命令处理任务
         self._create_task(self._command_processor(), "命令处理")
 
+        # 事件循环延迟监测，统计结果随音频延迟统计一起输出
+        self._create_task(
+            LatencyMonitor.get_instance().watch_event_loop(), "事件循环延迟监测"
+        )
+
     def _create_task(self, coro, name: str) -> asyncio.Task:
         """
         创建并管理任务.
@@ -636,20 +768,36 @@ class Application:
             if self.device_state != DeviceState.IDLE:
                 return False
 
-        if not self.protocol.is_audio_channel_opened():
-            success = await self.protocol.open_audio_channel()
-            if not success:
-                return False
+        # 立即开始缓存上行音频，握手期间用户说的话不再丢失
+        self._outbound_audio.start()
+        try:
+            if not self.protocol.is_audio_channel_opened():
+                success = await self.protocol.open_audio_channel()
+                if not success:
+                    return False
 
-        if self.audio_codec:
-            await self.audio_codec.clear_audio_queue()
+            if self.audio_codec:
+                await self.audio_codec.clear_audio_queue()
 
-        await self._set_device_state(DeviceState.CONNECTING)
+            await self._set_device_state(DeviceState.CONNECTING)
 
-        self._set_keep_listening(keep_listening_flag)
+            self._set_keep_listening(keep_listening_flag)
+            await self._send_start_listening(listening_mode)
+            await self._drain_outbound_audio(release=False)
+            await self._set_device_state(DeviceState.LISTENING)
+            await self._drain_outbound_audio()
+            return True
+        finally:
+            # 未能开始监听时丢弃缓存
+            self._outbound_audio.cancel()
+
+    async def _send_start_listening(self, listening_mode):
+        """
+        发送开始监听消息并记录监听模式，恢复上传.
+        """
+        self.listening_mode = listening_mode
+        self._uplink_paused = False
         await self.protocol.send_start_listening(listening_mode)
-        await self._set_device_state(DeviceState.LISTENING)
-        return True
 
     async def start_listening(self):
         """
@@ -681,6 +829,24 @@ class Application:
             await self.protocol.send_stop_listening()
             await self._set_device_state(DeviceState.IDLE)
 
+    async def stop_listening_at_endpoint(self):
+        """
+        本地端点检测判定用户说完：立即停止上传，并主动通知服务器停止监听.
+        """
+        self._uplink_paused = True
+        await self.schedule_command(self._stop_listening_at_endpoint_impl)
+
+    async def _stop_listening_at_endpoint_impl(self):
+        """
+        本地端点停止监听的实现，与手动停止一样切换到IDLE等待服务器回复.
+        """
+        if (
+            self.device_state == DeviceState.LISTENING
+            and self.listening_mode == ListeningMode.AUTO_STOP
+        ):
+            await self.protocol.send_stop_listening()
+            await self._set_device_state(DeviceState.IDLE)
+
     async def toggle_chat_state(self):
         """
         切换聊天状态.
@@ -774,6 +940,23 @@ class Application:
             logger.debug(f"设备状态变更: {self.device_state} -> {state}")
             self.device_state = state
 
+            # 打断检测只在播放语音期间运行
+            if self.vad_detector:
+                if state == DeviceState.SPEAKING:
+                    self.vad_detector.start()
+                else:
+                    self.vad_detector.stop()
+
+            # 本地端点检测只在AUTO_STOP监听期间运行
+            if self.endpointer:
+                if (
+                    state == DeviceState.LISTENING
+                    and self.listening_mode == ListeningMode.AUTO_STOP
+                ):
+                    self.endpointer.start()
+                else:
+                    self.endpointer.stop()
+
             # 根据状态执行相应操作并更新显示
             if state == DeviceState.IDLE:
                 await self._handle_idle_state()
@@ -869,24 +1052,14 @@ class Application:
     def _on_incoming_audio(self, data):
         """
         接收音频数据回调.
+
+        只把数据包交给解码线程，不创建任务、不在事件循环中解码。
         """
         if self.device_state == DeviceState.SPEAKING and self.audio_codec:
             try:
-                # 音频数据处理需要实时性，直接创建任务但添加异常处理
-                task = asyncio.create_task(self.audio_codec.write_audio(data))
-                task.add_done_callback(
-                    lambda t: (
-                        logger.error(
-                            f"音频写入任务异常: {t.exception()}", exc_info=True
-                        )
-                        if not t.cancelled() and t.exception()
-                        else None
-                    )
-                )
-            except RuntimeError as e:
-                logger.error(f"无法创建音频写入任务: {e}")
+                self.audio_codec.submit_audio(data, arrival=time.monotonic())
             except Exception as e:
-                logger.error(f"创建音频写入任务失败: {e}", exc_info=True)
+                logger.error(f"提交音频数据失败: {e}", exc_info=True)
 
     def _on_incoming_json(self, json_data):
         """
@@ -919,6 +1092,24 @@ class Application:
         except Exception as e:
             logger.error(f"处理JSON消息时出错: {e}", exc_info=True)
 
+    @staticmethod
+    def _resolve_cue_file(cmd: str) -> Optional[Path]:
+        """
+        从动作音频配置中解析WAV文件路径，支持"aplay xxx.wav"或直接填写路径.
+        """
+        try:
+            parts = shlex.split(cmd)
+        except ValueError:
+            return None
+        if not parts or (parts[0] != "aplay" and len(parts) > 1):
+            return None
+
+        for part in reversed(parts):
+            if part.lower().endswith(".wav"):
+                path = Path(part).expanduser()
+                return path if path.exists() else None
+        return None
+
     async def execute_robot_actions(self, actions: list):
         """
         根据动作名称列表，从配置中查找并执行相应的机器人动作。
@@ -947,7 +1138,12 @@ class Application:
                     # 等待一个短暂的延迟，给ROS节点启动时间
                     await asyncio.sleep(delay)
                     logger.info(f"延迟结束后，开始播放音频: {cmd}")
-                    # 在单独的线程中运行音频播放，避免阻塞
+                    # WAV提示音通过混音器播放，与TTS共用输出流
+                    cue_file = self._resolve_cue_file(cmd)
+                    if cue_file and self.audio_codec:
+                        await self.audio_codec.play_sound(cue_file, wait=True)
+                        return
+                    # 其他命令在单独的线程中运行，避免阻塞
                     await asyncio.to_thread(subprocess.run, cmd, shell=True, check=False)
                 # 音频播放任务并行执行，不受影响
                 if audio_cmd:
@@ -988,7 +1184,7 @@ class Application:
                 # 无论动作成功还是失败，最后都要恢复状态
                 logger.info(f"动作 '{action_name}' 流程结束，准备恢复状态...")
                 if self.keep_listening:
-                    await self.protocol.send_start_listening(ListeningMode.AUTO_STOP)
+                    await self._send_start_listening(ListeningMode.AUTO_STOP)
                     await self._set_device_state(DeviceState.LISTENING)
                 else:
                     await self._set_device_state(DeviceState.IDLE)
@@ -1034,19 +1230,15 @@ class Application:
         处理TTS停止事件.
         """
         if self.device_state == DeviceState.SPEAKING:
-            # 等待音频播放完成（改进：增加等待时间并移除过早的清空操作）
+            # 等待最后一个样本离开声卡（按DAC时间戳），随即切换状态
             if self.audio_codec:
                 logger.debug("等待TTS音频播放完成...")
                 await self.audio_codec.wait_for_audio_complete()
                 logger.debug("TTS音频播放完成")
 
-            # 仅在非打断情况下，等待一小段时间让缓冲区稳定
-            if not self.aborted:
-                await asyncio.sleep(0.2)  # 额外200ms确保尾音播放完整
-
             # 状态转换
             if self.keep_listening:
-                await self.protocol.send_start_listening(ListeningMode.AUTO_STOP)
+                await self._send_start_listening(ListeningMode.AUTO_STOP)
                 await self._set_device_state(DeviceState.LISTENING)
             else:
                 await self._set_device_state(DeviceState.IDLE)
@@ -1056,6 +1248,8 @@ class Application:
         处理STT消息.
         """
         text = data.get("text", "")
+        if self.endpointer:
+            self.endpointer.on_server_endpoint()
         if text:
             logger.info(f">> {text}")
             # # 检查匹配器是否已成功初始化
@@ -1139,6 +1333,42 @@ class Application:
             logger.error(f"初始化唤醒词检测器失败: {e}")
             self.wake_word_detector = None
 
+    def _initialize_barge_in(self):
+        """
+        初始化用户打断检测（需要回声消除或耳机，否则TTS声音会触发打断）.
+        """
+        if not self.audio_codec:
+            return
+        if not self.config.get_config("AUDIO_OPTIONS.BARGE_IN.ENABLED", False):
+            logger.info("用户打断检测未启用")
+            return
+        try:
+            from src.audio_processing.vad_detector import VADDetector
+
+            self.vad_detector = VADDetector(self.audio_codec, self)
+            logger.info("用户打断检测初始化成功")
+        except Exception as e:
+            logger.error(f"初始化用户打断检测失败: {e}")
+            self.vad_detector = None
+
+    def _initialize_endpointer(self):
+        """
+        初始化本地端点检测（AUTO_STOP模式下本地判断用户说完）.
+        """
+        if not self.audio_codec:
+            return
+        if not self.config.get_config("AUDIO_OPTIONS.ENDPOINTER.ENABLED", False):
+            logger.info("本地端点检测未启用")
+            return
+        try:
+            from src.audio_processing.endpointer import SpeechEndpointer
+
+            self.endpointer = SpeechEndpointer(self.audio_codec, self)
+            logger.info("本地端点检测初始化成功")
+        except Exception as e:
+            logger.error(f"初始化本地端点检测失败: {e}")
+            self.endpointer = None
+
     async def _on_wake_word_detected(self, wake_word, full_text):
         """
         唤醒词检测回调.
@@ -1146,6 +1376,8 @@ class Application:
         logger.info(f"检测到唤醒词: {wake_word}")
         # 
         if self.device_state == DeviceState.IDLE:
+            # 预录音频放在上行缓冲最前面，连接期间用户继续说的话接在后面
+            self._outbound_audio.start(self._pre_roll.take() if self._pre_roll else ())
             await self._set_device_state(DeviceState.CONNECTING)
             await self._connect_and_start_listening(wake_word)
         # elif self.device_state == DeviceState.SPEAKING:
@@ -1174,12 +1406,19 @@ class Application:
                 await self.protocol.send_wake_word_detected("唤醒")
                 
             self._set_keep_listening(True)
-            await self.protocol.send_start_listening(ListeningMode.AUTO_STOP)
+            await self._send_start_listening(ListeningMode.AUTO_STOP)
+            # 开始监听后立即补发预录和连接期间缓存的音频
+            await self._drain_outbound_audio(release=False)
             await self._set_device_state(DeviceState.LISTENING)
+            # 补发切换状态期间新编码的帧，之后恢复实时发送
+            await self._drain_outbound_audio()
 
         except Exception as e:
             logger.error(f"连接和启动监听失败: {e}")
             await self._set_device_state(DeviceState.IDLE)
+        finally:
+            # 连接失败时丢弃缓存
+            self._outbound_audio.cancel()
 
     def _handle_wake_word_error(self, error):
         """
@@ -1287,6 +1526,8 @@ class Application:
             
             #  清理应用本身的核心组件
             await self._safe_close_resource(self.wake_word_detector, "唤醒词检测器", "stop")
+            await self._safe_close_resource(self.vad_detector, "用户打断检测", "stop")
+            await self._safe_close_resource(self.endpointer, "本地端点检测", "stop")
             
             tasks = list(self._main_tasks)
             for task in tasks:
@@ -1302,6 +1543,11 @@ class Application:
                 await self.protocol.close_audio_channel()
             
             await self._safe_close_resource(self.audio_codec, "音频设备")
+
+            # 保存本次运行的音频延迟统计，便于版本间对比
+            LatencyMonitor.get_instance().dump_json()
+            logger.info(f"上行音频统计: {self.get_uplink_stats()}")
+
             await self._safe_close_resource(self.mcp_server, "MCP服务器")
             await self._safe_close_resource(self.display, "显示界面")
             logger.info("应用程序核心组件关闭完成。")
@@ -1,7 +1,8 @@
 import asyncio
 import gc
+import platform
 import time
-from collections import deque
+import wave
 from typing import Optional
 
 import numpy as np
@@ -9,7 +10,16 @@ import opuslib
 import sounddevice as sd
 import soxr
 
+from src.audio_codecs.capture_bus import CaptureBus
+from src.audio_codecs.decoder_worker import OpusDecoderWorker
+from src.audio_codecs.encoder_profile import OpusEncoderProfile
+from src.audio_codecs.encoder_worker import OpusEncoderWorker
+from src.audio_codecs.frame_assembler import FrameAssembler
+from src.audio_codecs.jitter_buffer import JitterBuffer
+from src.audio_codecs.output_mixer import OutputMixer, PcmSource
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.latency_monitor import LatencyMonitor
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -31,8 +41,8 @@ class AudioCodec:
         # 输入重采样器
         self.input_resampler = None
 
-        # 重采样缓冲区，用deque提高性能
-        self._resample_input_buffer = deque()
+        # 输入帧组装器，将任意长度的重采样输出切分为定长帧
+        self._input_frame_assembler = FrameAssembler(AudioConfig.INPUT_FRAME_SIZE)
 
         # 输入帧大小缓存
         self._device_input_frame_size = None
@@ -44,12 +54,66 @@ class AudioCodec:
         self.input_stream = None
         self.output_stream = None
 
-        # 音频数据队列
-        self._wakeword_buffer = asyncio.Queue(maxsize=100)  # 唤醒词检测
-        self._output_buffer = asyncio.Queue(maxsize=500)  # 音频播放
-        
-        # 实时编码回调
-        self._encoded_audio_callback = None
+        # 共享录音总线：麦克风只打开一次，编码、唤醒词、VAD等订阅同一份16kHz帧
+        self.capture_bus = CaptureBus(AudioConfig.INPUT_FRAME_SIZE)
+
+        # 回声消除（可选）：录音回调发布到麦克风总线，处理后再发布到共享录音总线
+        config = ConfigManager.get_instance()
+        # 配置启用回声消除但无法启用时的原因
+        self.aec_error: Optional[str] = None
+        self.echo_canceller = self._create_echo_canceller(config)
+        self._mic_bus = (
+            self.echo_canceller.mic_bus if self.echo_canceller else self.capture_bus
+        )
+
+        # 播放抖动缓冲区（音频播放）
+        self._jitter_buffer = JitterBuffer(
+            AudioConfig.OUTPUT_SAMPLE_RATE,
+            AudioConfig.OUTPUT_FRAME_SIZE,
+            capacity_frames=500,
+            min_delay_ms=config.get_config(
+                "AUDIO_OPTIONS.JITTER_BUFFER.MIN_DELAY_MS", 60
+            ),
+            max_delay_ms=config.get_config(
+                "AUDIO_OPTIONS.JITTER_BUFFER.MAX_DELAY_MS", 500
+            ),
+            max_conceal_frames=config.get_config(
+                "AUDIO_OPTIONS.JITTER_BUFFER.MAX_CONCEAL_FRAMES", 2
+            ),
+            enable_fec=config.get_config(
+                "AUDIO_OPTIONS.JITTER_BUFFER.ENABLE_FEC", True
+            ),
+        )
+
+        # 播放混音器：TTS为主音源，音乐、提示音作为附加音源共用同一个输出流
+        self.mixer = OutputMixer(
+            AudioConfig.OUTPUT_SAMPLE_RATE,
+            AudioConfig.OUTPUT_FRAME_SIZE,
+            duck_gain=config.get_config("AUDIO_OPTIONS.MIXER.DUCK_GAIN", 0.2),
+            duck_attack_ms=config.get_config("AUDIO_OPTIONS.MIXER.DUCK_ATTACK_MS", 60),
+            duck_release_ms=config.get_config(
+                "AUDIO_OPTIONS.MIXER.DUCK_RELEASE_MS", 500
+            ),
+        )
+        self.mixer.set_primary(self._jitter_buffer)
+
+        # 解码线程，接收侧只入队，解码后直接写入播放抖动缓冲区
+        self._decoder_worker = OpusDecoderWorker(self._jitter_buffer)
+
+        # 播放位置跟踪：最后一个有效样本离开DAC的时间（time.monotonic）
+        self._playback_end = 0.0
+        # 等待播放缓冲区排空的事件循环侧等待者
+        self._drain_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._drain_waiter: Optional[asyncio.Future] = None
+        self._drain_waiter_armed = False
+
+        # 端到端延迟统计
+        self._latency = LatencyMonitor.get_instance()
+
+        # 录音编码线程，回调中只复制PCM，编码在独立线程完成
+        self._encoder_worker = OpusEncoderWorker(self.capture_bus)
+        # 编码参数（应用类型、码率、VBR、复杂度、DTX、FEC、预期丢包率）
+        self.encoder_profile = OpusEncoderProfile.from_config()
 
     async def initialize(self):
         """
@@ -89,14 +153,22 @@ class AudioCodec:
             # 初始化Opus编解码器
             # 编码器用于16kHz录音数据
             # 解码器用于24kHz播放数据
-            self.opus_encoder = opuslib.Encoder(
-                AudioConfig.INPUT_SAMPLE_RATE,
-                AudioConfig.CHANNELS,
-                opuslib.APPLICATION_AUDIO,
+            self.opus_encoder = self.encoder_profile.create_encoder(
+                AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS
             )
+            logger.info(f"Opus编码参数: {self.encoder_profile.to_dict()}")
             self.opus_decoder = opuslib.Decoder(
                 AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
             )
+            self._jitter_buffer.set_decoder(self.opus_decoder)
+            self._decoder_worker.start()
+
+            # 编码器此后只在编码线程中使用
+            self._encoder_worker.start(
+                self.opus_encoder, asyncio.get_running_loop(), self.encoder_profile
+            )
+            if self.echo_canceller:
+                self.echo_canceller.start()
 
             logger.info("音频设备和编解码器初始化成功")
         except Exception as e:
@@ -104,6 +176,87 @@ class AudioCodec:
             await self.close()
             raise
 
+    def _create_echo_canceller(self, config):
+        """
+        按配置创建回声消除处理线程，APM不可用时返回None（不处理录音）.
+        """
+        if not config.get_config("AUDIO_OPTIONS.AEC.ENABLED", False):
+            return None
+        try:
+            from src.audio_processing.delay_estimator import EchoDelayEstimator
+            from src.audio_processing.echo_canceller import EchoCanceller
+            from src.audio_processing.webrtc_processing import (
+                WebRTCProcessor,
+                apm_load_error,
+            )
+
+            stream_delay_ms = self._initial_stream_delay(config)
+            processor = WebRTCProcessor(
+                sample_rate=AudioConfig.INPUT_SAMPLE_RATE,
+                channels=AudioConfig.CHANNELS,
+                frame_size=AudioConfig.INPUT_SAMPLE_RATE // 100,
+                stream_delay_ms=stream_delay_ms,
+                noise_suppression=config.get_config(
+                    "AUDIO_OPTIONS.AEC.NOISE_SUPPRESSION", True
+                ),
+                gain_control=config.get_config("AUDIO_OPTIONS.AEC.GAIN_CONTROL", True),
+            )
+            if not processor.initialized:
+                # 配置要求回声消除但无法启用时，播放期间的打断和唤醒会明显变差，需要显式提示
+                self.aec_error = apm_load_error or "WebRTC APM初始化失败"
+                logger.warning(
+                    f"已配置AUDIO_OPTIONS.AEC.ENABLED，但回声消除未启用: {self.aec_error}"
+                    f"（{platform.system()} {platform.machine()}），"
+                    f"支持的平台见配置说明中的回声消除一节"
+                )
+                return None
+            delay_estimator = None
+            if config.get_config("AUDIO_OPTIONS.AEC.AUTO_DELAY", True):
+                delay_estimator = EchoDelayEstimator(
+                    AudioConfig.INPUT_SAMPLE_RATE,
+                    stream_delay_ms,
+                    max_delay_ms=config.get_config(
+                        "AUDIO_OPTIONS.AEC.MAX_DELAY_MS", 500
+                    ),
+                )
+            logger.info(f"已启用回声消除（AEC/NS/AGC），初始延迟 {stream_delay_ms}ms")
+            return EchoCanceller(
+                processor,
+                CaptureBus(AudioConfig.INPUT_FRAME_SIZE),
+                self.capture_bus,
+                AudioConfig.INPUT_SAMPLE_RATE,
+                AudioConfig.OUTPUT_SAMPLE_RATE,
+                delay_estimator=delay_estimator,
+            )
+        except Exception as e:
+            self.aec_error = str(e)
+            logger.error(f"创建回声消除失败: {e}")
+            return None
+
+    @staticmethod
+    def _initial_stream_delay(config) -> int:
+        """
+        初始回声路径延迟：优先使用当前设备组合的标定结果，否则使用STREAM_DELAY_MS.
+        """
+        default = config.get_config("AUDIO_OPTIONS.AEC.STREAM_DELAY_MS", 50)
+        calibrated = config.get_config("AUDIO_OPTIONS.AEC.DEVICE_DELAYS", {})
+        if not calibrated:
+            return default
+        try:
+            from src.audio_processing.delay_estimator import device_delay_key
+
+            key = device_delay_key(
+                sd.query_devices(sd.default.device[0])["name"],
+                sd.query_devices(sd.default.device[1])["name"],
+            )
+        except Exception as e:
+            logger.warning(f"查询音频设备失败，使用默认回声延迟: {e}")
+            return default
+        if key in calibrated:
+            logger.info(f"使用设备标定的回声延迟: {key} = {calibrated[key]}ms")
+            return calibrated[key]
+        return default
+
     async def _create_resamplers(self):
         """
         创建输入重采样器，转换设备采样率到16kHz
@@ -163,16 +316,25 @@ class AudioCodec:
     def _input_callback(self, indata, frames, time_info, status):
         """
         录音回调函数
-        处理录音数据，重采样到16kHz并进行Opus编码
+        重采样到16kHz并切分为定长帧，只发布到录音总线，不做编码
         """
-        if status and "overflow" not in str(status).lower():
+        if status and not status.input_overflow:
             logger.warning(f"输入流状态: {status}")
 
         if self._is_closing:
             return
 
+        start = time.perf_counter()
+
+        # 采集延迟：ADC采样到回调执行，用于推算本块数据的采集时间
+        capture_delay = self._stream_delay(
+            time_info.currentTime - time_info.inputBufferAdcTime
+        )
+        self._latency.record("capture", capture_delay)
+        captured_at = time.monotonic() - capture_delay
+
         try:
-            audio_data = indata.copy().flatten()
+            audio_data = indata.reshape(-1)
 
             # 重采样处理
             if self.input_resampler is not None:
@@ -180,65 +342,31 @@ class AudioCodec:
                 if audio_data is None:
                     return
 
-            # 实时编码录音数据
-            if self._encoded_audio_callback and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE:
-                try:
-                    pcm_data = audio_data.astype(np.int16).tobytes()
-                    encoded_data = self.opus_encoder.encode(pcm_data, AudioConfig.INPUT_FRAME_SIZE)
-                    
-                    if encoded_data:
-                        self._encoded_audio_callback(encoded_data)
-                        
-                except Exception as e:
-                    logger.warning(f"实时录音编码失败: {e}")
-
-            # 提供数据给唤醒词检测
-            self._put_audio_data_safe(self._wakeword_buffer, audio_data.copy())
+            # 切分为定长帧，一次回调可能产生零个或多个完整帧
+            for frame in self._input_frame_assembler.push(audio_data):
+                self._mic_bus.publish(frame, captured_at)
 
         except Exception as e:
             logger.error(f"输入回调错误: {e}")
 
+        # 记录回调耗时与溢出，由编码线程汇总告警
+        self._encoder_worker.note_callback(
+            time.perf_counter() - start,
+            frames / self.device_input_sample_rate,
+            bool(status and status.input_overflow),
+        )
+
     def _process_input_resampling(self, audio_data):
         """
         输入音频重采样处理
         将设备采样率转换为16kHz
         """
         try:
-            resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
-            if len(resampled_data) > 0:
-                # 添加到缓冲区
-                self._resample_input_buffer.extend(resampled_data.astype(np.int16))
-
-            # 检查是否有足够数据组成完整帧
-            expected_frame_size = AudioConfig.INPUT_FRAME_SIZE
-            if len(self._resample_input_buffer) < expected_frame_size:
-                return None
-
-            # 取出一帧数据
-            frame_data = []
-            for _ in range(expected_frame_size):
-                frame_data.append(self._resample_input_buffer.popleft())
-
-            return np.array(frame_data, dtype=np.int16)
-
+            return self.input_resampler.resample_chunk(audio_data, last=False)
         except Exception as e:
             logger.error(f"输入重采样失败: {e}")
             return None
 
-    def _put_audio_data_safe(self, queue, audio_data):
-        """
-        安全地将音频数据放入队列
-        """
-        try:
-            queue.put_nowait(audio_data)
-        except asyncio.QueueFull:
-            # 队列满时移除最旧数据
-            try:
-                queue.get_nowait()
-                queue.put_nowait(audio_data)
-            except asyncio.QueueEmpty:
-                queue.put_nowait(audio_data)
-
     def _output_callback(self, outdata: np.ndarray, frames: int, time_info, status):
         """
         播放回调函数
@@ -249,26 +377,63 @@ class AudioCodec:
                 logger.warning(f"输出流状态: {status}")
 
         try:
-            try:
-                # 从输出缓冲区获取音频数据
-                audio_data = self._output_buffer.get_nowait()
-
-                # 写入音频数据
-                if len(audio_data) >= frames:
-                    outdata[:] = audio_data[:frames].reshape(-1, AudioConfig.CHANNELS)
-                else:
-                    outdata[: len(audio_data)] = audio_data.reshape(-1, AudioConfig.CHANNELS)
-                    outdata[len(audio_data) :] = 0
+            # 本块数据到达DAC的时间，用于统计播放延迟
+            dac_time = time.monotonic() + self._stream_delay(
+                time_info.outputBufferDacTime - time_info.currentTime
+            )
 
-            except asyncio.QueueEmpty:
-                # 无数据时输出静音
-                outdata.fill(0)
+            # 混音输出：TTS从抖动缓冲区读取（预缓冲或断流时为静音/补偿帧），
+            # 再叠加音乐、提示音等附加音源
+            count = self.mixer.mix(outdata.reshape(-1), dac_time)
+            # 实际写入声卡的样本作为回声消除的参考信号
+            if self.echo_canceller:
+                self.echo_canceller.write_reference(outdata.reshape(-1))
+            if count:
+                self._playback_end = dac_time + count / AudioConfig.OUTPUT_SAMPLE_RATE
+
+            # 待解码队列和缓冲区都排空时通知等待播放完成的协程
+            if (
+                self._drain_waiter_armed
+                and self._jitter_buffer.queued_samples == 0
+                and self._decoder_worker.pending == 0
+            ):
+                self._notify_drain_waiter()
 
         except Exception as e:
             logger.error(f"输出回调错误: {e}")
             outdata.fill(0)
 
 
+    def _notify_drain_waiter(self):
+        """
+        唤醒等待播放缓冲区排空的协程（播放回调中调用）.
+        """
+        self._drain_waiter_armed = False
+        loop = self._drain_loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake_drain_waiter)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    def _wake_drain_waiter(self):
+        """
+        在事件循环中完成排空等待Future.
+        """
+        waiter = self._drain_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+
+    @staticmethod
+    def _stream_delay(delay: float) -> float:
+        """
+        校验PortAudio时间戳差值，部分后端不提供时间戳（为0）时返回0
+        """
+        if 0.0 <= delay < 1.0:
+            return delay
+        return 0.0
+
     def _input_finished_callback(self):
         """
         输入流结束回调
@@ -373,124 +538,214 @@ class AudioCodec:
         await self.reinitialize_stream(is_input=False) # 重建输出流
         logger.info("音频设备资源已重新获取")
 
-    async def get_raw_audio_for_detection(self) -> Optional[bytes]:
+    def create_output_source(
+        self, name: str, gain: float = 1.0, duckable: bool = True
+    ) -> PcmSource:
         """
-        获取唤醒词检测用的原始音频数据
-        
-        从专用队列获取数据，与录音编码独立运行，
-        避免数据竞争问题。
+        创建播放混音器的附加音源（音乐、提示音等），与TTS共用同一个输出流
+
+        Args:
+            name: 音源名称，同名音源会被替换
+            gain: 音源增益
+            duckable: TTS播放时是否自动压低音量
 
         Returns:
-            Optional[bytes]: PCM格式音频数据，无数据时返回None
+            PcmSource: 24kHz单声道PCM音源
         """
-        try:
-            if self._wakeword_buffer.empty():
-                return None
+        return self.mixer.create_source(name, gain, duckable)
 
-            audio_data = self._wakeword_buffer.get_nowait()
+    async def play_sound(self, file_path, wait: bool = False) -> bool:
+        """
+        通过混音器播放WAV提示音，不再启动外部播放进程
 
-            # 转换为bytes格式
-            if hasattr(audio_data, "tobytes"):
-                return audio_data.tobytes()
-            elif hasattr(audio_data, "astype"):
-                return audio_data.astype("int16").tobytes()
-            else:
-                return audio_data
+        Args:
+            file_path: WAV文件路径
+            wait: 是否等待播放完成
 
-        except asyncio.QueueEmpty:
-            return None
+        Returns:
+            bool: 是否成功开始播放
+        """
+        try:
+            samples = await asyncio.to_thread(self._load_wav, str(file_path))
         except Exception as e:
-            logger.error(f"获取唤醒词音频数据失败: {e}")
-            return None
+            logger.error(f"加载提示音失败 {file_path}: {e}")
+            return False
+
+        source = self.mixer.get_source("cue") or self.create_output_source(
+            "cue", duckable=False
+        )
+        source.play(samples)
+        if wait:
+            await asyncio.sleep(len(samples) / AudioConfig.OUTPUT_SAMPLE_RATE)
+        return True
+
+    @staticmethod
+    def _load_wav(file_path: str) -> np.ndarray:
+        """
+        读取WAV文件并转换为24kHz单声道int16
+        """
+        with wave.open(file_path, "rb") as wav:
+            sample_width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+
+        if sample_width == 2:
+            samples = np.frombuffer(raw, dtype=np.int16)
+        elif sample_width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8
+        elif sample_width == 4:
+            samples = (np.frombuffer(raw, dtype=np.int32) >> 16).astype(np.int16)
+        else:
+            raise ValueError(f"不支持的WAV采样位宽: {sample_width * 8}bit")
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+
+        if sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
+            samples = soxr.resample(
+                samples, sample_rate, AudioConfig.OUTPUT_SAMPLE_RATE, quality="HQ"
+            ).astype(np.int16)
+        return samples
+
+    def set_encoder_profile(self, **changes) -> OpusEncoderProfile:
+        """
+        运行时调整编码参数，如set_encoder_profile(dtx=True, bitrate=16000)
+        应用类型变化时重建编码器，其余参数直接作用于当前编码器；
+        更新在编码线程下一批编码前生效，并重置编码统计以便对比
+
+        Returns:
+            OpusEncoderProfile: 更新后的编码参数
+        """
+        profile = self.encoder_profile.with_changes(**changes)
+        encoder = None
+        if profile.application != self.encoder_profile.application:
+            encoder = profile.create_encoder(
+                AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+            )
+            self.opus_encoder = encoder
+
+        self.encoder_profile = profile
+        self._encoder_worker.update_encoder(profile, encoder)
+        return profile
 
     def set_encoded_audio_callback(self, callback):
         """
         设置编码后音频数据的回调函数
-        
-        启用实时编码模式，录音回调中直接编码并传递，
-        消除轮询延迟，提升录音实时性。
-        
+
+        录音回调只复制PCM，编码线程完成编码后按批次调度到事件循环，
+        回调函数在事件循环线程中被调用。
+
         Args:
             callback: 回调函数，接收编码数据参数，None时禁用实时编码
         """
-        self._encoded_audio_callback = callback
-        
+        self._encoder_worker.set_callback(callback)
+
         if callback:
-            logger.info("✓ 启用实时录音编码模式 - 录音回调直接编码传递")
+            logger.info("✓ 启用实时录音编码模式 - 编码线程批量投递到事件循环")
         else:
             logger.info("✓ 禁用录音编码回调")
 
-    async def write_audio(self, opus_data: bytes):
-        """
-        解码Opus音频数据并放入播放队列
-        输出24kHz PCM数据，直接用于播放
+    def submit_audio(
+        self,
+        opus_data: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ) -> bool:
         """
-        try:
-            # Opus解码为24kHz PCM数据
-            pcm_data = self.opus_decoder.decode(
-                opus_data, AudioConfig.OUTPUT_FRAME_SIZE
-            )
+        提交Opus音频数据到解码线程（不阻塞、不创建任务）
+        解码后的24kHz PCM直接写入播放抖动缓冲区，丢包时由抖动缓冲区补偿
 
-            audio_array = np.frombuffer(pcm_data, dtype=np.int16)
+        Args:
+            opus_data: Opus数据包
+            sequence: 可选的数据包序列号，用于丢包检测
+            arrival: 数据包到达时间（time.monotonic），用于抖动与延迟统计
 
-            # 验证数据长度
-            expected_length = AudioConfig.OUTPUT_FRAME_SIZE * AudioConfig.CHANNELS
-            if len(audio_array) != expected_length:
-                logger.warning(f"解码音频长度异常: {len(audio_array)}, 期望: {expected_length}")
-                return
+        Returns:
+            bool: 是否进入待解码队列
+        """
+        return self._decoder_worker.submit(opus_data, sequence, arrival)
 
-            # 放入播放缓冲区
-            self._put_audio_data_safe(self._output_buffer, audio_array)
+    async def write_audio(
+        self,
+        opus_data: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ):
+        """
+        解码Opus音频数据并放入播放抖动缓冲区（submit_audio的协程版本）
+        """
+        self.submit_audio(opus_data, sequence, arrival)
 
-        except opuslib.OpusError as e:
-            logger.warning(f"Opus解码失败，丢弃此帧: {e}")
-        except Exception as e:
-            logger.warning(f"音频写入失败，丢弃此帧: {e}")
+    def get_playback_remaining(self) -> float:
+        """
+        剩余播放时长（秒）：待解码数据包 + 缓冲区中排队的样本 + 已送入设备尚未离开DAC的部分.
+        """
+        queued = (
+            self._jitter_buffer.queued_samples / AudioConfig.OUTPUT_SAMPLE_RATE
+            + self._decoder_worker.pending * AudioConfig.FRAME_DURATION / 1000
+        )
+        in_device = max(0.0, self._playback_end - time.monotonic())
+        return queued + in_device
 
-    async def wait_for_audio_complete(self, timeout=10.0):
+    async def wait_for_audio_complete(self, timeout=10.0) -> bool:
         """
-        等待音频播放完成
+        等待音频播放完成：先等待播放缓冲区排空（由播放回调通知），
+        再按DAC时间戳等待最后一个样本真正离开设备
+
+        Returns:
+            bool: 是否在超时前播放完成
         """
-        start = time.time()
-        
-        # 等待播放队列清空
-        while not self._output_buffer.empty() and time.time() - start < timeout:
-            await asyncio.sleep(0.05)
-        
-        # 额外等待确保最后的音频播放完成
-        await asyncio.sleep(0.3)
-        
-        # 检查超时情况
-        if not self._output_buffer.empty():
-            output_remaining = self._output_buffer.qsize()
-            logger.warning(
-                f"音频播放超时，剩余队列 - 输出: {output_remaining} 帧"
-            )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        # 等待待解码队列和播放缓冲区排空
+        while self._decoder_worker.pending > 0 or self._jitter_buffer.queued_samples > 0:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                output_remaining = (
+                    self._jitter_buffer.queued_samples // AudioConfig.OUTPUT_FRAME_SIZE
+                )
+                logger.warning(f"音频播放超时，剩余队列 - 输出: {output_remaining} 帧")
+                return False
+
+            self._drain_loop = loop
+            self._drain_waiter = loop.create_future()
+            self._drain_waiter_armed = True
+            # 设置等待标志后再检查一次，避免错过播放回调的通知
+            if (
+                self._decoder_worker.pending == 0
+                and self._jitter_buffer.queued_samples == 0
+            ):
+                break
+            try:
+                await asyncio.wait_for(self._drain_waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._drain_waiter_armed = False
+                self._drain_waiter = None
+
+        # 等待设备中剩余的样本离开DAC
+        tail = min(self._playback_end - time.monotonic(), deadline - loop.time())
+        if tail > 0:
+            await asyncio.sleep(tail)
+        return True
 
     async def clear_audio_queue(self):
         """
         清空音频队列
         """
-        cleared_count = 0
+        # 清空录音总线各订阅者积压与播放缓冲区（按帧统计丢弃数量）
+        cleared_count = (
+            self._mic_bus.clear()
+            + (self.capture_bus.clear() if self.echo_canceller else 0)
+            + self._decoder_worker.clear()
+            + self._jitter_buffer.clear() // AudioConfig.OUTPUT_FRAME_SIZE
+        )
 
-        # 清空所有队列
-        queues_to_clear = [
-            self._wakeword_buffer,
-            self._output_buffer,
-        ]
-
-        for queue in queues_to_clear:
-            while not queue.empty():
-                try:
-                    queue.get_nowait()
-                    cleared_count += 1
-                except asyncio.QueueEmpty:
-                    break
-
-        # 清空重采样缓冲区
-        if self._resample_input_buffer:
-            cleared_count += len(self._resample_input_buffer)
-            self._resample_input_buffer.clear()
+        # 清空帧组装器中不完整的帧
+        self._input_frame_assembler.clear()
 
         # 等待正在处理的音频数据完成
         await asyncio.sleep(0.01)
@@ -498,10 +753,19 @@ class AudioCodec:
         if cleared_count > 0:
             logger.info(f"清空音频队列，丢弃 {cleared_count} 帧音频数据")
 
-        # 数据量大时执行垃圾回收
-        if cleared_count > 100:
-            gc.collect()
-            logger.debug("执行垃圾回收以释放内存")
+    def get_buffer_stats(self) -> dict:
+        """
+        获取音频缓冲区统计信息（录音总线订阅者积压与丢帧、编解码耗时、抖动缓冲延迟与补帧）.
+        """
+        return {
+            "capture": self.capture_bus.get_stats(),
+            "encoder": self._encoder_worker.get_stats(),
+            "decoder": self._decoder_worker.get_stats(),
+            "output": self._jitter_buffer.get_stats(),
+            "mixer": self.mixer.get_stats(),
+            "aec": self.echo_canceller.get_stats() if self.echo_canceller else None,
+            "aec_error": self.aec_error,
+        }
 
     async def start_streams(self):
         """
@@ -592,10 +856,15 @@ class AudioCodec:
             await self._cleanup_resampler(self.input_resampler, "输入")
             self.input_resampler = None
 
-            # 清理重采样缓冲区
-            self._resample_input_buffer.clear()
+            # 清理帧组装器
+            self._input_frame_assembler.clear()
 
-            # 清理编解码器
+            # 停止编解码线程后再清理编解码器
+            if self.echo_canceller:
+                self.echo_canceller.stop()
+                self.echo_canceller.processor.close()
+            self._encoder_worker.stop()
+            self._decoder_worker.stop()
             self.opus_encoder = None
             self.opus_decoder = None
 
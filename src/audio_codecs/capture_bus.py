@@ -0,0 +1,334 @@
+"""共享录音总线.
+
+麦克风只由AudioCodec打开一次，重采样到16kHz并切分为定长帧后发布到总线：
+1. 每帧只复制一次到预分配的帧环，订阅者拿到的是同一块内存的只读视图
+2. 每个订阅者有独立的读游标、积压上限和丢帧策略，互不影响
+3. 订阅者可以在线程中阻塞等待，也可以在事件循环中await等待
+4. 每帧附带采集时间（time.monotonic），供延迟统计和时间相关逻辑使用
+
+新增订阅者不会增加设备I/O，也不会增加数据复制。
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 积压超限时丢弃最旧的帧，只保留最近max_backlog帧
+DROP_OLDEST = "drop_oldest"
+# 积压超限时丢弃全部积压，从最新一帧继续
+SKIP_TO_LATEST = "skip_to_latest"
+
+CaptureFrame = Tuple[np.ndarray, float]
+
+
+class CaptureSubscriber:
+    """
+    录音总线的订阅者.
+
+    读游标只由订阅者自己的消费线程修改；clear()可以在任意线程调用，
+    通过丢弃序号在下次读取时生效。返回的帧视图只读，在总线写满一圈
+    （约capacity - max_backlog帧）之前有效，需要长期保存时请自行复制。
+    """
+
+    def __init__(self, bus: "CaptureBus", name: str, max_backlog: int, policy: str):
+        self.bus = bus
+        self.name = name
+        self.max_backlog = max_backlog
+        self.policy = policy
+
+        # 下一个待读帧序号，订阅时从当前最新帧开始
+        self._cursor = bus.frames_published
+        self._discard_seq = self._cursor
+
+        # 统计计数
+        self.delivered = 0
+        self.dropped = 0
+
+        # 线程侧等待
+        self._event = threading.Event()
+
+        # 事件循环侧等待
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._waiter_armed = False
+
+    @property
+    def pending(self) -> int:
+        """
+        尚未读取的帧数（不超过积压上限）.
+        """
+        start = max(self._cursor, self._discard_seq)
+        return min(self.bus.frames_published - start, self.max_backlog)
+
+    def read(self) -> Optional[CaptureFrame]:
+        """读取一帧.
+
+        Returns:
+            Optional[CaptureFrame]: (只读帧视图, 采集时间)，无数据时返回None
+        """
+        cursor = self._apply_backlog_limit()
+        if cursor >= self.bus.frames_published:
+            return None
+
+        self._cursor = cursor + 1
+        self.delivered += 1
+        return self.bus._slot(cursor)
+
+    def drain(self, max_frames: Optional[int] = None) -> List[CaptureFrame]:
+        """一次读取所有（或最多max_frames个）待读帧.
+
+        Returns:
+            List[CaptureFrame]: 按采集顺序排列的帧列表
+        """
+        cursor = self._apply_backlog_limit()
+        end = self.bus.frames_published
+        if max_frames is not None:
+            end = min(end, cursor + max_frames)
+        if cursor >= end:
+            return []
+
+        frames = [self.bus._slot(seq) for seq in range(cursor, end)]
+        self._cursor = end
+        self.delivered += end - cursor
+        return frames
+
+    def clear(self) -> int:
+        """丢弃所有待读帧，任意线程均可调用.
+
+        Returns:
+            int: 丢弃的帧数
+        """
+        discarded = self.pending
+        self._discard_seq = self.bus.frames_published
+        return discarded
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """在线程中等待新帧.
+
+        Returns:
+            bool: 是否有待读帧
+        """
+        if self.pending > 0:
+            return True
+        self._event.clear()
+        # 清除标志后再检查一次，避免错过发布通知
+        if self.pending > 0:
+            return True
+        self._event.wait(timeout)
+        return self.pending > 0
+
+    async def wait_async(self, timeout: Optional[float] = None) -> bool:
+        """在事件循环中等待新帧.
+
+        Returns:
+            bool: 是否有待读帧，超时返回False
+        """
+        if self.pending > 0:
+            return True
+
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._waiter = loop.create_future()
+        self._waiter_armed = True
+
+        # 设置等待标志后再检查一次，避免错过发布通知
+        if self.pending > 0:
+            self._waiter_armed = False
+            self._waiter = None
+            return True
+
+        try:
+            await asyncio.wait_for(self._waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiter_armed = False
+            self._waiter = None
+        return self.pending > 0
+
+    def wake(self):
+        """
+        唤醒等待中的消费者（如停止时），任意线程均可调用.
+        """
+        self._event.set()
+        self._notify_waiter()
+
+    def get_stats(self) -> dict:
+        """
+        获取订阅者统计信息.
+        """
+        return {
+            "pending": self.pending,
+            "max_backlog": self.max_backlog,
+            "policy": self.policy,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    def _apply_backlog_limit(self) -> int:
+        """
+        应用清空请求和积压上限，返回有效读游标.
+        """
+        cursor = max(self._cursor, self._discard_seq)
+        published = self.bus.frames_published
+        backlog = published - cursor
+        if backlog > self.max_backlog:
+            keep = self.max_backlog if self.policy == DROP_OLDEST else 1
+            skip = backlog - keep
+            self.dropped += skip
+            cursor += skip
+        self._cursor = cursor
+        return cursor
+
+    def _notify(self):
+        """
+        发布新帧时由生产者调用.
+        """
+        self._event.set()
+        if self._waiter_armed:
+            self._notify_waiter()
+
+    def _notify_waiter(self):
+        """
+        唤醒事件循环侧的等待者（仅在有等待者时才跨线程调度）.
+        """
+        self._waiter_armed = False
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake_waiter)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    def _wake_waiter(self):
+        """
+        在事件循环中完成等待Future.
+        """
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+
+
+class CaptureBus:
+    """
+    单生产者、多订阅者的16kHz录音帧总线.
+    """
+
+    # 帧环中为读者保留的安全余量（帧数），积压上限不会超过capacity - GUARD_FRAMES
+    GUARD_FRAMES = 4
+
+    def __init__(self, frame_size: int, capacity_frames: int = 128):
+        """初始化录音总线.
+
+        Args:
+            frame_size: 每帧样本数
+            capacity_frames: 帧环容量（帧数）
+        """
+        if capacity_frames <= self.GUARD_FRAMES:
+            raise ValueError("录音总线容量过小")
+
+        self.frame_size = frame_size
+        self.capacity = capacity_frames
+        self._frames = np.zeros((capacity_frames, frame_size), dtype=np.int16)
+        self._timestamps = np.zeros(capacity_frames, dtype=np.float64)
+
+        # 预先生成每个槽位的只读视图，读取时不再创建新对象
+        self._views = []
+        for slot in self._frames:
+            view = slot.view()
+            view.flags.writeable = False
+            self._views.append(view)
+
+        # 已发布帧数（单调递增），只由生产者修改
+        self.frames_published = 0
+        # 订阅者表在事件循环/线程中修改，发布时读取快照
+        self._subscribers: Dict[str, CaptureSubscriber] = {}
+        self._subscriber_list: Tuple[CaptureSubscriber, ...] = ()
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, name: str, max_backlog: int = 50, policy: str = DROP_OLDEST
+    ) -> CaptureSubscriber:
+        """注册订阅者，同名订阅者会被替换.
+
+        Args:
+            name: 订阅者名称
+            max_backlog: 最多积压的帧数
+            policy: 积压超限时的丢帧策略（DROP_OLDEST或SKIP_TO_LATEST）
+
+        Returns:
+            CaptureSubscriber: 订阅者
+        """
+        if policy not in (DROP_OLDEST, SKIP_TO_LATEST):
+            raise ValueError(f"未知的丢帧策略: {policy}")
+
+        max_backlog = max(1, min(max_backlog, self.capacity - self.GUARD_FRAMES))
+        subscriber = CaptureSubscriber(self, name, max_backlog, policy)
+        with self._lock:
+            old = self._subscribers.get(name)
+            self._subscribers[name] = subscriber
+            self._subscriber_list = tuple(self._subscribers.values())
+        if old is not None:
+            old.wake()
+        logger.debug(f"录音总线新增订阅者: {name} (积压上限 {max_backlog} 帧, {policy})")
+        return subscriber
+
+    def unsubscribe(self, subscriber: CaptureSubscriber):
+        """
+        注销订阅者，并唤醒其等待中的消费者.
+        """
+        with self._lock:
+            if self._subscribers.get(subscriber.name) is subscriber:
+                del self._subscribers[subscriber.name]
+                self._subscriber_list = tuple(self._subscribers.values())
+        subscriber.wake()
+        logger.debug(f"录音总线移除订阅者: {subscriber.name}")
+
+    def publish(self, frame: np.ndarray, captured_at: float):
+        """发布一帧（生产者侧，录音回调中调用）.
+
+        Args:
+            frame: 一维int16定长帧
+            captured_at: 采集时间（time.monotonic）
+        """
+        slot = self.frames_published % self.capacity
+        self._frames[slot] = frame
+        self._timestamps[slot] = captured_at
+        self.frames_published += 1
+
+        for subscriber in self._subscriber_list:
+            subscriber._notify()
+
+    def clear(self) -> int:
+        """丢弃所有订阅者的待读帧.
+
+        Returns:
+            int: 各订阅者丢弃帧数之和
+        """
+        return sum(sub.clear() for sub in self._subscriber_list)
+
+    def get_stats(self) -> dict:
+        """
+        获取总线及各订阅者统计信息.
+        """
+        return {
+            "frames_published": self.frames_published,
+            "capacity": self.capacity,
+            "subscribers": {
+                sub.name: sub.get_stats() for sub in self._subscriber_list
+            },
+        }
+
+    def _slot(self, seq: int) -> CaptureFrame:
+        """
+        返回序号为seq的帧视图和采集时间.
+        """
+        slot = seq % self.capacity
+        return self._views[slot], float(self._timestamps[slot])
@@ -0,0 +1,239 @@
+"""Opus解码工作线程.
+
+服务端下发TTS的速度快于实时播放，一次会突发几十个数据包：
+1. 接收侧只把数据包放入队列，不创建asyncio任务，不在事件循环中解码
+2. 解码线程按批次取出数据包，解码后的PCM直接写入播放抖动缓冲区
+3. 播放缓冲区空间不足时解码线程等待（背压），待解码队列超限时丢弃并计数
+4. 统计每帧解码耗时和批次大小
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from src.audio_codecs.jitter_buffer import JitterBuffer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OpusDecoderWorker:
+    """
+    独立线程中的Opus解码器，向JitterBuffer供数.
+
+    submit可在事件循环或协议接收线程中调用；clear通过代数计数让
+    解码线程丢弃正在处理的批次。代数、在途计数和写入播放缓冲区由同一把锁保护，
+    clear返回后不会再有旧代数的数据包写入播放缓冲区。
+    """
+
+    def __init__(
+        self, jitter_buffer: JitterBuffer, max_pending: int = 1000, batch_size: int = 32
+    ):
+        """初始化解码工作线程.
+
+        Args:
+            jitter_buffer: 播放抖动缓冲区
+            max_pending: 待解码队列上限（数据包数），超过时丢弃新包
+            batch_size: 每批最多解码的数据包数
+        """
+        self.jitter_buffer = jitter_buffer
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        # 待解码队列：(数据包, 序列号, 到达时间)，deque的append/popleft线程安全
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # 已取出但尚未写入播放缓冲区的数据包数
+        self._in_flight = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wakeup = threading.Event()
+
+        # 统计计数
+        self.submitted = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.backpressure_waits = 0
+        self.decode_time_total = 0.0
+        self.decode_time_max = 0.0
+
+    @property
+    def pending(self) -> int:
+        """
+        待解码的数据包数（含正在解码的批次）.
+        """
+        return len(self._queue) + self._in_flight
+
+    def start(self):
+        """
+        启动解码线程.
+        """
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="OpusDecoder", daemon=True
+        )
+        self._thread.start()
+        logger.info("Opus解码线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        """
+        停止解码线程并丢弃未解码数据.
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        self.clear()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        logger.info("Opus解码线程已停止")
+
+    def submit(
+        self,
+        opus_data: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ) -> bool:
+        """提交一个待解码数据包（不阻塞，不创建任务）.
+
+        Args:
+            opus_data: Opus数据包
+            sequence: 可选的数据包序列号
+            arrival: 到达时间（time.monotonic），默认取当前时间
+
+        Returns:
+            bool: 是否进入待解码队列
+        """
+        if not self._running:
+            return False
+
+        if len(self._queue) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped % 50 == 1:
+                logger.warning(f"待解码队列已满，丢弃数据包（累计 {self.dropped} 个）")
+            return False
+
+        if arrival is None:
+            arrival = time.monotonic()
+        self._queue.append((opus_data, sequence, arrival))
+        self.submitted += 1
+        self._wakeup.set()
+        return True
+
+    def clear(self) -> int:
+        """丢弃所有待解码数据包，正在解码的批次也会被放弃.
+
+        Returns:
+            int: 丢弃的数据包数
+        """
+        with self._lock:
+            self._generation += 1
+            cleared = self._in_flight
+            self._in_flight = 0
+            while True:
+                try:
+                    self._queue.popleft()
+                except IndexError:
+                    break
+                cleared += 1
+        return cleared
+
+    def get_stats(self) -> dict:
+        """
+        获取解码线程统计信息.
+        """
+        frames = max(self.decoded, 1)
+        return {
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "backpressure_waits": self.backpressure_waits,
+            "decode_avg_ms": round(self.decode_time_total * 1000 / frames, 3),
+            "decode_max_ms": round(self.decode_time_max * 1000, 3),
+        }
+
+    def _run(self):
+        """
+        解码线程主循环：等待数据包，按批次解码写入播放缓冲区.
+        """
+        while self._running:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+
+            while self._running and self._queue:
+                self._decode_batch()
+
+    def _decode_batch(self):
+        """
+        取出一批数据包并依次解码.
+        """
+        # 取批次与clear互斥，批次中的数据包都属于同一代
+        with self._lock:
+            generation = self._generation
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.popleft())
+                except IndexError:
+                    break
+            if not batch:
+                return
+            self._in_flight = len(batch)
+
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+
+        for opus_data, sequence, arrival in batch:
+            if not self._wait_for_space(generation):
+                return
+
+            start = time.perf_counter()
+            with self._lock:
+                # 等待期间被clear时整批丢弃，已中止的音频不再写入播放缓冲区
+                if generation != self._generation:
+                    return
+                try:
+                    self.jitter_buffer.put_packet(opus_data, sequence, arrival)
+                except Exception as e:
+                    logger.warning(f"音频解码失败，丢弃此帧: {e}")
+                    continue
+                finally:
+                    # 写入播放缓冲区后才从待解码计数中移除
+                    self._in_flight = max(0, self._in_flight - 1)
+            elapsed = time.perf_counter() - start
+
+            self.decoded += 1
+            self.decode_time_total += elapsed
+            if elapsed > self.decode_time_max:
+                self.decode_time_max = elapsed
+
+    def _wait_for_space(self, generation: int) -> bool:
+        """背压：播放缓冲区放不下一帧时等待播放消耗.
+
+        Returns:
+            bool: 是否可以继续解码（停止或被清空时返回False）
+        """
+        ring = self.jitter_buffer.ring
+        frame_size = self.jitter_buffer.frame_size
+        waited = False
+        while ring.free < frame_size:
+            if not self._running or generation != self._generation:
+                return False
+            if not waited:
+                self.backpressure_waits += 1
+                waited = True
+            time.sleep(self.jitter_buffer.frame_duration)
+        return self._running and generation == self._generation
@@ -0,0 +1,138 @@
+"""Opus编码参数配置.
+
+从AUDIO_OPTIONS.OPUS_ENCODER读取编码参数，在初始化和运行时应用到编码器：
+应用类型(VOIP/AUDIO)、码率、VBR、复杂度、DTX、带内FEC和预期丢包率。
+默认值与原先的APPLICATION_AUDIO + libopus默认参数一致。
+"""
+
+from dataclasses import asdict, dataclass, replace
+from typing import Union
+
+import opuslib
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# libopus中OPUS_AUTO的取值，码率为AUTO时由编码器自行决定
+OPUS_AUTO = -1000
+
+APPLICATIONS = {
+    "VOIP": opuslib.APPLICATION_VOIP,
+    "AUDIO": opuslib.APPLICATION_AUDIO,
+}
+
+
+@dataclass(frozen=True)
+class OpusEncoderProfile:
+    """
+    Opus编码参数.
+    """
+
+    application: str = "AUDIO"
+    bitrate: Union[int, str] = "AUTO"
+    vbr: bool = True
+    complexity: int = 10
+    dtx: bool = False
+    inband_fec: bool = False
+    packet_loss_perc: int = 0
+
+    @classmethod
+    def from_config(cls) -> "OpusEncoderProfile":
+        """
+        从配置文件读取编码参数.
+        """
+        config = ConfigManager.get_instance()
+        prefix = "AUDIO_OPTIONS.OPUS_ENCODER"
+        default = cls()
+        return cls(
+            application=config.get_config(f"{prefix}.APPLICATION", default.application),
+            bitrate=config.get_config(f"{prefix}.BITRATE", default.bitrate),
+            vbr=config.get_config(f"{prefix}.VBR", default.vbr),
+            complexity=config.get_config(f"{prefix}.COMPLEXITY", default.complexity),
+            dtx=config.get_config(f"{prefix}.DTX", default.dtx),
+            inband_fec=config.get_config(f"{prefix}.INBAND_FEC", default.inband_fec),
+            packet_loss_perc=config.get_config(
+                f"{prefix}.PACKET_LOSS_PERC", default.packet_loss_perc
+            ),
+        ).normalized()
+
+    def normalized(self) -> "OpusEncoderProfile":
+        """
+        校验并修正参数范围，非法值回退到默认值.
+        """
+        application = str(self.application).upper()
+        if application not in APPLICATIONS:
+            logger.warning(f"未知的Opus应用类型 {self.application}，使用AUDIO")
+            application = "AUDIO"
+
+        bitrate = self.bitrate
+        if isinstance(bitrate, str) and bitrate.upper() == "AUTO":
+            bitrate = "AUTO"
+        else:
+            try:
+                # libopus支持的码率范围为6kbps - 510kbps
+                bitrate = max(6000, min(510000, int(bitrate)))
+            except (TypeError, ValueError):
+                logger.warning(f"无效的Opus码率 {self.bitrate}，使用AUTO")
+                bitrate = "AUTO"
+
+        return replace(
+            self,
+            application=application,
+            bitrate=bitrate,
+            vbr=bool(self.vbr),
+            complexity=max(0, min(10, int(self.complexity))),
+            dtx=bool(self.dtx),
+            inband_fec=bool(self.inband_fec),
+            packet_loss_perc=max(0, min(100, int(self.packet_loss_perc))),
+        )
+
+    def with_changes(self, **changes) -> "OpusEncoderProfile":
+        """
+        返回修改部分参数后的新配置.
+        """
+        return replace(self, **changes).normalized()
+
+    @property
+    def application_id(self) -> int:
+        """
+        libopus应用类型常量.
+        """
+        return APPLICATIONS[self.application]
+
+    def create_encoder(self, sample_rate: int, channels: int):
+        """
+        按配置创建并设置编码器.
+        """
+        encoder = opuslib.Encoder(sample_rate, channels, self.application_id)
+        self.apply(encoder)
+        return encoder
+
+    def apply(self, encoder):
+        """将参数应用到已有编码器（应用类型除外，需重建编码器）.
+
+        Args:
+            encoder: opuslib.Encoder实例
+        """
+        encoder.bitrate = OPUS_AUTO if self.bitrate == "AUTO" else self.bitrate
+        encoder.vbr = int(self.vbr)
+        encoder.complexity = self.complexity
+        # opuslib的Encoder没有dtx属性（_set_dtx也传错了ctl），直接调用底层ctl
+        opuslib.api.encoder.encoder_ctl(
+            encoder.encoder_state, opuslib.api.ctl.set_dtx, int(self.dtx)
+        )
+        # opuslib的inband_fec属性setter会忽略传入值，直接调用底层ctl
+        opuslib.api.encoder.encoder_ctl(
+            encoder.encoder_state,
+            opuslib.api.ctl.set_inband_fec,
+            int(self.inband_fec),
+        )
+        encoder.packet_loss_perc = self.packet_loss_perc
+
+    def to_dict(self) -> dict:
+        """
+        转换为字典，用于统计和日志.
+        """
+        return asdict(self)
@@ -0,0 +1,344 @@
+"""Opus编码工作线程.
+
+录音回调只负责把16kHz定长帧发布到录音总线，编码线程作为总线订阅者完成编码：
+1. 回调线程不再执行Opus编码，慢速SoC上不会因编码耗时导致输入溢出
+2. 编码结果按批次一次性调度到事件循环，减少跨线程调度次数
+3. 统计编码耗时、回调超时（deadline miss）和输入溢出次数
+4. 按帧记录采集时间，向延迟统计上报encode/dispatch阶段耗时
+5. 支持运行时更换编码参数，统计码率、DTX帧数和编码CPU占用，便于对比不同参数
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from src.audio_codecs.capture_bus import DROP_OLDEST, CaptureBus, CaptureSubscriber
+from src.audio_codecs.encoder_profile import OpusEncoderProfile
+from src.constants.constants import AudioConfig
+from src.utils.latency_monitor import LatencyMonitor
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OpusEncoderWorker:
+    """
+    独立线程中的Opus编码器.
+
+    设置编码回调后订阅录音总线，编码线程读取帧视图并编码，
+    编码后的数据包在事件循环中按顺序交给回调函数。
+    录音回调只调用note_callback记录自身耗时与溢出。
+    """
+
+    # 回调异常告警的最小间隔（秒），避免刷屏
+    WARN_INTERVAL = 5.0
+
+    # 开启DTX时，不超过该长度的数据包为静音帧（只含TOC等少量字节）
+    DTX_PACKET_BYTES = 2
+
+    def __init__(self, capture_bus: CaptureBus, max_backlog: int = 50):
+        """初始化编码工作线程.
+
+        Args:
+            capture_bus: 录音总线
+            max_backlog: 最多积压的待编码帧数
+        """
+        self.capture_bus = capture_bus
+        self.frame_size = capture_bus.frame_size
+        self.max_backlog = max_backlog
+        self._subscription: Optional[CaptureSubscriber] = None
+        self._latency = LatencyMonitor.get_instance()
+
+        self._encoder = None
+        self.profile: Optional[OpusEncoderProfile] = None
+        # 运行时更新：由事件循环设置，编码线程在下一批编码前应用
+        self._pending_encoder = None
+        self._pending_profile: Optional[OpusEncoderProfile] = None
+        self._callback: Optional[Callable[[bytes], None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wakeup = threading.Event()
+
+        # 编码统计
+        self.reset_stats()
+
+        # 录音回调健康统计（由回调线程更新）
+        self.callbacks = 0
+        self.deadline_misses = 0
+        self.input_overflows = 0
+        self.callback_time_max = 0.0
+        self._reported_misses = 0
+        self._reported_overflows = 0
+        self._last_warn_time = 0.0
+
+    def reset_stats(self):
+        """
+        重置编码统计（切换编码参数时调用，使统计只反映当前参数）.
+        """
+        self.frames_encoded = 0
+        self.batches = 0
+        self.encode_errors = 0
+        self.encode_time_total = 0.0
+        self.encode_time_max = 0.0
+        self.encode_cpu_total = 0.0
+        self.bytes_encoded = 0
+        self.dtx_frames = 0
+
+    @property
+    def running(self) -> bool:
+        """
+        编码线程是否在运行.
+        """
+        return self._running
+
+    def start(
+        self,
+        encoder,
+        loop: asyncio.AbstractEventLoop,
+        profile: Optional[OpusEncoderProfile] = None,
+    ):
+        """启动编码线程.
+
+        Args:
+            encoder: Opus编码器，此后只在编码线程中使用
+            loop: 接收编码结果的事件循环
+            profile: 编码器当前使用的编码参数
+        """
+        if self._running:
+            return
+
+        self._encoder = encoder
+        self.profile = profile
+        self._loop = loop
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="OpusEncoder", daemon=True
+        )
+        self._thread.start()
+        logger.info("Opus编码线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        """
+        停止编码线程并丢弃未编码数据.
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        self._wakeup.set()
+        if self._subscription is not None:
+            self._subscription.wake()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        self._encoder = None
+        logger.info("Opus编码线程已停止")
+
+    def update_encoder(self, profile: OpusEncoderProfile, encoder=None):
+        """运行时更新编码参数（事件循环中调用），在编码线程下一批编码前生效.
+
+        Args:
+            profile: 新的编码参数
+            encoder: 按新参数创建的编码器，应用类型变化时需要重建，否则为None
+        """
+        self._pending_encoder = encoder
+        self._pending_profile = profile
+        self._wakeup.set()
+
+    def set_callback(self, callback: Optional[Callable[[bytes], None]]):
+        """设置编码数据回调（在事件循环中调用）.
+
+        Args:
+            callback: 接收单个Opus数据包，None表示停止编码并取消订阅
+        """
+        self._callback = callback
+        if callback is not None and self._subscription is None:
+            self._subscription = self.capture_bus.subscribe(
+                "encoder", self.max_backlog, DROP_OLDEST
+            )
+        elif callback is None and self._subscription is not None:
+            self.capture_bus.unsubscribe(self._subscription)
+            self._subscription = None
+        self._wakeup.set()
+
+    def note_callback(self, duration: float, budget: float, overflow: bool):
+        """记录一次录音回调的耗时与状态（录音回调中调用）.
+
+        Args:
+            duration: 回调耗时（秒）
+            budget: 回调时间预算，即一个块的时长（秒）
+            overflow: 驱动是否报告了输入溢出
+        """
+        self.callbacks += 1
+        if duration > self.callback_time_max:
+            self.callback_time_max = duration
+        if duration > budget:
+            self.deadline_misses += 1
+        if overflow:
+            self.input_overflows += 1
+
+    def clear(self) -> int:
+        """丢弃所有待编码帧.
+
+        Returns:
+            int: 丢弃的帧数
+        """
+        subscription = self._subscription
+        return subscription.clear() if subscription is not None else 0
+
+    def get_stats(self) -> dict:
+        """
+        获取编码线程统计信息.
+        """
+        subscription = self._subscription
+        stats = subscription.get_stats() if subscription is not None else {}
+        frames = max(self.frames_encoded, 1)
+        audio_seconds = frames * self.frame_size / AudioConfig.INPUT_SAMPLE_RATE
+        stats.update(
+            {
+                "profile": self.profile.to_dict() if self.profile else None,
+                "frames_encoded": self.frames_encoded,
+                "bytes_encoded": self.bytes_encoded,
+                "avg_bitrate_kbps": round(
+                    self.bytes_encoded * 8 / audio_seconds / 1000, 2
+                ),
+                "dtx_frames": self.dtx_frames,
+                "encode_cpu_percent": round(
+                    self.encode_cpu_total * 100 / audio_seconds, 2
+                ),
+                "batches": self.batches,
+                "encode_errors": self.encode_errors,
+                "encode_avg_ms": round(self.encode_time_total * 1000 / frames, 3),
+                "encode_max_ms": round(self.encode_time_max * 1000, 3),
+                "callbacks": self.callbacks,
+                "deadline_misses": self.deadline_misses,
+                "input_overflows": self.input_overflows,
+                "callback_max_ms": round(self.callback_time_max * 1000, 3),
+            }
+        )
+        return stats
+
+    def _run(self):
+        """
+        编码线程主循环：等待数据，编码所有完整帧后批量投递.
+        """
+        while self._running:
+            subscription = self._subscription
+            if subscription is None:
+                # 未设置编码回调，只定期汇报录音回调状态
+                self._wakeup.wait(0.5)
+                self._wakeup.clear()
+            elif subscription.wait(0.5):
+                batch = self._encode_frames(subscription.drain())
+                if batch:
+                    self._dispatch(batch)
+            self._report_callback_health()
+
+    def _encode_frames(self, frames) -> List[Tuple[bytes, float]]:
+        """
+        编码一批总线帧，返回(数据包, 编码完成时间)列表.
+        """
+        self._apply_pending_update()
+
+        batch = []
+        for frame, captured_at in frames:
+            if not self._running:
+                break
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                encoded = self._encoder.encode(frame.tobytes(), self.frame_size)
+            except Exception as e:
+                self.encode_errors += 1
+                logger.warning(f"实时录音编码失败: {e}")
+                continue
+            self.encode_cpu_total += time.thread_time() - cpu_start
+            elapsed = time.perf_counter() - start
+
+            self.frames_encoded += 1
+            self.encode_time_total += elapsed
+            if elapsed > self.encode_time_max:
+                self.encode_time_max = elapsed
+            self.bytes_encoded += len(encoded)
+            if len(encoded) <= self.DTX_PACKET_BYTES:
+                self.dtx_frames += 1
+            if encoded:
+                encoded_at = time.monotonic()
+                self._latency.record("encode", encoded_at - captured_at)
+                batch.append((encoded, encoded_at))
+        return batch
+
+    def _apply_pending_update(self):
+        """
+        在编码线程中应用运行时更新的编码参数.
+        """
+        profile = self._pending_profile
+        if profile is None:
+            return
+        encoder = self._pending_encoder
+        self._pending_profile = None
+        self._pending_encoder = None
+
+        try:
+            if encoder is not None:
+                self._encoder = encoder
+            else:
+                profile.apply(self._encoder)
+            self.profile = profile
+            self.reset_stats()
+            logger.info(f"Opus编码参数已更新: {profile.to_dict()}")
+        except Exception as e:
+            logger.error(f"更新Opus编码参数失败: {e}")
+
+    def _dispatch(self, batch: List[Tuple[bytes, float]]):
+        """
+        一次跨线程调度投递整批数据包.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, batch)
+            self.batches += 1
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _deliver(self, batch: List[Tuple[bytes, float]]):
+        """
+        在事件循环中按顺序交付数据包.
+        """
+        callback = self._callback
+        if callback is None:
+            return
+        now = time.monotonic()
+        for encoded, encoded_at in batch:
+            self._latency.record("dispatch", now - encoded_at)
+            try:
+                callback(encoded)
+            except Exception as e:
+                logger.error(f"编码音频回调失败: {e}")
+
+    def _report_callback_health(self):
+        """
+        在编码线程中汇报录音回调超时与溢出，避免在回调里写日志.
+        """
+        misses = self.deadline_misses - self._reported_misses
+        overflows = self.input_overflows - self._reported_overflows
+        if not misses and not overflows:
+            return
+
+        now = time.monotonic()
+        if now - self._last_warn_time < self.WARN_INTERVAL:
+            return
+
+        self._last_warn_time = now
+        self._reported_misses += misses
+        self._reported_overflows += overflows
+        logger.warning(
+            f"录音回调异常: 超时 {misses} 次, 输入溢出 {overflows} 次 "
+            f"(最长回调 {self.callback_time_max * 1000:.1f}ms)"
+        )
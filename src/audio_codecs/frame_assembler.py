@@ -0,0 +1,103 @@
+"""定长音频帧组装器.
+
+重采样输出的样本数每次回调都不固定（如44.1kHz -> 16kHz），
+需要重新切分为编码器要求的定长帧。此模块使用一块连续的numpy累加区，
+通过切片一次性取出所有完整帧，避免逐样本的Python循环。
+"""
+
+import numpy as np
+
+
+class FrameAssembler:
+    """
+    基于连续numpy累加区的定长帧组装器.
+
+    每次push追加任意长度的样本，并以(n, frame_size)视图的形式返回
+    当前所有完整帧，n可以为0。不足一帧的剩余样本保留到下次push。
+    """
+
+    def __init__(self, frame_size: int, initial_frames: int = 4):
+        """初始化帧组装器.
+
+        Args:
+            frame_size: 每帧样本数
+            initial_frames: 累加区初始容量（帧数），不足时自动扩容
+        """
+        if frame_size <= 0:
+            raise ValueError("帧大小必须大于0")
+
+        self.frame_size = int(frame_size)
+        self._buffer = np.zeros(self.frame_size * initial_frames, dtype=np.int16)
+        # 累加区中有效样本数
+        self._fill = 0
+        # 上次push已作为完整帧返回的样本数，下次push前移除
+        self._consumed = 0
+
+    @property
+    def pending(self) -> int:
+        """
+        尚未组成完整帧的样本数.
+        """
+        return self._fill - self._consumed
+
+    def push(self, data: np.ndarray) -> np.ndarray:
+        """追加样本并取出所有完整帧.
+
+        返回的是内部累加区的视图，只在下一次push或clear之前有效，
+        调用方需要在此之前处理完毕或自行复制。
+
+        Args:
+            data: 一维int16样本，长度任意
+
+        Returns:
+            np.ndarray: 形状为(n, frame_size)的完整帧视图
+        """
+        self._compact()
+
+        count = len(data)
+        if count:
+            required = self._fill + count
+            if required > len(self._buffer):
+                self._grow(required)
+            self._buffer[self._fill : required] = data
+            self._fill = required
+
+        frames = self._fill // self.frame_size
+        self._consumed = frames * self.frame_size
+        return self._buffer[: self._consumed].reshape(frames, self.frame_size)
+
+    def clear(self) -> int:
+        """丢弃所有未处理样本.
+
+        Returns:
+            int: 丢弃的样本数
+        """
+        dropped = self.pending
+        self._fill = 0
+        self._consumed = 0
+        return dropped
+
+    def _compact(self):
+        """
+        将上次剩余的不完整帧移动到累加区开头.
+        """
+        if not self._consumed:
+            return
+
+        remain = self._fill - self._consumed
+        if remain:
+            # 剩余样本少于一帧，源区间与目标区间不重叠
+            self._buffer[:remain] = self._buffer[self._consumed : self._fill]
+        self._fill = remain
+        self._consumed = 0
+
+    def _grow(self, required: int):
+        """
+        扩容累加区（仅在单次输入超过现有容量时发生）.
+        """
+        capacity = len(self._buffer)
+        while capacity < required:
+            capacity *= 2
+        buffer = np.zeros(capacity, dtype=np.int16)
+        buffer[: self._fill] = self._buffer[: self._fill]
+        self._buffer = buffer
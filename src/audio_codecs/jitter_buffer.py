@@ -0,0 +1,481 @@
+"""自适应抖动缓冲区.
+
+位于Opus解码与播放回调之间，负责平滑网络抖动：
+1. 跟踪数据包到达抖动，动态计算目标缓冲延迟
+2. 缓冲区从空开始播放时先预缓冲到目标延迟
+3. 数据包迟到或丢失时使用Opus丢包隐藏(PLC)或带内FEC补帧
+4. 统计缓冲延迟、补帧次数和欠载次数
+5. 按帧记录到达与解码时间，向延迟统计上报receive/decode/playout阶段耗时
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import opuslib
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.utils.latency_monitor import LatencyMonitor
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def opus_packet_has_lbrr(packet: bytes) -> bool:
+    """检查Opus数据包的第一帧是否携带LBRR（带内FEC）数据.
+
+    与libopus 1.5的opus_packet_has_lbrr相同：CELT模式没有LBRR，
+    SILK/混合模式的帧开头是VAD标志位和LBRR标志位（等概率编码，即首字节的高位）。
+    旧版libopus没有导出该函数，这里直接解析TOC。
+
+    Args:
+        packet: 完整的Opus数据包
+
+    Returns:
+        bool: 携带LBRR数据时为True，数据包无效时为False
+    """
+    if len(packet) < 2:
+        return False
+    toc = packet[0]
+    config = toc >> 3
+    if config >= 16:
+        return False
+
+    # 每帧中的SILK帧数：10/20ms为1，40ms为2，60ms为3（混合模式最长20ms）
+    silk_frames = (1, 1, 2, 3)[config & 0x3] if config < 12 else 1
+
+    # 定位第一帧数据
+    code = toc & 0x3
+    offset = 1
+    first_size = len(packet) - 1
+    if code == 1:
+        first_size //= 2
+    elif code == 2:
+        first_size, offset = _read_frame_size(packet, offset)
+    elif code == 3:
+        count = packet[offset] & 0x3F
+        vbr = packet[offset] & 0x80
+        padding = packet[offset] & 0x40
+        offset += 1
+        end = len(packet)
+        while padding:
+            if offset >= end:
+                return False
+            value = packet[offset]
+            offset += 1
+            end -= 254 if value == 255 else value
+            padding = value == 255
+        if not count or end <= offset:
+            return False
+        if vbr:
+            first_size, offset = _read_frame_size(packet, offset)
+            for _ in range(count - 2):
+                _, offset = _read_frame_size(packet, offset)
+        else:
+            first_size = (end - offset) // count
+    if first_size <= 0 or offset >= len(packet):
+        return False
+
+    first = packet[offset]
+    lbrr = (first >> (7 - silk_frames)) & 0x1
+    if toc & 0x4:
+        # 立体声：侧声道的VAD与LBRR标志紧随中声道之后
+        lbrr |= (first >> (6 - 2 * silk_frames)) & 0x1
+    return bool(lbrr)
+
+
+def _read_frame_size(packet: bytes, offset: int):
+    """
+    读取Opus数据包中1-2字节的帧长度，返回(帧长度, 下一个偏移).
+    """
+    if offset >= len(packet):
+        return 0, offset
+    size = packet[offset]
+    if size < 252:
+        return size, offset + 1
+    if offset + 1 >= len(packet):
+        return 0, offset + 1
+    return size + 4 * packet[offset + 1], offset + 2
+
+
+class JitterBuffer:
+    """
+    TTS播放用的自适应抖动缓冲区.
+
+    解码侧（事件循环）调用put_packet写入，播放回调调用read_into读取。
+    解码器由两侧共享，通过锁保护；播放回调只尝试非阻塞加锁，
+    拿不到锁时直接输出静音，绝不阻塞音频线程。
+    """
+
+    # 连续丢包超过该帧数视为流中断，不再逐帧补偿
+    MAX_GAP_FRAMES = 5
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        capacity_frames: int = 500,
+        min_delay_ms: int = 60,
+        max_delay_ms: int = 500,
+        max_conceal_frames: int = 2,
+        enable_fec: bool = True,
+    ):
+        """初始化抖动缓冲区.
+
+        Args:
+            sample_rate: 播放采样率
+            frame_size: 每帧样本数
+            capacity_frames: 缓冲区容量（帧数）
+            min_delay_ms: 最小目标延迟（毫秒）
+            max_delay_ms: 最大目标延迟（毫秒）
+            max_conceal_frames: 断流时最多连续补偿的帧数，超过后重新预缓冲
+            enable_fec: 是否在检测到丢包时尝试带内FEC恢复
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.frame_duration = frame_size / sample_rate
+        self.ring = AudioRingBuffer(frame_size * capacity_frames, "playout")
+
+        # 每帧的到达与解码完成时间（time.monotonic），按帧序号取模索引
+        self._arrival_times = np.zeros(capacity_frames, dtype=np.float64)
+        self._decoded_times = np.zeros(capacity_frames, dtype=np.float64)
+        self._current_arrival = 0.0
+        self._latency = LatencyMonitor.get_instance()
+
+        self.min_delay_samples = int(sample_rate * min_delay_ms / 1000)
+        self.max_delay_samples = max(
+            self.min_delay_samples, int(sample_rate * max_delay_ms / 1000)
+        )
+        self.max_conceal_frames = max_conceal_frames
+        self.enable_fec = enable_fec
+
+        # 解码器（初始化后设置），解码侧与播放回调共享
+        self._decoder = None
+        self._decoder_lock = threading.Lock()
+
+        # 抖动估计（秒）与目标延迟（样本）
+        self._last_arrival: Optional[float] = None
+        self._jitter = 0.0
+        self._underrun_boost = 0
+        self.target_delay_samples = self.min_delay_samples
+
+        # 播放状态
+        self._buffering = True
+        self._conceal_run = 0
+        self._expected_sequence: Optional[int] = None
+
+        # 统计计数
+        self.packets = 0
+        self.underruns = 0
+        self.rebuffers = 0
+        self.concealed_frames = 0
+        self.fec_frames = 0
+        self.late_dropped = 0
+        self.decode_errors = 0
+
+    def set_decoder(self, decoder):
+        """
+        设置Opus解码器.
+        """
+        with self._decoder_lock:
+            self._decoder = decoder
+
+    @property
+    def queued_samples(self) -> int:
+        """
+        缓冲区中尚未播放的样本数.
+        """
+        return self.ring.available
+
+    @property
+    def buffer_delay_ms(self) -> float:
+        """
+        当前缓冲延迟（毫秒）.
+        """
+        return self.ring.available * 1000 / self.sample_rate
+
+    def put_packet(
+        self,
+        opus_data: bytes,
+        sequence: Optional[int] = None,
+        arrival: Optional[float] = None,
+    ) -> bool:
+        """解码一个Opus数据包并放入缓冲区（解码侧调用）.
+
+        WebSocket等可靠传输不带序列号，此时只按到达时间估计抖动；
+        带序列号时会检测丢包并用FEC/PLC补齐，迟到的包直接丢弃。
+
+        Args:
+            opus_data: Opus数据包
+            sequence: 可选的数据包序列号
+            arrival: 到达时间（time.monotonic），默认取当前时间
+
+        Returns:
+            bool: 是否成功放入缓冲区
+        """
+        self.packets += 1
+        if arrival is None:
+            arrival = time.monotonic()
+        self._update_jitter(arrival)
+        self._current_arrival = arrival
+
+        with self._decoder_lock:
+            if self._decoder is None:
+                return False
+
+            if sequence is not None:
+                if not self._handle_sequence(opus_data, sequence):
+                    return False
+
+            decode_start = time.monotonic()
+            self._latency.record("receive", decode_start - arrival)
+            try:
+                pcm = self._decoder.decode(opus_data, self.frame_size)
+                self._latency.record("decode", time.monotonic() - decode_start)
+            except opuslib.OpusError as e:
+                logger.debug(f"Opus解码失败，使用PLC补帧: {e}")
+                self.decode_errors += 1
+                pcm = self._conceal_frame()
+                if pcm is None:
+                    return False
+
+        return self._push_pcm(pcm)
+
+    def read_into(self, out: np.ndarray, dac_time: Optional[float] = None) -> int:
+        """读取待播放数据（播放回调调用）.
+
+        Args:
+            out: 预分配的一维int16输出数组
+            dac_time: 本块数据到达DAC的时间（time.monotonic），用于延迟统计
+
+        Returns:
+            int: 实际输出的有效样本数（含补偿帧）
+        """
+        if self._buffering:
+            if not self._ready_to_play():
+                out.fill(0)
+                return 0
+            self._buffering = False
+
+        count = self.ring.read_into(out)
+        if count and dac_time is not None:
+            self._record_playout(count, dac_time)
+        if count == len(out):
+            self._conceal_run = 0
+            return count
+
+        # 播放中断流：数据迟到或丢失
+        if not self._expecting_more():
+            # 数据流已自然结束，静音并回到预缓冲状态
+            self._buffering = True
+            self._conceal_run = 0
+            return count
+
+        self.underruns += 1
+        self._underrun_boost = min(
+            self._underrun_boost + self.frame_size, self.max_delay_samples
+        )
+        self._update_target_delay()
+
+        if (
+            count == 0
+            and len(out) == self.frame_size
+            and self._conceal_run < self.max_conceal_frames
+            and self._conceal_into(out)
+        ):
+            self._conceal_run += 1
+            return len(out)
+
+        # 补偿次数用尽，重新预缓冲
+        self._buffering = True
+        self._conceal_run = 0
+        self.rebuffers += 1
+        return count
+
+    def clear(self) -> int:
+        """丢弃所有待播放数据并重置播放状态.
+
+        Returns:
+            int: 丢弃的样本数
+        """
+        dropped = self.ring.clear()
+        self._buffering = True
+        self._conceal_run = 0
+        self._expected_sequence = None
+        self._last_arrival = None
+        return dropped
+
+    def get_stats(self) -> dict:
+        """
+        获取抖动缓冲统计信息.
+        """
+        stats = self.ring.get_stats()
+        stats.update(
+            {
+                "buffer_delay_ms": round(self.buffer_delay_ms, 1),
+                "target_delay_ms": round(
+                    self.target_delay_samples * 1000 / self.sample_rate, 1
+                ),
+                "jitter_ms": round(self._jitter * 1000, 1),
+                "buffering": self._buffering,
+                "packets": self.packets,
+                "underruns": self.underruns,
+                "rebuffers": self.rebuffers,
+                "concealed_frames": self.concealed_frames,
+                "fec_frames": self.fec_frames,
+                "late_dropped": self.late_dropped,
+                "decode_errors": self.decode_errors,
+            }
+        )
+        return stats
+
+    def _record_playout(self, count: int, dac_time: float):
+        """
+        按本次读取的首个样本所在帧，统计解码到DAC及到达到DAC的延迟.
+        """
+        index = (self.ring.total_read - count) // self.frame_size
+        index %= len(self._decoded_times)
+        self._latency.record("playout", dac_time - self._decoded_times[index])
+        self._latency.record("downlink", dac_time - self._arrival_times[index])
+
+    def _update_jitter(self, arrival: float):
+        """
+        按RFC 3550的方式平滑估计到达抖动，只统计慢于实时的部分.
+        """
+        if self._last_arrival is not None:
+            lateness = max(0.0, (arrival - self._last_arrival) - self.frame_duration)
+            # 长时间无数据视为新的语音段，不计入抖动
+            if lateness < 1.0:
+                self._jitter += (lateness - self._jitter) / 16
+        self._last_arrival = arrival
+
+        # 平稳播放时逐渐回收因欠载增加的延迟
+        if self._underrun_boost > 0:
+            self._underrun_boost = max(0, self._underrun_boost - self.frame_size // 50)
+        self._update_target_delay()
+
+    def _update_target_delay(self):
+        """
+        目标延迟 = 最小延迟 + 4倍抖动 + 欠载补偿，限制在最大延迟内.
+        """
+        target = (
+            self.min_delay_samples
+            + int(4 * self._jitter * self.sample_rate)
+            + self._underrun_boost
+        )
+        self.target_delay_samples = min(self.max_delay_samples, target)
+
+    def _ready_to_play(self) -> bool:
+        """
+        预缓冲是否完成：达到目标延迟，或数据流已停止（短句子）.
+        """
+        available = self.ring.available
+        if available == 0:
+            return False
+        if available >= self.target_delay_samples:
+            return True
+        return not self._expecting_more()
+
+    def _expecting_more(self) -> bool:
+        """
+        最近是否仍有数据包到达，用于区分迟到与语音结束.
+        """
+        last_arrival = self._last_arrival
+        if last_arrival is None:
+            return False
+        window = max(
+            3 * self.frame_duration, self.target_delay_samples / self.sample_rate
+        )
+        return time.monotonic() - last_arrival < window
+
+    def _handle_sequence(self, opus_data: bytes, sequence: int) -> bool:
+        """处理序列号：丢弃迟到包，对丢失的包做FEC/PLC补偿（需持有解码器锁）.
+
+        Returns:
+            bool: 当前包是否需要继续解码
+        """
+        expected = self._expected_sequence
+        self._expected_sequence = sequence + 1
+        if expected is None:
+            return True
+
+        if sequence < expected:
+            # 该位置已经播放过补偿帧
+            self._expected_sequence = expected
+            self.late_dropped += 1
+            return False
+
+        gap = sequence - expected
+        if gap == 0 or gap > self.MAX_GAP_FRAMES:
+            return True
+
+        # 前面的丢包使用PLC，紧邻当前包的一帧在其携带LBRR数据时用FEC恢复
+        for _ in range(gap - 1):
+            pcm = self._conceal_frame()
+            if pcm is not None:
+                self._push_pcm(pcm)
+
+        pcm = None
+        # 没有LBRR数据时libopus的FEC解码只会退化为PLC，直接补偿并计入PLC统计
+        if self.enable_fec and opus_packet_has_lbrr(opus_data):
+            try:
+                pcm = self._decoder.decode(opus_data, self.frame_size, decode_fec=True)
+                self.fec_frames += 1
+            except opuslib.OpusError:
+                pcm = None
+        if pcm is None:
+            pcm = self._conceal_frame()
+        if pcm is not None:
+            self._push_pcm(pcm)
+        return True
+
+    def _conceal_frame(self) -> Optional[bytes]:
+        """
+        生成一帧PLC补偿数据（需持有解码器锁）.
+        """
+        try:
+            pcm = self._decoder.decode(b"", self.frame_size)
+            self.concealed_frames += 1
+            return pcm
+        except opuslib.OpusError as e:
+            logger.debug(f"PLC补帧失败: {e}")
+            return None
+
+    def _conceal_into(self, out: np.ndarray) -> bool:
+        """
+        在播放回调中直接生成一帧补偿数据，拿不到解码器锁时放弃.
+        """
+        if not self._decoder_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._decoder is None:
+                return False
+            pcm = self._conceal_frame()
+            if pcm is None:
+                return False
+            out[:] = np.frombuffer(pcm, dtype=np.int16)
+            # 带序列号时，该位置已被补偿，迟到的包到达后将被丢弃
+            if self._expected_sequence is not None:
+                self._expected_sequence += 1
+            return True
+        finally:
+            self._decoder_lock.release()
+
+    def _push_pcm(self, pcm: bytes) -> bool:
+        """
+        将解码后的PCM写入环形缓冲区.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if len(samples) != self.frame_size:
+            logger.warning(f"解码音频长度异常: {len(samples)}, 期望: {self.frame_size}")
+            return False
+
+        # 先写时间戳再写数据，播放回调读到该帧时时间戳已就绪
+        index = (self.ring.total_written // self.frame_size) % len(self._decoded_times)
+        self._arrival_times[index] = self._current_arrival
+        self._decoded_times[index] = time.monotonic()
+        if not self.ring.write(samples):
+            logger.debug("播放缓冲区已满，丢弃此帧")
+            return False
+        return True
@@ -0,0 +1,307 @@
+"""播放混音器.
+
+TTS、音乐和提示音共用AudioCodec的一个24kHz输出流，在播放回调中混音：
+1. TTS（抖动缓冲区）为主音源，直接读入输出数组，没有其他音源时零额外开销
+2. 其他音源按各自增益叠加，结果限幅到int16
+3. TTS播放期间自动压低（ducking）可压低音源的音量，结束后平滑恢复
+4. 混音缓冲区预先分配，回调中不分配内存
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PcmSource:
+    """
+    内存PCM音源（音乐、提示音）.
+
+    控制方法在事件循环中调用，read_into在播放回调中调用；
+    播放数据通过整体替换引用切换，回调侧无需加锁。
+    """
+
+    def __init__(self, name: str, sample_rate: int, gain: float = 1.0, duckable=True):
+        """初始化音源.
+
+        Args:
+            name: 音源名称
+            sample_rate: 采样率，须与输出流一致
+            gain: 音源增益（0.0 - 1.0以上均可，混音后统一限幅）
+            duckable: TTS播放时是否压低该音源
+        """
+        self.name = name
+        self.sample_rate = sample_rate
+        self.gain = gain
+        self.duckable = duckable
+
+        # 当前音轨，整体替换引用，回调侧无需加锁
+        self._track: Optional[np.ndarray] = None
+        self._position = 0
+        self._seek_to: Optional[int] = None
+        self.paused = False
+
+    @property
+    def active(self) -> bool:
+        """
+        是否有待播放的数据.
+        """
+        track = self._track
+        return track is not None and not self.paused and self._position < len(track)
+
+    @property
+    def finished(self) -> bool:
+        """
+        当前音轨是否已播放完毕.
+        """
+        track = self._track
+        return track is not None and self._position >= len(track)
+
+    @property
+    def position(self) -> float:
+        """
+        当前播放位置（秒）.
+        """
+        return self._position / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        """
+        当前音轨时长（秒）.
+        """
+        track = self._track
+        return len(track) / self.sample_rate if track is not None else 0.0
+
+    def play(self, samples: np.ndarray, start: float = 0.0):
+        """开始播放新的音轨，替换当前音轨.
+
+        Args:
+            samples: 一维int16样本，采样率须与输出流一致
+            start: 起始位置（秒）
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.int16).reshape(-1)
+        # 先摘下旧音轨再设置位置，回调不会用新位置读旧数据
+        self._track = None
+        self._seek_to = None
+        self._position = min(len(samples), int(start * self.sample_rate))
+        self.paused = False
+        self._track = samples
+
+    def pause(self):
+        """
+        暂停播放，保留播放位置.
+        """
+        self.paused = True
+
+    def resume(self):
+        """
+        恢复播放.
+        """
+        self.paused = False
+
+    def seek(self, seconds: float):
+        """
+        跳转到指定位置（下一次回调时生效）.
+        """
+        self._seek_to = max(0, int(seconds * self.sample_rate))
+
+    def stop(self):
+        """
+        停止并释放当前音轨.
+        """
+        self._track = None
+        self._position = 0
+        self.paused = False
+
+    def read_into(self, out: np.ndarray) -> int:
+        """读取样本（播放回调中调用），不足部分不做处理.
+
+        Returns:
+            int: 实际读取的样本数
+        """
+        samples = self._track
+        if samples is None or self.paused:
+            return 0
+
+        seek_to = self._seek_to
+        if seek_to is not None:
+            self._seek_to = None
+            self._position = min(seek_to, len(samples))
+
+        start = self._position
+        count = min(len(out), len(samples) - start)
+        if count <= 0:
+            return 0
+        out[:count] = samples[start : start + count]
+        self._position = start + count
+        return count
+
+
+class OutputMixer:
+    """
+    输出混音器：主音源（TTS）+ 若干附加音源，支持TTS期间压低音乐.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        duck_gain: float = 0.2,
+        duck_attack_ms: int = 60,
+        duck_release_ms: int = 500,
+    ):
+        """初始化混音器.
+
+        Args:
+            sample_rate: 输出采样率
+            frame_size: 预期的回调块大小（样本数），不足时自动扩容
+            duck_gain: TTS播放时可压低音源的增益系数
+            duck_attack_ms: 压低过渡时间（毫秒）
+            duck_release_ms: TTS结束后保持并恢复的时间（毫秒）
+        """
+        self.sample_rate = sample_rate
+        self.duck_gain = duck_gain
+        self.duck_attack = max(duck_attack_ms, 1) / 1000
+        self.duck_release = max(duck_release_ms, 1) / 1000
+
+        self._primary = None
+        self._sources: Dict[str, PcmSource] = {}
+        self._source_list: Tuple[PcmSource, ...] = ()
+        self._lock = threading.Lock()
+
+        # 当前ducking增益与TTS最近一次有声后已输出的样本数
+        self._duck_level = 1.0
+        self._samples_since_primary = int(self.duck_release * sample_rate)
+
+        self._allocate(frame_size)
+
+    def set_primary(self, source):
+        """设置主音源.
+
+        Args:
+            source: 提供read_into(out, dac_time) -> int的对象（抖动缓冲区）
+        """
+        self._primary = source
+
+    def create_source(self, name: str, gain: float = 1.0, duckable: bool = True):
+        """创建并注册PCM音源，同名音源会被替换.
+
+        Returns:
+            PcmSource: 新音源
+        """
+        source = PcmSource(name, self.sample_rate, gain, duckable)
+        with self._lock:
+            self._sources[name] = source
+            self._source_list = tuple(self._sources.values())
+        return source
+
+    def get_source(self, name: str) -> Optional[PcmSource]:
+        """
+        按名称获取音源.
+        """
+        return self._sources.get(name)
+
+    def remove_source(self, name: str):
+        """
+        注销音源.
+        """
+        with self._lock:
+            if self._sources.pop(name, None) is not None:
+                self._source_list = tuple(self._sources.values())
+
+    @property
+    def duck_level(self) -> float:
+        """
+        当前作用于可压低音源的增益系数.
+        """
+        return self._duck_level
+
+    def mix(self, out: np.ndarray, dac_time: Optional[float] = None) -> int:
+        """混音到输出数组（播放回调中调用）.
+
+        Args:
+            out: 一维int16输出数组
+            dac_time: 本块数据到达DAC的时间，传给主音源用于延迟统计
+
+        Returns:
+            int: 主音源输出的有效样本数（用于跟踪TTS播放进度）
+        """
+        frames = len(out)
+        primary_count = 0
+        if self._primary is not None:
+            primary_count = self._primary.read_into(out, dac_time)
+        else:
+            out.fill(0)
+
+        self._update_ducking(primary_count > 0, frames)
+
+        sources = self._source_list
+        if not sources or not any(source.active for source in sources):
+            return primary_count
+
+        if frames > len(self._accum):
+            self._allocate(frames)
+        accum = self._accum[:frames]
+        scratch = self._scratch[:frames]
+        scaled = self._scaled[:frames]
+
+        np.copyto(accum, out, casting="unsafe")
+        for source in sources:
+            count = source.read_into(scratch)
+            if not count:
+                continue
+            gain = source.gain * (self._duck_level if source.duckable else 1.0)
+            np.multiply(scratch[:count], gain, out=scaled[:count], casting="unsafe")
+            np.add(accum[:count], scaled[:count], out=accum[:count])
+
+        np.clip(accum, -32768, 32767, out=accum)
+        np.copyto(out, accum, casting="unsafe")
+        return primary_count
+
+    def get_stats(self) -> dict:
+        """
+        获取混音器状态.
+        """
+        return {
+            "duck_level": round(self._duck_level, 3),
+            "sources": {
+                source.name: {
+                    "active": source.active,
+                    "gain": source.gain,
+                    "duckable": source.duckable,
+                    "position": round(source.position, 2),
+                    "duration": round(source.duration, 2),
+                }
+                for source in self._source_list
+            },
+        }
+
+    def _update_ducking(self, primary_active: bool, frames: int):
+        """
+        按TTS是否有声平滑调整ducking增益：有声时快速压低，静音保持后缓慢恢复.
+        """
+        if primary_active:
+            self._samples_since_primary = 0
+        else:
+            self._samples_since_primary += frames
+
+        block = frames / self.sample_rate
+        holding = self._samples_since_primary / self.sample_rate < self.duck_release
+        if primary_active or holding:
+            step = (1.0 - self.duck_gain) * block / self.duck_attack
+            self._duck_level = max(self.duck_gain, self._duck_level - step)
+        else:
+            step = (1.0 - self.duck_gain) * block / self.duck_release
+            self._duck_level = min(1.0, self._duck_level + step)
+
+    def _allocate(self, frames: int):
+        """
+        预分配混音缓冲区.
+        """
+        self._accum = np.zeros(frames, dtype=np.float32)
+        self._scaled = np.zeros(frames, dtype=np.float32)
+        self._scratch = np.zeros(frames, dtype=np.int16)
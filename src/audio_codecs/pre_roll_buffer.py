@@ -0,0 +1,61 @@
+"""已编码音频的预录缓冲.
+
+唤醒词检出时用户往往已经接着说话，而唤醒词本身在检出前就已说完。
+空闲时持续保留最近N毫秒的Opus帧，检出唤醒词时整体取出，
+交给上行缓冲在开始监听后按顺序补发给服务器，
+用户可以连贯地说出"你好小智，今天天气怎么样"。
+"""
+
+import time
+from collections import deque
+from typing import List, Tuple
+
+
+class PreRollBuffer:
+    """
+    滚动保留最近若干帧编码音频.
+    """
+
+    def __init__(self, duration_ms: int, frame_duration_ms: int):
+        """初始化预录缓冲.
+
+        Args:
+            duration_ms: 保留的音频时长（毫秒）
+            frame_duration_ms: 每帧时长（毫秒）
+        """
+        frame_duration_ms = max(1, int(frame_duration_ms))
+        self.window_frames = max(0, int(duration_ms) // frame_duration_ms)
+        # (编码帧, 入队时间)
+        self._frames = deque(maxlen=self.window_frames or 1)
+
+        # 统计
+        self.taken_frames = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def push(self, frame: bytes):
+        """
+        追加一帧，只保留最近window_frames帧.
+        """
+        if self.window_frames:
+            self._frames.append((frame, time.monotonic()))
+
+    def take(self) -> List[Tuple[bytes, float]]:
+        """
+        按时间顺序取出并清空全部帧.
+        """
+        frames = list(self._frames)
+        self._frames.clear()
+        self.taken_frames += len(frames)
+        return frames
+
+    def get_stats(self) -> dict:
+        """
+        获取缓冲统计信息.
+        """
+        return {
+            "frames": len(self._frames),
+            "window_frames": self.window_frames,
+            "taken_frames": self.taken_frames,
+        }
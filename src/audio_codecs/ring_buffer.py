@@ -0,0 +1,274 @@
+"""无锁音频环形缓冲区.
+
+在PortAudio回调线程与asyncio事件循环之间传递int16 PCM数据：
+1. 单生产者/单消费者，读写索引各自只由一方修改，无需加锁
+2. 存储区预先分配，回调中读写不会为音频数据分配内存
+3. 事件循环侧可以await等待数据到达
+4. 提供填充率、溢出、欠载统计
+"""
+
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioRingBuffer:
+    """
+    预分配的int16单生产者/单消费者环形缓冲区.
+
+    读写索引单调递增，写索引只由生产者修改，读索引只由消费者修改，
+    依赖GIL保证整数赋值的原子性，因此可以在音频回调中安全调用。
+    """
+
+    def __init__(self, capacity: int, name: str = "ring"):
+        """初始化环形缓冲区.
+
+        Args:
+            capacity: 容量（样本数）
+            name: 名称，用于日志和统计
+        """
+        if capacity <= 0:
+            raise ValueError("环形缓冲区容量必须大于0")
+
+        self.capacity = int(capacity)
+        self.name = name
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+
+        # 读写索引（单调递增）
+        self._write_index = 0
+        self._read_index = 0
+        # 清空请求：消费者读取前跳过此索引之前的数据
+        self._discard_index = 0
+
+        # 统计计数
+        self.overruns = 0
+        self.overrun_samples = 0
+        self.underruns = 0
+        self.underrun_samples = 0
+        self._last_read_count = 0
+
+        # 事件循环侧的等待者
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._waiter_armed = False
+        self._wanted_samples = 0
+
+    @property
+    def available(self) -> int:
+        """
+        可读取的样本数.
+        """
+        start = max(self._read_index, self._discard_index)
+        return max(0, self._write_index - start)
+
+    @property
+    def free(self) -> int:
+        """
+        可写入的样本数.
+        """
+        return self.capacity - (self._write_index - self._read_index)
+
+    @property
+    def fill_level(self) -> float:
+        """
+        填充率（0.0 - 1.0）.
+        """
+        return self.available / self.capacity
+
+    @property
+    def total_written(self) -> int:
+        """
+        累计写入的样本数.
+        """
+        return self._write_index
+
+    @property
+    def total_read(self) -> int:
+        """
+        累计读取（含清空跳过）的样本数，即下一个待读样本的序号.
+        """
+        return self._read_index
+
+    def write(self, data: np.ndarray) -> bool:
+        """写入样本（生产者侧，可在音频回调中调用）.
+
+        空间不足时丢弃本次写入并计入溢出，不会覆盖未读数据。
+
+        Args:
+            data: 一维int16样本
+
+        Returns:
+            bool: 是否写入成功
+        """
+        count = len(data)
+        if count == 0:
+            return True
+
+        if count > self.free:
+            self.overruns += 1
+            self.overrun_samples += count
+            return False
+
+        start = self._write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self._buffer[start : start + first] = data[:first]
+        if first < count:
+            self._buffer[: count - first] = data[first:]
+
+        self._write_index += count
+        self._notify_waiter()
+        return True
+
+    def read_into(self, out: np.ndarray) -> int:
+        """读取样本到指定数组（消费者侧，可在音频回调中调用）.
+
+        数据不足时剩余部分填充静音。只有在播放过程中数据断流时才计为欠载，
+        空闲时的静音不计入。
+
+        Args:
+            out: 预分配的一维int16输出数组
+
+        Returns:
+            int: 实际读取的样本数
+        """
+        wanted = len(out)
+        read_index = self._apply_discard()
+        count = min(wanted, self._write_index - read_index)
+
+        if count > 0:
+            self._copy_out(read_index, out, count)
+            self._read_index = read_index + count
+
+        if count < wanted:
+            out[count:] = 0
+            if count > 0 or self._last_read_count > 0:
+                self.underruns += 1
+                self.underrun_samples += wanted - count
+
+        self._last_read_count = count
+        return count
+
+    def read(self, count: int) -> Optional[np.ndarray]:
+        """读取固定数量的样本（消费者侧，事件循环中使用）.
+
+        Args:
+            count: 样本数
+
+        Returns:
+            Optional[np.ndarray]: 数据不足时返回None
+        """
+        read_index = self._apply_discard()
+        if self._write_index - read_index < count:
+            return None
+
+        out = np.empty(count, dtype=np.int16)
+        self._copy_out(read_index, out, count)
+        self._read_index = read_index + count
+        return out
+
+    def clear(self) -> int:
+        """丢弃当前所有未读数据，生产者和消费者两侧均可调用.
+
+        Returns:
+            int: 丢弃的样本数
+        """
+        discarded = self.available
+        self._discard_index = self._write_index
+        return discarded
+
+    async def wait_readable(
+        self, min_samples: int = 1, timeout: Optional[float] = None
+    ) -> bool:
+        """等待至少min_samples个样本可读（事件循环侧）.
+
+        Args:
+            min_samples: 需要的最少样本数
+            timeout: 超时时间（秒），None表示一直等待
+
+        Returns:
+            bool: 数据是否就绪，超时返回False
+        """
+        loop = asyncio.get_running_loop()
+        while self.available < min_samples:
+            self._loop = loop
+            self._waiter = loop.create_future()
+            self._wanted_samples = min_samples
+            self._waiter_armed = True
+
+            # 设置等待标志后再检查一次，避免错过生产者的通知
+            if self.available >= min_samples:
+                self._waiter_armed = False
+                self._waiter = None
+                break
+
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self._waiter_armed = False
+                self._waiter = None
+        return True
+
+    def get_stats(self) -> dict:
+        """
+        获取缓冲区统计信息.
+        """
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "available": self.available,
+            "fill_level": round(self.fill_level, 3),
+            "overruns": self.overruns,
+            "overrun_samples": self.overrun_samples,
+            "underruns": self.underruns,
+            "underrun_samples": self.underrun_samples,
+        }
+
+    def _apply_discard(self) -> int:
+        """
+        消费者侧应用清空请求，返回有效读索引.
+        """
+        discard = self._discard_index
+        if discard > self._read_index:
+            self._read_index = min(discard, self._write_index)
+        return self._read_index
+
+    def _copy_out(self, read_index: int, out: np.ndarray, count: int):
+        """
+        从环形存储区复制count个样本到out.
+        """
+        start = read_index % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._buffer[start : start + first]
+        if first < count:
+            out[first:count] = self._buffer[: count - first]
+
+    def _notify_waiter(self):
+        """
+        唤醒事件循环侧的等待者（仅在有等待者时才跨线程调度）.
+        """
+        if not self._waiter_armed or self.available < self._wanted_samples:
+            return
+
+        self._waiter_armed = False
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake_waiter)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    def _wake_waiter(self):
+        """
+        在事件循环中完成等待Future.
+        """
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
@@ -0,0 +1,210 @@
+"""回声路径延迟估计.
+
+APM需要知道参考信号送入ProcessReverseStream到其回声出现在ProcessStream输入中的延迟，
+这个值随声卡、USB免提设备、缓冲区大小不同而相差很大，延迟不准时回声消除效果明显变差。
+处理线程把送入APM的参考信号和原始录音同时写入滑动窗口，定期用FFT做互相关
+（GCC-PHAT加权，对播放内容的频谱不敏感）估计两者之间的时延：
+1. 只在参考信号和录音都有足够能量时估计
+2. 最近几次估计互相一致且与当前值相差超过容差时才更新
+3. 标定脚本（scripts/aec_tool.py calibrate）使用同一估计函数测量每个设备的初始延迟
+"""
+
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def device_delay_key(input_name: str, output_name: str) -> str:
+    """
+    生成设备组合在AUDIO_OPTIONS.AEC.DEVICE_DELAYS中的键.
+    """
+    return f"{input_name} | {output_name}"
+
+
+def estimate_delay(
+    reference: np.ndarray, capture: np.ndarray, max_lag: int
+) -> Tuple[int, float]:
+    """估计录音相对参考信号的延迟.
+
+    Args:
+        reference: 参考信号，最后一个样本与capture的最后一个样本同时送入，
+            长度至少为len(capture) + max_lag
+        capture: 录音信号
+        max_lag: 搜索的最大延迟（样本数）
+
+    Returns:
+        Tuple[int, float]: (延迟样本数, 置信度)，置信度为相关峰值与相关均方根的比值
+    """
+    reference = reference[-(len(capture) + max_lag) :]
+    size = 1 << (len(reference) + len(capture) - 1).bit_length()
+    spectrum = np.fft.rfft(reference, size) * np.conj(np.fft.rfft(capture, size))
+    # PHAT加权：只保留相位，使相关峰尖锐
+    spectrum /= np.abs(spectrum) + 1e-9
+    # corr[m] = sum(reference[n + m] * capture[n])，m = max_lag - 延迟
+    corr = np.fft.irfft(spectrum, size)[: max_lag + 1]
+
+    peak = int(np.argmax(corr))
+    rms = float(np.sqrt(np.mean(np.square(corr))))
+    confidence = float(corr[peak]) / rms if rms > 0 else 0.0
+    return max_lag - peak, confidence
+
+
+class _SampleHistory:
+    """
+    保留最近capacity个样本的滑动窗口，读取时不复制.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # 每个样本同时写入pos和pos+capacity，最近capacity个样本始终连续
+        self._buffer = np.zeros(capacity * 2, dtype=np.float32)
+        self._pos = 0
+        self.total = 0
+
+    def write(self, samples: np.ndarray):
+        samples = samples[-self.capacity :]
+        count = len(samples)
+        first = min(count, self.capacity - self._pos)
+        for offset in (0, self.capacity):
+            start = self._pos + offset
+            self._buffer[start : start + first] = samples[:first]
+            self._buffer[offset : offset + count - first] = samples[first:]
+        self._pos = (self._pos + count) % self.capacity
+        self.total += count
+
+    def view(self) -> np.ndarray:
+        return self._buffer[self._pos : self._pos + self.capacity]
+
+
+class EchoDelayEstimator:
+    """
+    基于滑动窗口互相关的回声路径延迟估计器.
+    """
+
+    # 窗口内均方根低于该值（dBFS）时不估计
+    ACTIVE_DB = -50.0
+    # 置信度低于该值的估计丢弃
+    MIN_CONFIDENCE = 8.0
+    # 需要互相一致的连续估计次数
+    CONSENSUS = 3
+
+    def __init__(
+        self,
+        sample_rate: int,
+        initial_delay_ms: int,
+        window_ms: int = 1000,
+        max_delay_ms: int = 500,
+        interval_ms: int = 500,
+        tolerance_ms: int = 4,
+    ):
+        """初始化延迟估计器.
+
+        Args:
+            sample_rate: 参考信号和录音的采样率
+            initial_delay_ms: 初始延迟（配置或标定结果）
+            window_ms: 互相关的录音窗口长度（毫秒）
+            max_delay_ms: 搜索的最大延迟（毫秒）
+            interval_ms: 两次估计之间的录音时长（毫秒）
+            tolerance_ms: 延迟变化小于该值时不更新
+        """
+        self.sample_rate = sample_rate
+        self.window = int(sample_rate * window_ms / 1000)
+        self.max_lag = int(sample_rate * max_delay_ms / 1000)
+        self.interval = int(sample_rate * interval_ms / 1000)
+        self.tolerance_ms = tolerance_ms
+        self.delay_ms = int(initial_delay_ms)
+
+        self._render = _SampleHistory(self.window + self.max_lag)
+        self._capture = _SampleHistory(self.window)
+        self._next_estimate = self.window
+        self._active_power = (32768.0 * 10 ** (self.ACTIVE_DB / 20)) ** 2
+        self._recent = deque(maxlen=self.CONSENSUS)
+
+        # 统计
+        self.estimates = 0
+        self.rejected = 0
+        self.updates = 0
+        self.last_estimate_ms = None
+        self.last_confidence = None
+        self.estimate_time_max = 0.0
+
+    def push_render(self, samples: np.ndarray):
+        """
+        写入已送入APM的参考信号.
+        """
+        self._render.write(samples)
+
+    def push_capture(self, samples: np.ndarray):
+        """
+        写入送入APM前的原始录音.
+        """
+        self._capture.write(samples)
+
+    def update(self) -> Optional[int]:
+        """按间隔估计延迟.
+
+        Returns:
+            Optional[int]: 延迟需要更新时返回新值（毫秒），否则返回None
+        """
+        if self._capture.total < self._next_estimate:
+            return None
+        self._next_estimate = self._capture.total + self.interval
+
+        reference = self._render.view()
+        capture = self._capture.view()
+        if (
+            self._render.total < len(reference)
+            or np.mean(np.square(reference[-self.window :])) < self._active_power
+            or np.mean(np.square(capture)) < self._active_power
+        ):
+            return None
+
+        start = time.perf_counter()
+        lag, confidence = estimate_delay(reference, capture, self.max_lag)
+        self.estimate_time_max = max(
+            self.estimate_time_max, time.perf_counter() - start
+        )
+        self.estimates += 1
+        self.last_confidence = round(confidence, 1)
+        if confidence < self.MIN_CONFIDENCE:
+            self.rejected += 1
+            return None
+
+        estimate_ms = lag * 1000 / self.sample_rate
+        self.last_estimate_ms = round(estimate_ms, 1)
+        self._recent.append(estimate_ms)
+        if len(self._recent) < self.CONSENSUS:
+            return None
+        if max(self._recent) - min(self._recent) > self.tolerance_ms:
+            return None
+
+        delay_ms = int(round(float(np.median(self._recent))))
+        if abs(delay_ms - self.delay_ms) < self.tolerance_ms:
+            return None
+        logger.info(
+            f"回声路径延迟更新: {self.delay_ms}ms -> {delay_ms}ms"
+            f"（置信度 {self.last_confidence}）"
+        )
+        self.delay_ms = delay_ms
+        self.updates += 1
+        return delay_ms
+
+    def get_stats(self) -> dict:
+        """
+        获取延迟估计统计信息.
+        """
+        return {
+            "delay_ms": self.delay_ms,
+            "estimates": self.estimates,
+            "rejected": self.rejected,
+            "updates": self.updates,
+            "last_estimate_ms": self.last_estimate_ms,
+            "last_confidence": self.last_confidence,
+            "estimate_ms_max": round(self.estimate_time_max * 1000, 2),
+        }
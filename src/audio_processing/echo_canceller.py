@@ -0,0 +1,259 @@
+"""实时回声消除（AEC/NS/AGC）.
+
+设备播放TTS时麦克风会录到自己的声音，导致误触发打断、干扰唤醒词识别。
+启用后录音回调把原始帧发布到麦克风总线，本模块的线程处理后再发布到
+共享录音总线，编码、唤醒词、打断检测等订阅者拿到的都是处理后的音频：
+1. 播放回调把实际写入声卡的24kHz样本写入参考环（只做一次数组复制）
+2. 处理线程把参考信号重采样到16kHz，按APM要求切成10ms子帧送入ProcessReverseStream
+3. 积压的录音帧复制到预分配的批次缓冲区，一次调用处理最多60ms（内部逐个10ms子帧），
+   再逐帧以原采集时间重新发布
+4. 统计每帧处理耗时，并在有参考信号时估算回声损耗增强（ERLE）
+5. 可选：把参考信号和原始录音写入延迟估计器，估计值变化时更新APM的回声路径延迟
+"""
+
+import math
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import soxr
+
+from src.audio_codecs.capture_bus import DROP_OLDEST, CaptureBus
+from src.audio_codecs.frame_assembler import FrameAssembler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EchoCanceller:
+    """
+    录音总线之间的回声消除处理线程.
+    """
+
+    # 参考信号能量超过该值（dBFS）才视为正在播放，用于ERLE估算
+    RENDER_ACTIVE_DB = -50.0
+    # ERLE能量平滑系数
+    ERLE_SMOOTHING = 0.05
+
+    def __init__(
+        self,
+        processor,
+        mic_bus: CaptureBus,
+        output_bus: CaptureBus,
+        capture_rate: int,
+        render_rate: int,
+        delay_estimator=None,
+    ):
+        """初始化回声消除线程.
+
+        Args:
+            processor: WebRTCProcessor实例（10ms子帧）
+            mic_bus: 原始麦克风帧总线（输入）
+            output_bus: 处理后的录音总线（输出）
+            capture_rate: 录音采样率
+            render_rate: 播放采样率
+            delay_estimator: 可选的EchoDelayEstimator，自动跟踪回声路径延迟
+        """
+        self.processor = processor
+        self.mic_bus = mic_bus
+        self.output_bus = output_bus
+        self.frame_size = mic_bus.frame_size
+        self.subframe_size = processor.frame_size
+        self.delay_estimator = delay_estimator
+
+        # 参考环：播放回调写入，处理线程读取，约1秒容量
+        self.reference = AudioRingBuffer(render_rate, "aec_reference")
+        self._reference_chunk = np.zeros(render_rate, dtype=np.int16)
+        self._reference_resampler = None
+        if render_rate != capture_rate:
+            self._reference_resampler = soxr.ResampleStream(
+                render_rate, capture_rate, 1, dtype="int16", quality="QQ"
+            )
+        self._reference_frames = FrameAssembler(self.subframe_size)
+        self._render_threshold = (32768.0 * 10 ** (self.RENDER_ACTIVE_DB / 20)) ** 2
+
+        # 批次缓冲区：一次最多处理processor.max_frames个子帧
+        self.batch_frames = max(
+            1, processor.max_frames * self.subframe_size // self.frame_size
+        )
+        self._batch_in = np.zeros((self.batch_frames, self.frame_size), dtype=np.int16)
+        self._batch_out = np.zeros_like(self._batch_in)
+        self._batch_times = np.zeros(self.batch_frames, dtype=np.float64)
+        # ERLE能量计算用的浮点缓冲区
+        self._power_in = np.zeros(self._batch_in.shape, dtype=np.float64)
+        self._power_out = np.zeros(self._batch_in.shape, dtype=np.float64)
+
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # 统计
+        self.frames_processed = 0
+        self.render_frames = 0
+        self.process_time_total = 0.0
+        self.process_time_max = 0.0
+        self._echo_power = 0.0
+        self._residual_power = 0.0
+
+    def write_reference(self, samples: np.ndarray):
+        """
+        写入实际播放的样本（播放回调中调用，空间不足时丢弃本块）.
+        """
+        self.reference.write(samples)
+
+    def start(self):
+        """
+        启动处理线程.
+        """
+        if self._running:
+            return
+        self._subscription = self.mic_bus.subscribe(
+            "aec", max_backlog=50, policy=DROP_OLDEST
+        )
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="EchoCanceller", daemon=True
+        )
+        self._thread.start()
+        logger.info("回声消除线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        """
+        停止处理线程.
+        """
+        self._running = False
+        if self._subscription:
+            self.mic_bus.unsubscribe(self._subscription)
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        self._subscription = None
+
+    @property
+    def erle_db(self) -> Optional[float]:
+        """
+        回声损耗增强估计（dB），尚无播放期间的样本时为None.
+        """
+        if self._echo_power <= 0 or self._residual_power <= 0:
+            return None
+        return 10 * math.log10(self._echo_power / self._residual_power)
+
+    def get_stats(self) -> dict:
+        """
+        获取回声消除统计信息.
+        """
+        frames = self.frames_processed
+        erle = self.erle_db
+        return {
+            "frames_processed": frames,
+            "render_active_frames": self.render_frames,
+            "process_us_mean": (
+                round(self.process_time_total / frames * 1e6, 1) if frames else 0.0
+            ),
+            "process_us_max": round(self.process_time_max * 1e6, 1),
+            "erle_db": round(erle, 1) if erle is not None else None,
+            "reference": self.reference.get_stats(),
+            "stream_delay_ms": self.processor.stream_delay_ms,
+            "delay_estimator": (
+                self.delay_estimator.get_stats() if self.delay_estimator else None
+            ),
+        }
+
+    def _run(self):
+        """
+        处理线程主循环：等待麦克风帧，按批次先送入参考信号再处理录音.
+        """
+        while self._running:
+            subscription = self._subscription
+            if subscription is None or not subscription.wait(0.5):
+                continue
+            frames = subscription.drain()
+            for first in range(0, len(frames), self.batch_frames):
+                if not self._running:
+                    break
+                batch = frames[first : first + self.batch_frames]
+                try:
+                    self._process_batch(batch)
+                except Exception as e:
+                    logger.error(f"回声消除处理失败: {e}")
+                    for frame, captured_at in batch:
+                        self.output_bus.publish(frame, captured_at)
+
+    def _process_batch(self, frames):
+        """
+        处理一批录音帧并逐帧发布到输出总线.
+        """
+        count = len(frames)
+        batch_in = self._batch_in[:count]
+        batch_out = self._batch_out[:count]
+        # 总线帧视图会被后续帧覆盖，先复制到批次缓冲区
+        for i, (frame, captured_at) in enumerate(frames):
+            batch_in[i] = frame
+            self._batch_times[i] = captured_at
+
+        start = time.perf_counter()
+        render_power = self._feed_reference()
+        self.processor.process_capture(batch_in.reshape(-1), out=batch_out.reshape(-1))
+        elapsed = time.perf_counter() - start
+
+        self.frames_processed += count
+        self.process_time_total += elapsed
+        per_frame = elapsed / count
+        if per_frame > self.process_time_max:
+            self.process_time_max = per_frame
+
+        if render_power >= self._render_threshold:
+            self._update_erle(count)
+
+        if self.delay_estimator:
+            self.delay_estimator.push_capture(batch_in.reshape(-1))
+            delay_ms = self.delay_estimator.update()
+            if delay_ms is not None:
+                self.processor.set_stream_delay(delay_ms)
+
+        for row, captured_at in zip(batch_out, self._batch_times[:count]):
+            self.output_bus.publish(row, float(captured_at))
+
+    def _feed_reference(self) -> float:
+        """送入已播放的参考信号.
+
+        Returns:
+            float: 本次送入参考信号的均方能量
+        """
+        count = self.reference.available
+        if count == 0:
+            return 0.0
+        count = min(count, len(self._reference_chunk))
+        chunk = self._reference_chunk[:count]
+        self.reference.read_into(chunk)
+        if self._reference_resampler is not None:
+            chunk = self._reference_resampler.resample_chunk(chunk, last=False)
+
+        subframes = self._reference_frames.push(chunk)
+        if not len(subframes):
+            return 0.0
+        samples = subframes.reshape(-1)
+        self.processor.process_render(samples)
+        if self.delay_estimator:
+            self.delay_estimator.push_render(samples)
+        return float(np.dot(samples, samples.astype(np.float64))) / len(samples)
+
+    def _update_erle(self, count: int):
+        """
+        播放期间平滑累计输入（含回声）与输出（残余回声）能量.
+        """
+        power_in = self._power_in[:count]
+        power_out = self._power_out[:count]
+        np.copyto(power_in, self._batch_in[:count])
+        np.copyto(power_out, self._batch_out[:count])
+        np.square(power_in, out=power_in)
+        np.square(power_out, out=power_out)
+        mic_power = float(power_in.mean())
+        out_power = float(power_out.mean())
+
+        alpha = self.ERLE_SMOOTHING
+        self._echo_power += alpha * (mic_power - self._echo_power)
+        self._residual_power += alpha * (out_power - self._residual_power)
+        self.render_frames += count
@@ -0,0 +1,196 @@
+"""本地语音端点检测.
+
+AUTO_STOP模式下由服务器判断用户何时说完，判断之前静音会一直上传，
+每轮对话还要多等一个网络往返。本模块只在AUTO_STOP监听期间运行：
+1. 订阅录音总线，每批帧用能量+WebRTC VAD判断是否为语音
+2. 累计语音达到MIN_SPEECH_MS后，尾部静音达到TRAILING_SILENCE_MS即判定说完
+   （不足最短语音的短促声音在静音后清零，不触发）
+3. 判定后由应用停止上传并主动发送停止监听
+4. 收到服务器的识别结果时记录两者先后和时间差，便于调整阈值
+"""
+
+import asyncio
+import math
+import time
+from typing import Optional
+
+from src.audio_codecs.capture_bus import DROP_OLDEST
+from src.audio_processing.speech_activity import SpeechClassifier
+from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SpeechEndpointer:
+    """
+    基于VAD和尾部静音的本地端点检测器.
+    """
+
+    def __init__(self, audio_codec, app_instance, config=None):
+        """初始化端点检测器.
+
+        Args:
+            audio_codec: 音频编解码器实例（提供录音总线）
+            app_instance: 应用程序实例，判定说完时调用其stop_listening_at_endpoint
+            config: 配置来源，默认使用ConfigManager
+        """
+        config = config or ConfigManager.get_instance()
+        self.audio_codec = audio_codec
+        self.app = app_instance
+
+        self.classifier = SpeechClassifier(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.INPUT_FRAME_SIZE,
+            energy_threshold_db=config.get_config(
+                "AUDIO_OPTIONS.ENDPOINTER.ENERGY_THRESHOLD_DB", -45
+            ),
+            vad_mode=config.get_config("AUDIO_OPTIONS.ENDPOINTER.VAD_MODE", 2),
+        )
+        frame_ms = AudioConfig.FRAME_DURATION
+        self.min_speech_frames = max(
+            1,
+            math.ceil(
+                config.get_config("AUDIO_OPTIONS.ENDPOINTER.MIN_SPEECH_MS", 300)
+                / frame_ms
+            ),
+        )
+        self.trailing_silence_frames = max(
+            1,
+            math.ceil(
+                config.get_config("AUDIO_OPTIONS.ENDPOINTER.TRAILING_SILENCE_MS", 700)
+                / frame_ms
+            ),
+        )
+
+        self._subscription = None
+        self._task: Optional[asyncio.Task] = None
+        # 当前轮次：尾部静音帧数、本地判定时间
+        self._silence_frames = 0
+        self._decided_at: Optional[float] = None
+
+        # 统计
+        self.frames_processed = 0
+        self.local_endpoints = 0
+        self.server_first = 0
+        self.last_speech_ms = None
+        self.last_stt_after_local_ms = None
+
+    def start(self):
+        """
+        开始检测（进入AUTO_STOP监听时调用），须在事件循环线程中调用.
+        """
+        if self._task and not self._task.done():
+            return
+        self._silence_frames = 0
+        self._decided_at = None
+        try:
+            self._subscription = self.audio_codec.capture_bus.subscribe(
+                "endpointer", max_backlog=50, policy=DROP_OLDEST
+            )
+        except Exception as e:
+            logger.error(f"订阅录音总线失败: {e}")
+            return
+        self._task = asyncio.create_task(self._detection_loop(self._subscription))
+        logger.debug("本地端点检测已启动")
+
+    def stop(self):
+        """
+        停止检测（离开监听状态时调用），须在事件循环线程中调用.
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._subscription:
+            self.audio_codec.capture_bus.unsubscribe(self._subscription)
+            self._subscription = None
+
+    def is_running(self) -> bool:
+        """
+        检查端点检测是否正在运行.
+        """
+        return self._task is not None and not self._task.done()
+
+    def on_server_endpoint(self):
+        """
+        收到服务器识别结果（服务器判定说完）时调用，记录与本地判定的先后.
+        """
+        frame_ms = AudioConfig.FRAME_DURATION
+        if self._decided_at is not None:
+            delta = (time.monotonic() - self._decided_at) * 1000
+            self.last_stt_after_local_ms = round(delta, 1)
+            logger.info(f"端点对比: 服务器识别结果在本地判定后 {delta:.0f}ms 到达")
+        elif self.is_running():
+            self.server_first += 1
+            logger.info(
+                f"端点对比: 服务器先判定说完"
+                f"（本地尾部静音 {self._silence_frames * frame_ms}ms）"
+            )
+        self._decided_at = None
+
+    def get_stats(self) -> dict:
+        """
+        获取端点检测统计信息.
+        """
+        frame_ms = AudioConfig.FRAME_DURATION
+        return {
+            "running": self.is_running(),
+            "min_speech_ms": self.min_speech_frames * frame_ms,
+            "trailing_silence_ms": self.trailing_silence_frames * frame_ms,
+            "frames_processed": self.frames_processed,
+            "local_endpoints": self.local_endpoints,
+            "server_first": self.server_first,
+            "last_speech_ms": self.last_speech_ms,
+            "last_stt_after_local_ms": self.last_stt_after_local_ms,
+        }
+
+    async def _detection_loop(self, subscription):
+        """
+        等待录音总线的新帧，语音足够长且尾部静音达到阈值时判定说完.
+        """
+        speech_frames = 0
+        try:
+            while True:
+                await subscription.wait_async()
+                frames = subscription.drain()
+                if not frames:
+                    continue
+
+                # 总线帧视图会被后续帧覆盖，取出后立即整批判断
+                speech = self.classifier.classify([frame for frame, _ in frames])
+                self.frames_processed += len(frames)
+
+                for is_speech in speech:
+                    if is_speech:
+                        speech_frames += 1
+                        self._silence_frames = 0
+                        continue
+                    self._silence_frames += 1
+                    if self._silence_frames < self.trailing_silence_frames:
+                        continue
+                    if speech_frames >= self.min_speech_frames:
+                        self._trigger_endpoint(speech_frames)
+                        return
+                    # 短促的声音（咳嗽、敲击）不算一句话
+                    speech_frames = 0
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"端点检测出错: {e}", exc_info=True)
+
+    def _trigger_endpoint(self, speech_frames: int):
+        """
+        判定用户说完，每个监听阶段最多一次.
+        """
+        frame_ms = AudioConfig.FRAME_DURATION
+        self._decided_at = time.monotonic()
+        self.local_endpoints += 1
+        self.last_speech_ms = speech_frames * frame_ms
+        logger.info(
+            f"本地判定说完: 语音 {self.last_speech_ms}ms，"
+            f"尾部静音 {self._silence_frames * frame_ms}ms"
+        )
+
+        # stop_listening_at_endpoint会切换到IDLE并停止本检测器，放到独立任务中执行
+        asyncio.create_task(self.app.stop_listening_at_endpoint())
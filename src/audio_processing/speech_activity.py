@@ -0,0 +1,241 @@
+"""语音活动前置门控.
+
+唤醒词识别等较重的处理只需要在有人说话时运行，用两级判断过滤静音：
+1. RMS能量：整批帧一次向量化计算，低于阈值的帧直接判为静音
+2. WebRTC VAD：只对超过能量阈值的帧调用，进一步排除非语音噪声
+
+SpeechGate在此基础上增加拖尾（hangover）和预录（pre-roll），
+语音开始前的若干帧会随首个语音帧一起放行，避免吞掉唤醒词开头。
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import webrtcvad
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Frame = Tuple[np.ndarray, float]
+
+
+class SpeechClassifier:
+    """
+    逐帧判断是否为语音（能量阈值 + WebRTC VAD）.
+    """
+
+    # WebRTC VAD支持的帧长（毫秒）
+    VAD_FRAME_MS = (10, 20, 30)
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        energy_threshold_db: float = -50.0,
+        vad_mode: int = 2,
+    ):
+        """初始化语音分类器.
+
+        Args:
+            sample_rate: 采样率（8/16/32/48kHz）
+            frame_size: 每帧样本数
+            energy_threshold_db: 能量阈值（dBFS），低于该值直接判为静音
+            vad_mode: WebRTC VAD灵敏度（0-3），越大越严格
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.energy_threshold_db = energy_threshold_db
+        # 用均方值比较，避免逐帧开方和取对数
+        self._energy_threshold = (32768.0 * 10 ** (energy_threshold_db / 20)) ** 2
+
+        self.vad = webrtcvad.Vad(max(0, min(3, int(vad_mode))))
+        # 帧长不是VAD支持的长度时，按最大的可用子帧长度切分
+        self._vad_chunk = frame_size
+        frame_ms = frame_size * 1000 / sample_rate
+        if frame_ms not in self.VAD_FRAME_MS:
+            for ms in reversed(self.VAD_FRAME_MS):
+                chunk = sample_rate * ms // 1000
+                if frame_size % chunk == 0:
+                    self._vad_chunk = chunk
+                    break
+            else:
+                logger.warning(f"帧长 {frame_ms}ms 不适合WebRTC VAD，仅使用能量判断")
+                self._vad_chunk = 0
+
+        self._batch = np.zeros((0, frame_size), dtype=np.float32)
+
+    def classify(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        """判断一批帧是否为语音.
+
+        Args:
+            frames: 一维int16定长帧序列
+
+        Returns:
+            np.ndarray: 每帧是否为语音的布尔数组
+        """
+        count = len(frames)
+        if count > len(self._batch):
+            self._batch = np.zeros((count, self.frame_size), dtype=np.float32)
+        batch = self._batch[:count]
+        for row, frame in zip(batch, frames):
+            np.copyto(row, frame, casting="unsafe")
+
+        # 整批一次计算均方能量（原地平方，不额外分配）
+        np.square(batch, out=batch)
+        speech = batch.mean(axis=1) >= self._energy_threshold
+
+        if self._vad_chunk:
+            for index in np.flatnonzero(speech):
+                speech[index] = self._is_voiced(frames[index])
+        return speech
+
+    def _is_voiced(self, frame: np.ndarray) -> bool:
+        """
+        WebRTC VAD判断，任一子帧为语音即视为语音帧.
+        """
+        data = frame.tobytes()
+        step = self._vad_chunk * 2
+        for offset in range(0, len(data), step):
+            if self.vad.is_speech(data[offset : offset + step], self.sample_rate):
+                return True
+        return False
+
+
+class SpeechGate:
+    """
+    带拖尾和预录的语音门控，只放行可能包含语音的帧.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        energy_threshold_db: float = -50.0,
+        vad_mode: int = 2,
+        hangover_ms: int = 300,
+        pre_roll_ms: int = 200,
+    ):
+        """初始化语音门控.
+
+        Args:
+            sample_rate: 采样率
+            frame_size: 每帧样本数
+            energy_threshold_db: 能量阈值（dBFS）
+            vad_mode: WebRTC VAD灵敏度（0-3）
+            hangover_ms: 最后一个语音帧之后继续放行的时长（毫秒）
+            pre_roll_ms: 门控打开时补发的语音开始前音频时长（毫秒）
+        """
+        self.classifier = SpeechClassifier(
+            sample_rate, frame_size, energy_threshold_db, vad_mode
+        )
+        frame_ms = frame_size * 1000 / sample_rate
+        self.hangover_frames = max(0, int(round(hangover_ms / frame_ms)))
+        self.pre_roll_frames = max(0, int(round(pre_roll_ms / frame_ms)))
+
+        # 预录环：门控关闭时保存最近的帧副本（总线帧视图会被覆盖）
+        slots = max(self.pre_roll_frames, 1)
+        self._pre_roll = np.zeros((slots, frame_size), dtype=np.int16)
+        self._pre_roll_times = np.zeros(slots, dtype=np.float64)
+        self._pre_roll_count = 0
+        self._pre_roll_next = 0
+
+        self.is_open = False
+        self._hangover_left = 0
+
+        # 统计
+        self.frames_total = 0
+        self.frames_passed = 0
+        self.openings = 0
+
+    @property
+    def gated_ratio(self) -> float:
+        """
+        被门控拦截（未送入识别器）的帧比例.
+        """
+        if not self.frames_total:
+            return 0.0
+        return 1.0 - self.frames_passed / self.frames_total
+
+    def process(self, frames: Sequence[Frame]) -> Tuple[List[Frame], bool]:
+        """过滤一批帧.
+
+        Args:
+            frames: (帧, 采集时间)序列，按采集顺序排列
+
+        Returns:
+            Tuple[List[Frame], bool]: 放行的帧（含预录帧），以及本批内门控是否由开转关
+        """
+        speech = self.classifier.classify([frame for frame, _ in frames])
+        passed: List[Frame] = []
+        closed = False
+
+        for (frame, captured_at), is_speech in zip(frames, speech):
+            if is_speech:
+                if not self.is_open:
+                    self.is_open = True
+                    self.openings += 1
+                    passed.extend(self._flush_pre_roll())
+                self._hangover_left = self.hangover_frames
+                passed.append((frame, captured_at))
+            elif self.is_open and self._hangover_left > 0:
+                self._hangover_left -= 1
+                passed.append((frame, captured_at))
+            else:
+                if self.is_open:
+                    self.is_open = False
+                    closed = True
+                self._push_pre_roll(frame, captured_at)
+
+        self.frames_total += len(frames)
+        self.frames_passed += len(passed)
+        return passed, closed
+
+    def reset(self):
+        """
+        关闭门控并清空预录.
+        """
+        self.is_open = False
+        self._hangover_left = 0
+        self._pre_roll_count = 0
+        self._pre_roll_next = 0
+
+    def get_stats(self) -> dict:
+        """
+        获取门控统计信息.
+        """
+        return {
+            "open": self.is_open,
+            "frames_total": self.frames_total,
+            "frames_passed": self.frames_passed,
+            "gated_ratio": round(self.gated_ratio, 4),
+            "openings": self.openings,
+        }
+
+    def _push_pre_roll(self, frame: np.ndarray, captured_at: float):
+        """
+        保存一帧到预录环.
+        """
+        if not self.pre_roll_frames:
+            return
+        slot = self._pre_roll_next
+        self._pre_roll[slot] = frame
+        self._pre_roll_times[slot] = captured_at
+        self._pre_roll_next = (slot + 1) % self.pre_roll_frames
+        self._pre_roll_count = min(self._pre_roll_count + 1, self.pre_roll_frames)
+
+    def _flush_pre_roll(self) -> List[Frame]:
+        """
+        按时间顺序取出并清空预录帧（返回副本，之后的静音帧会复用预录环）.
+        """
+        count = self._pre_roll_count
+        if not count:
+            return []
+        start = (self._pre_roll_next - count) % self.pre_roll_frames
+        frames = []
+        for i in range(count):
+            slot = (start + i) % self.pre_roll_frames
+            captured_at = float(self._pre_roll_times[slot])
+            frames.append((self._pre_roll[slot].copy(), captured_at))
+        self._pre_roll_count = 0
+        return frames
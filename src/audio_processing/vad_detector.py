@@ -1,298 +1,154 @@
-import logging
-import threading
-import time
+"""用户打断（barge-in）检测.
+
+只在设备播放语音（SPEAKING）期间运行：
+1. 进入SPEAKING时订阅录音总线并在事件循环中await新帧，离开时取消，不轮询、不休眠
+2. 每批帧一次向量化计算能量，超过阈值的帧再按10/20/30ms子帧送入WebRTC VAD
+3. 连续语音达到MIN_SPEECH_MS即在事件循环中直接调用abort_speaking
 
-import numpy as np
-import pyaudio
-import webrtcvad
+从语音开始到发出打断的耗时记录为LatencyMonitor的barge_in阶段。
+"""
 
-from src.constants.constants import AbortReason, DeviceState
+import asyncio
+import math
+import time
+from typing import Optional
 
-# 配置日志
-logger = logging.getLogger("VADDetector")
+from src.audio_codecs.capture_bus import SKIP_TO_LATEST
+from src.audio_processing.speech_activity import SpeechClassifier
+from src.constants.constants import AbortReason, AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.latency_monitor import LatencyMonitor
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class VADDetector:
     """
-    基于WebRTC VAD的语音活动检测器，用于检测用户打断.
+    基于能量和WebRTC VAD的用户打断检测器.
     """
 
-    def __init__(self, audio_codec, protocol, app_instance, loop):
-        """初始化VAD检测器.
+    def __init__(self, audio_codec, app_instance, config=None):
+        """初始化打断检测器.
 
-        参数:
-            audio_codec: 音频编解码器实例
-            protocol: 通信协议实例
-            app_instance: 应用程序实例
-            loop: 事件循环
+        Args:
+            audio_codec: 音频编解码器实例（提供录音总线）
+            app_instance: 应用程序实例，检测到打断时调用其abort_speaking
+            config: 配置来源，默认使用ConfigManager
         """
+        config = config or ConfigManager.get_instance()
         self.audio_codec = audio_codec
-        self.protocol = protocol
         self.app = app_instance
-        self.loop = loop
-
-        # VAD设置
-        self.vad = webrtcvad.Vad()
-        self.vad.set_mode(3)  # 设置最高灵敏度
 
-        # 参数设置
-        self.sample_rate = 16000
-        self.frame_duration = 20  # 毫秒
-        self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
-        self.speech_window = 5  # 连续检测到多少帧语音才触发打断
-        self.energy_threshold = 300  # 能量阈值
+        self.classifier = SpeechClassifier(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.INPUT_FRAME_SIZE,
+            energy_threshold_db=config.get_config(
+                "AUDIO_OPTIONS.BARGE_IN.ENERGY_THRESHOLD_DB", -40
+            ),
+            vad_mode=config.get_config("AUDIO_OPTIONS.BARGE_IN.VAD_MODE", 3),
+        )
+        min_speech_ms = config.get_config("AUDIO_OPTIONS.BARGE_IN.MIN_SPEECH_MS", 100)
+        # 连续检测到多少帧语音才触发打断
+        self.speech_window = max(
+            1, math.ceil(min_speech_ms / AudioConfig.FRAME_DURATION)
+        )
 
-        # 状态变量
-        self.running = False
-        self.paused = False
-        self.thread = None
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
+        self._subscription = None
+        self._task: Optional[asyncio.Task] = None
 
-        # 创建独立的PyAudio实例和流，避免与主音频流冲突
-        self.pa = None
-        self.stream = None
+        # 统计
+        self.frames_processed = 0
+        self.triggers = 0
+        self.last_latency_ms = None
 
     def start(self):
         """
-        启动VAD检测器.
+        开始检测（进入SPEAKING时调用），须在事件循环线程中调用.
         """
-        if self.thread and self.thread.is_alive():
-            logger.warning("VAD检测器已经在运行")
+        if self._task and not self._task.done():
             return
-
-        self.running = True
-        self.paused = False
-
-        # 初始化PyAudio和流
-        self._initialize_audio_stream()
-
-        # 启动检测线程
-        self.thread = threading.Thread(target=self._detection_loop, daemon=True)
-        self.thread.start()
-        logger.info("VAD检测器已启动")
-
-    def stop(self):
-        """
-        停止VAD检测器.
-        """
-        self.running = False
-
-        # 关闭音频流
-        self._close_audio_stream()
-
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=1.0)
-
-        logger.info("VAD检测器已停止")
-
-    def pause(self):
-        """
-        暂停VAD检测.
-        """
-        self.paused = True
-        logger.info("VAD检测器已暂停")
-
-    def resume(self):
-        """
-        恢复VAD检测.
-        """
-        self.paused = False
-        # 重置状态
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
-        logger.info("VAD检测器已恢复")
-
-    def is_running(self):
-        """
-        检查VAD检测器是否正在运行.
-        """
-        return self.running and not self.paused
-
-    def _initialize_audio_stream(self):
-        """
-        初始化独立的音频流.
-        """
         try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-
-            # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info["maxInputChannels"] > 0:
-                    device_index = i
-                    break
-
-            if device_index is None:
-                logger.error("找不到可用的输入设备")
-                return False
-
-            # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self.frame_size,
-                start=True,
+            # 只关心最新的声音，积压过多时直接跳到最新帧
+            self._subscription = self.audio_codec.capture_bus.subscribe(
+                "vad", max_backlog=10, policy=SKIP_TO_LATEST
             )
-
-            logger.info(f"VAD检测器音频流已初始化，使用设备索引: {device_index}")
-            return True
-
         except Exception as e:
-            logger.error(f"初始化VAD音频流失败: {e}")
-            return False
+            logger.error(f"订阅录音总线失败: {e}")
+            return
+        self._task = asyncio.create_task(self._detection_loop(self._subscription))
+        logger.debug("打断检测已启动")
 
-    def _close_audio_stream(self):
+    def stop(self):
         """
-        关闭音频流.
+        停止检测（离开SPEAKING时调用），须在事件循环线程中调用.
         """
-        try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
-
-            logger.info("VAD检测器音频流已关闭")
-        except Exception as e:
-            logger.error(f"关闭VAD音频流失败: {e}")
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._subscription:
+            self.audio_codec.capture_bus.unsubscribe(self._subscription)
+            self._subscription = None
 
-    def _detection_loop(self):
+    def is_running(self) -> bool:
         """
-        VAD检测主循环.
+        检查打断检测是否正在运行.
         """
-        logger.info("VAD检测循环已启动")
-
-        while self.running:
-            # 如果暂停或者音频流未初始化，则跳过
-            if self.paused or not self.stream:
-                time.sleep(0.1)
-                continue
-
-            try:
-                # 只在说话状态下进行检测
-                if self.app.device_state == DeviceState.SPEAKING:
-                    # 读取音频帧
-                    frame = self._read_audio_frame()
-                    if not frame:
-                        time.sleep(0.01)
-                        continue
-
-                    # 检测是否是语音
-                    is_speech = self._detect_speech(frame)
+        return self._task is not None and not self._task.done()
 
-                    # 如果检测到语音并且达到触发条件，处理打断
-                    if is_speech:
-                        self._handle_speech_frame(frame)
-                    else:
-                        self._handle_silence_frame(frame)
-                else:
-                    # 不在说话状态，重置状态
-                    self._reset_state()
-
-            except Exception as e:
-                logger.error(f"VAD检测循环出错: {e}")
-
-            time.sleep(0.01)  # 小延迟，减少CPU使用
-
-        logger.info("VAD检测循环已结束")
-
-    def _read_audio_frame(self):
+    def get_stats(self) -> dict:
         """
-        读取一帧音频数据.
+        获取打断检测统计信息.
         """
-        try:
-            if not self.stream or not self.stream.is_active():
-                return None
-
-            # 读取音频数据
-            data = self.stream.read(self.frame_size, exception_on_overflow=False)
-            return data
-        except Exception as e:
-            logger.error(f"读取音频帧失败: {e}")
-            return None
+        return {
+            "running": self.is_running(),
+            "speech_window_frames": self.speech_window,
+            "frames_processed": self.frames_processed,
+            "triggers": self.triggers,
+            "last_latency_ms": self.last_latency_ms,
+        }
 
-    def _detect_speech(self, frame):
+    async def _detection_loop(self, subscription):
         """
-        检测是否是语音.
+        等待录音总线的新帧，连续语音帧数达到窗口时触发打断.
         """
+        speech_count = 0
+        onset = 0.0
         try:
-            # 确保帧长度正确
-            if len(frame) != self.frame_size * 2:  # 16位音频，每个样本2字节
-                return False
-
-            # 使用VAD检测
-            is_speech = self.vad.is_speech(frame, self.sample_rate)
-
-            # 计算音频能量
-            audio_data = np.frombuffer(frame, dtype=np.int16)
-            energy = np.mean(np.abs(audio_data))
-
-            # 结合VAD和能量阈值
-            is_valid_speech = is_speech and energy > self.energy_threshold
-
-            if is_valid_speech:
-                logger.debug(
-                    f"检测到语音 [能量: {energy:.2f}] [连续语音帧: {self.speech_count+1}]"
-                )
-
-            return is_valid_speech
+            while True:
+                await subscription.wait_async()
+                frames = subscription.drain()
+                if not frames:
+                    continue
+
+                # 总线帧视图会被后续帧覆盖，取出后立即整批判断
+                speech = self.classifier.classify([frame for frame, _ in frames])
+                self.frames_processed += len(frames)
+
+                for (_, captured_at), is_speech in zip(frames, speech):
+                    if not is_speech:
+                        speech_count = 0
+                        continue
+                    if speech_count == 0:
+                        onset = captured_at
+                    speech_count += 1
+                    if speech_count >= self.speech_window:
+                        self._trigger_interrupt(onset)
+                        return
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            logger.error(f"检测语音失败: {e}")
-            return False
+            logger.error(f"打断检测出错: {e}", exc_info=True)
 
-    def _handle_speech_frame(self, frame):
+    def _trigger_interrupt(self, onset: float):
         """
-        处理语音帧.
+        触发打断，每个SPEAKING阶段最多一次.
         """
-        self.speech_count += 1
-        self.silence_count = 0
+        latency = time.monotonic() - onset
+        self.triggers += 1
+        self.last_latency_ms = round(latency * 1000, 1)
+        LatencyMonitor.get_instance().record("barge_in", latency)
+        logger.info(f"检测到用户打断（语音开始后 {self.last_latency_ms}ms）")
 
-        # 检测到足够的连续语音帧，触发打断
-        if self.speech_count >= self.speech_window and not self.triggered:
-            self.triggered = True
-            logger.info("检测到持续语音，触发打断！")
-            self._trigger_interrupt()
-
-            # 立即暂停自己，防止重复触发
-            self.paused = True
-            logger.info("VAD检测器已自动暂停以防止重复触发")
-
-            # 重置状态
-            self.speech_count = 0
-            self.silence_count = 0
-            self.triggered = False
-
-    def _handle_silence_frame(self, frame):
-        """
-        处理静音帧.
-        """
-        self.silence_count += 1
-        self.speech_count = 0
-
-    def _reset_state(self):
-        """
-        重置状态.
-        """
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
-
-    def _trigger_interrupt(self):
-        """
-        触发打断.
-        """
-        # 通知应用程序中止当前语音输出
-        self.app.schedule(
-            lambda: self.app.abort_speaking(AbortReason.WAKE_WORD_DETECTED)
-        )
+        # abort_speaking会切换到IDLE并停止本检测器，放到独立任务中执行
+        asyncio.create_task(self.app.abort_speaking(AbortReason.WAKE_WORD_DETECTED))
@@ -0,0 +1,190 @@
+"""Vosk模型共享缓存.
+
+Vosk模型加载需要数秒，且同一模型可以被多个识别器共享：
+1. 进程启动时即可调用preload在后台线程开始加载，不阻塞启动流程
+2. 同一路径的模型只加载一次，所有检测器实例共享同一个Model对象
+3. 只有真正开始识别时才等待加载完成，并记录加载与等待耗时，用于启动耗时分析
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def resolve_model_path(model_name: str) -> str:
+    """
+    按名称或路径查找Vosk模型目录.
+    """
+    from src.utils.resource_finder import resource_finder
+
+    model_path = Path(model_name)
+
+    # 绝对路径直接返回
+    if model_path.is_absolute() and model_path.exists():
+        return str(model_path)
+
+    # 标准化为models子目录路径
+    if len(model_path.parts) == 1:
+        model_path = Path("models") / model_path
+
+    # 使用resource_finder查找
+    model_dir_path = resource_finder.find_directory(model_path)
+    if model_dir_path:
+        return str(model_dir_path)
+
+    # 在models目录中查找
+    models_dir = resource_finder.find_models_dir()
+    if models_dir:
+        model_name_only = (
+            model_path.name if len(model_path.parts) > 1 else model_path
+        )
+        direct_model_path = models_dir / model_name_only
+        if direct_model_path.exists():
+            return str(direct_model_path)
+
+        # 遍历子目录查找
+        for item in models_dir.iterdir():
+            if item.is_dir() and item.name == model_name_only:
+                return str(item)
+
+    # 使用默认路径
+    project_root = resource_finder.get_project_root()
+    default_path = project_root / model_path
+    logger.warning(f"未找到模型，将使用默认路径: {default_path}")
+    return str(default_path)
+
+
+class _ModelEntry:
+    """
+    单个模型的加载状态与耗时.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.future: Future = Future()
+        self.requested_at = time.monotonic()
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        # 使用方因模型未就绪而阻塞等待的累计时间
+        self.waited_seconds = 0.0
+
+
+class VoskModelCache:
+    """
+    按路径共享的Vosk模型缓存（单例）.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取模型缓存实例.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def preload(self, path: str) -> Future:
+        """在后台线程开始加载模型，已在加载或已加载时直接返回.
+
+        Args:
+            path: 模型目录
+
+        Returns:
+            Future: 加载完成后结果为vosk.Model
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                return entry.future
+            entry = self._entries[path] = _ModelEntry(path)
+
+        threading.Thread(
+            target=self._load, args=(entry,), name="VoskModelLoader", daemon=True
+        ).start()
+        return entry.future
+
+    def get(self, path: str, timeout: Optional[float] = None):
+        """
+        获取模型（阻塞直到加载完成），未开始加载时立即开始.
+        """
+        future = self.preload(path)
+        start = time.monotonic()
+        try:
+            return future.result(timeout)
+        finally:
+            self._entries[path].waited_seconds += time.monotonic() - start
+
+    def get_stats(self) -> dict:
+        """
+        获取各模型的加载状态与耗时（秒）.
+        """
+        stats = {}
+        for path, entry in list(self._entries.items()):
+            if not entry.future.done():
+                state = "loading"
+            elif entry.future.exception() is not None:
+                state = "failed"
+            else:
+                state = "loaded"
+            stats[path] = {
+                "state": state,
+                "load_seconds": (
+                    round(entry.load_seconds, 3) if entry.load_seconds else None
+                ),
+                "waited_seconds": round(entry.waited_seconds, 3),
+            }
+        return stats
+
+    def _load(self, entry: _ModelEntry):
+        """
+        加载线程：创建vosk.Model并设置Future结果.
+        """
+        try:
+            from vosk import Model, SetLogLevel
+
+            logger.info(f"后台加载语音识别模型: {entry.path}")
+            SetLogLevel(-1)
+            model = Model(model_path=entry.path)
+            entry.loaded_at = time.monotonic()
+            entry.load_seconds = entry.loaded_at - entry.requested_at
+            logger.info(f"语音识别模型加载完成，耗时 {entry.load_seconds:.2f}s")
+            entry.future.set_result(model)
+        except Exception as e:
+            logger.error(f"加载语音识别模型失败: {e}")
+            entry.future.set_exception(e)
+
+
+def preload_wake_word_model() -> Optional[Future]:
+    """
+    按配置在后台预加载唤醒词模型（进程启动时调用），未启用唤醒词时不加载.
+    """
+    config = ConfigManager.get_instance()
+    if not config.get_config("WAKE_WORD_OPTIONS.USE_WAKE_WORD", False):
+        return None
+    try:
+        model_name = config.get_config(
+            "WAKE_WORD_OPTIONS.MODEL_PATH", "vosk-model-small-cn-0.22"
+        )
+        model_path = resolve_model_path(model_name)
+        if not Path(model_path).exists():
+            return None
+        return VoskModelCache.get_instance().preload(model_path)
+    except Exception as e:
+        logger.warning(f"预加载唤醒词模型失败: {e}")
+        return None
@@ -1,35 +1,70 @@
 import asyncio
-import difflib
 import json
 import os
 import re
+import threading
 import time
 from functools import lru_cache
 from pathlib import Path
 from typing import Callable, Optional
 
 from pypinyin import Style, lazy_pinyin
-from vosk import KaldiRecognizer, Model, SetLogLevel
+from vosk import KaldiRecognizer
 
+from src.audio_codecs.capture_bus import DROP_OLDEST
+from src.audio_processing.speech_activity import SpeechGate
+from src.audio_processing.vosk_model_cache import VoskModelCache, resolve_model_path
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
+from src.utils.latency_monitor import LatencyMonitor
 from src.utils.logging_config import get_logger
+from src.utils.phrase_index import PhraseIndex
 
 logger = get_logger(__name__)
 
+# 识别模式：grammar只在唤醒词+垃圾词上解码，open为开放词表识别
+RECOGNIZER_MODE_GRAMMAR = "grammar"
+RECOGNIZER_MODE_OPEN = "open"
+
+# Vosk语法中的垃圾词，吸收唤醒词以外的语音
+UNK_TOKEN = "[unk]"
+
 
 class WakeWordDetector:
     """唤醒词检测器 - 高级匹配算法版本"""
 
-    def __init__(self):
+    def __init__(self, config=None):
+        """初始化唤醒词检测器.
+
+        Args:
+            config: 提供get_config(path, default)的配置对象，默认使用ConfigManager
+                （离线基准测试可传入覆盖部分参数的配置）
+        """
         # 基本属性
         self.audio_codec = None
+        self._subscription = None
         self.is_running_flag = False
         self.paused = False
-        self.detection_task = None
+        # 识别线程：Vosk识别和唤醒词匹配都在该线程中执行，只把检测结果投递回事件循环
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 识别耗时统计（只由识别线程更新）
+        self.frames_processed = 0
+        self.samples_processed = 0
+        self.recognize_time_total = 0.0
+        self.recognize_time_max = 0.0
+        self.recognize_cpu_total = 0.0
+        self.recognizer_mode = None
+        # 检测滞后：识别完成时间与该批最后一帧采集时间之差
+        self.batches_processed = 0
+        self.max_batch_frames = 0
+        self.detection_lag_last = 0.0
+        self.detection_lag_max = 0.0
+        self._latency = LatencyMonitor.get_instance()
         
-        # 防重复触发机制
-        self.last_detection_time = 0
+        # 防重复触发机制（基于音频帧的采集时间，识别积压时也不会误判冷却）
+        self.last_detection_time = float("-inf")
         self.detection_cooldown = 3.0  # 3秒冷却时间
         
         # 回调函数
@@ -37,7 +72,7 @@ class WakeWordDetector:
         self.on_error: Optional[Callable] = None
 
         # 配置检查
-        config = ConfigManager.get_instance()
+        config = config or ConfigManager.get_instance()
         if not config.get_config("WAKE_WORD_OPTIONS.USE_WAKE_WORD", False):
             logger.info("唤醒词功能已禁用")
             self.enabled = False
@@ -68,12 +103,40 @@ class WakeWordDetector:
         self._recent_texts = []
         self._max_recent_cache = 10
 
+        # 语音门控：只在可能有人说话时把音频送入识别器
+        self._speech_gate = self._create_speech_gate(config)
+
         # 初始化模型
         self._init_model(config)
         
         # 验证配置
         self._validate_config()
 
+        # 预编译唤醒词匹配索引
+        self._phrase_index = self._build_phrase_index()
+
+    def _create_speech_gate(self, config) -> Optional[SpeechGate]:
+        """
+        按配置创建识别前的语音门控.
+        """
+        prefix = "WAKE_WORD_OPTIONS.SPEECH_GATE"
+        if not config.get_config(f"{prefix}.ENABLED", True):
+            return None
+        try:
+            return SpeechGate(
+                self.sample_rate,
+                AudioConfig.INPUT_FRAME_SIZE,
+                energy_threshold_db=config.get_config(
+                    f"{prefix}.ENERGY_THRESHOLD_DB", -50.0
+                ),
+                vad_mode=config.get_config(f"{prefix}.VAD_MODE", 2),
+                hangover_ms=config.get_config(f"{prefix}.HANGOVER_MS", 300),
+                pre_roll_ms=config.get_config(f"{prefix}.PRE_ROLL_MS", 200),
+            )
+        except Exception as e:
+            logger.warning(f"创建语音门控失败，所有音频将送入识别器: {e}")
+            return None
+
     def _build_wake_word_patterns(self):
         """
         构建唤醒词的拼音模式，包括多种变体.
@@ -127,148 +190,107 @@ class WakeWordDetector:
 
     def _init_model(self, config):
         """
-        初始化语音识别模型.
+        查找语音识别模型并在后台开始加载，识别线程启动时才等待加载完成.
         """
+        self._config = config
+        self.model = None
+        self.recognizer = None
         try:
-            model_path = self._get_model_path(config)
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"模型路径不存在: {model_path}")
-
-            logger.info(f"加载语音识别模型: {model_path}")
-            SetLogLevel(-1)
-            self.model = Model(model_path=model_path)
-            self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
-            self.recognizer.SetWords(True)
-            logger.info(f"模型加载完成，已配置 {len(self.wake_words)} 个唤醒词")
+            self._model_path = self._get_model_path(config)
+            if not os.path.exists(self._model_path):
+                raise FileNotFoundError(f"模型路径不存在: {self._model_path}")
+
+            # 同一路径的模型在进程内只加载一次，多个检测器共享
+            VoskModelCache.get_instance().preload(self._model_path)
 
         except Exception as e:
             logger.error(f"初始化失败: {e}", exc_info=True)
             self.enabled = False
 
-    def _get_model_path(self, config):
-        """
-        获取模型路径.
-        """
-        from src.utils.resource_finder import resource_finder
-
-        model_name = config.get_config(
-            "WAKE_WORD_OPTIONS.MODEL_PATH", "vosk-model-small-cn-0.22"
-        )
-
-        model_path = Path(model_name)
+    def load_model(self) -> bool:
+        """等待模型加载完成并创建识别器（阻塞，在识别线程或离线工具中调用）.
 
-        # 绝对路径直接返回
-        if model_path.is_absolute() and model_path.exists():
-            return str(model_path)
-
-        # 标准化为models子目录路径
-        if len(model_path.parts) == 1:
-            model_path = Path("models") / model_path
-
-        # 使用resource_finder查找
-        model_dir_path = resource_finder.find_directory(model_path)
-        if model_dir_path:
-            return str(model_dir_path)
-
-        # 在models目录中查找
-        models_dir = resource_finder.find_models_dir()
-        if models_dir:
-            model_name_only = (
-                model_path.name if len(model_path.parts) > 1 else model_path
+        Returns:
+            bool: 识别器是否可用
+        """
+        if self.recognizer is not None:
+            return True
+        try:
+            self.model = VoskModelCache.get_instance().get(self._model_path)
+            self.recognizer = self._create_recognizer(self._config)
+            self.recognizer.SetWords(True)
+            logger.info(
+                f"模型加载完成，已配置 {len(self.wake_words)} 个唤醒词"
+                f"（识别模式: {self.recognizer_mode}）"
             )
-            direct_model_path = models_dir / model_name_only
-            if direct_model_path.exists():
-                return str(direct_model_path)
-
-            # 遍历子目录查找
-            for item in models_dir.iterdir():
-                if item.is_dir() and item.name == model_name_only:
-                    return str(item)
-
-        # 使用默认路径
-        project_root = resource_finder.get_project_root()
-        default_path = project_root / model_path
-        logger.warning(f"未找到模型，将使用默认路径: {default_path}")
-        return str(default_path)
+            return True
+        except Exception as e:
+            logger.error(f"创建唤醒词识别器失败: {e}", exc_info=True)
+            self.enabled = False
+            return False
 
-    def _calculate_similarity(self, text_variants, pattern):
+    def _create_recognizer(self, config):
         """
-        计算文本与唤醒词模式的相似度.
+        按识别模式创建识别器，语法模式失败时仅在配置允许时回退到开放词表.
         """
-        max_similarity = 0.0
-        best_match_type = None
-
-        # 检查各种拼音变体的匹配
-        for variant_type in ["standard", "tone", "initials", "finals"]:
-            text_variant = text_variants.get(variant_type, "")
-            pattern_variant = pattern.get(variant_type, "")
-
-            if not text_variant or not pattern_variant:
-                continue
-
-            # 1. 精确匹配（最高优先级）
-            if pattern_variant in text_variant:
-                return 1.0, f"exact_{variant_type}"
-
-            # 2. 序列匹配器相似度
-            similarity = difflib.SequenceMatcher(
-                None, text_variant, pattern_variant
-            ).ratio()
+        mode = str(
+            config.get_config(
+                "WAKE_WORD_OPTIONS.RECOGNIZER_MODE", RECOGNIZER_MODE_GRAMMAR
+            )
+        ).lower()
 
-            # 3. 编辑距离匹配（适用于短文本）
-            if len(pattern_variant) <= 10:
-                edit_distance = self._levenshtein_distance(
-                    text_variant, pattern_variant
-                )
-                max_allowed_distance = min(
-                    self.max_edit_distance, len(pattern_variant) // 2
+        if mode == RECOGNIZER_MODE_GRAMMAR:
+            try:
+                recognizer = KaldiRecognizer(
+                    self.model, self.sample_rate, self._build_grammar()
                 )
-                if edit_distance <= max_allowed_distance:
-                    edit_similarity = 1.0 - (edit_distance / len(pattern_variant))
-                    similarity = max(similarity, edit_similarity)
+                self.recognizer_mode = RECOGNIZER_MODE_GRAMMAR
+                return recognizer
+            except Exception as e:
+                if not config.get_config("WAKE_WORD_OPTIONS.GRAMMAR_FALLBACK", False):
+                    raise RuntimeError(f"创建唤醒词语法识别器失败: {e}") from e
+                logger.warning(f"创建唤醒词语法识别器失败，回退到开放词表: {e}")
+        elif mode != RECOGNIZER_MODE_OPEN:
+            logger.warning(f"未知的识别模式 {mode}，使用开放词表识别")
 
-            # 4. 子序列匹配（对于首字母缩写）
-            if variant_type == "initials" and len(pattern_variant) >= 2:
-                if self._is_subsequence(pattern_variant, text_variant):
-                    similarity = max(similarity, 0.80)
+        self.recognizer_mode = RECOGNIZER_MODE_OPEN
+        return KaldiRecognizer(self.model, self.sample_rate)
 
-            if similarity > max_similarity:
-                max_similarity = similarity
-                best_match_type = variant_type
+    def _build_grammar(self) -> str:
+        """构建Vosk识别语法：每个唤醒词的整词和逐字形式，加上垃圾词.
 
-        return max_similarity, best_match_type
+        中文模型的词表不一定包含整个唤醒词，逐字形式保证唤醒词总能被解码；
+        不在词表中的词条会被Vosk忽略。
+        """
+        phrases = []
+        for word in self.wake_words:
+            for phrase in (word, " ".join(word)):
+                if phrase not in phrases:
+                    phrases.append(phrase)
+        phrases.append(UNK_TOKEN)
+        return json.dumps(phrases, ensure_ascii=False)
 
-    def _levenshtein_distance(self, s1, s2):
+    def _get_model_path(self, config):
         """
-        计算编辑距离.
+        获取模型路径.
         """
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        model_name = config.get_config(
+            "WAKE_WORD_OPTIONS.MODEL_PATH", "vosk-model-small-cn-0.22"
+        )
+        return resolve_model_path(model_name)
 
-    def _is_subsequence(self, pattern, text):
+    def _build_phrase_index(self) -> PhraseIndex:
         """
-        检查pattern是否为text的子序列.
+        用各唤醒词的拼音变体构建匹配索引（精确匹配 + 有界编辑距离模糊匹配）.
         """
-        i = 0
-        for char in text:
-            if i < len(pattern) and char == pattern[i]:
-                i += 1
-        return i == len(pattern)
+        # 首字母子序列匹配的相似度固定为0.8，阈值更高时不会命中，无需检查
+        subsequence_score = 0.80 if self.similarity_threshold <= 0.80 else 0.0
+        index = PhraseIndex(self.max_edit_distance, subsequence_score)
+        for wake_word, pattern in self.wake_word_patterns.items():
+            for variant_type in ("standard", "tone", "initials", "finals"):
+                index.add(wake_word, variant_type, pattern.get(variant_type, ""))
+        index.build()
+        return index
 
     def on_detected(self, callback: Callable):
         """
@@ -286,129 +308,192 @@ class WakeWordDetector:
 
         try:
             self.audio_codec = audio_codec
+            # 订阅共享录音总线，不再单独缓存一份唤醒词音频
+            self._subscription = audio_codec.capture_bus.subscribe(
+                "wakeword", max_backlog=100, policy=DROP_OLDEST
+            )
+            self._loop = asyncio.get_running_loop()
             self.is_running_flag = True
             self.paused = False
 
-            # 启动检测任务
-            self.detection_task = asyncio.create_task(self._detection_loop())
+            # 启动识别线程，避免Vosk识别阻塞事件循环
+            self._thread = threading.Thread(
+                target=self._detection_loop, name="WakeWordRecognizer", daemon=True
+            )
+            self._thread.start()
 
-            logger.info("异步唤醒词检测器启动成功")
+            logger.info("唤醒词检测器启动成功（独立识别线程，模型就绪后开始识别）")
             return True
         except Exception as e:
-            logger.error(f"启动异步唤醒词检测器失败: {e}")
+            logger.error(f"启动唤醒词检测器失败: {e}")
             self.enabled = False
             return False
 
-    async def _detection_loop(self):
+    # 单次送入识别器的最大帧数，积压较多时分批识别，保证部分结果的检查频率
+    MAX_BATCH_FRAMES = 25
+
+    def _detection_loop(self):
         """
-        检测循环.
+        识别线程主循环：等待录音总线发布通知，一次取出全部积压帧批量识别.
         """
+        # 模型在后台加载，首次识别前才等待，不阻塞应用启动
+        if not self.load_model():
+            self.is_running_flag = False
+            self._post_to_loop(self._report_error(RuntimeError("唤醒词模型加载失败")))
+            return
+        if self._subscription:
+            # 丢弃等待模型期间积压的音频
+            self._subscription.clear()
+
         error_count = 0
         MAX_ERRORS = 5
 
         while self.is_running_flag:
             try:
+                subscription = self._subscription
+                if subscription is None:
+                    time.sleep(0.5)
+                    continue
+
                 if self.paused:
-                    await asyncio.sleep(0.1)
+                    # 暂停期间丢弃音频，不做识别
+                    subscription.clear()
+                    if self._speech_gate:
+                        self._speech_gate.reset()
+                    time.sleep(0.1)
                     continue
 
-                if not self.audio_codec:
-                    await asyncio.sleep(0.5)
+                if not subscription.wait(0.5):
                     continue
 
-                # 从音频编解码器获取数据并处理
-                await self._process_audio()
+                # 取出所有待读帧，合并为一块PCM数据送入识别器
+                while self.is_running_flag and not self.paused:
+                    frames = subscription.drain(self.MAX_BATCH_FRAMES)
+                    if not frames:
+                        break
+                    self._process_batch(frames)
 
-                # 短暂延迟避免过度占用CPU
-                await asyncio.sleep(0.02)
                 error_count = 0
 
-            except asyncio.CancelledError:
-                break
             except Exception as e:
                 error_count += 1
                 logger.error(f"唤醒词检测循环错误({error_count}/{MAX_ERRORS}): {e}")
-                if self.on_error:
-                    try:
-                        if asyncio.iscoroutinefunction(self.on_error):
-                            await self.on_error(e)
-                        else:
-                            self.on_error(e)
-                    except Exception as callback_error:
-                        logger.error(f"执行错误回调时失败: {callback_error}")
+                self._post_to_loop(self._report_error(e))
 
                 if error_count >= MAX_ERRORS:
                     logger.critical("达到最大错误次数，停止检测")
                     break
 
-                await asyncio.sleep(1)  # 错误后延迟重试
+                time.sleep(1)  # 错误后延迟重试
 
-    async def _process_audio(self):
+    def _process_batch(self, frames):
         """
-        处理音频数据 - 使用旧版本的完整处理逻辑.
+        识别一批总线帧（经语音门控过滤），并记录检测相对采集的滞后.
         """
-        try:
-            # 使用AudioCodec的公开接口获取音频数据
-            if not self.audio_codec:
-                return
+        captured_at = frames[-1][1]
+        # 一次取出的帧数反映识别线程的积压，须在门控过滤之前记录
+        drained = len(frames)
 
-            # 获取原始音频数据用于唤醒词检测
-            data = await self.audio_codec.get_raw_audio_for_detection()
-            if not data:
-                return
+        closed = False
+        if self._speech_gate:
+            frames, closed = self._speech_gate.process(frames)
 
-            # 处理音频数据
-            await self._process_audio_data(data)
+        if frames:
+            # 帧视图只读且连续，直接拼接为bytes，只复制一次
+            data = b"".join(frame for frame, _ in frames)
+            self._process_audio_data(data, len(frames), captured_at)
+        if closed:
+            self._finish_utterance(captured_at)
 
-        except Exception as e:
-            logger.debug(f"音频处理错误: {e}")
+        lag = max(0.0, time.monotonic() - captured_at)
+        self._latency.record("wakeword", lag)
+        self.batches_processed += 1
+        self.max_batch_frames = max(self.max_batch_frames, drained)
+        self.detection_lag_last = lag
+        if lag > self.detection_lag_max:
+            self.detection_lag_max = lag
 
-    async def _process_audio_data(self, data):
-        """
-        异步处理音频数据.
+    def _process_audio_data(self, data, frames=1, captured_at=None):
+        """识别一段音频数据（识别线程中调用）.
+
+        Args:
+            data: 16kHz单声道PCM数据
+            frames: 包含的帧数
+            captured_at: 最后一帧的采集时间（time.monotonic），用于冷却判断
         """
+        if captured_at is None:
+            captured_at = time.monotonic()
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
         try:
             # 处理完整识别结果
             if self.recognizer.AcceptWaveform(data):
                 result = json.loads(self.recognizer.Result())
-                if text := result.get("text", "").strip():
+                if text := self._strip_unk(result.get("text", "")):
                     # [新增] 打印 VOSK 识别到的原始内容，方便调试
                     logger.info(f"===> [VOSK 识别原文]: {text}")
                     # 过滤过短的文本以减少误触发
                     if len(text) >= 2:
-                        await self._check_wake_word_text(text)
+                        self._check_wake_word_text(text, captured_at)
 
-            # 处理部分识别结果（降低频率）
-            if hasattr(self, "_partial_check_counter"):
-                self._partial_check_counter += 1
-            else:
+            # 处理部分识别结果（降低频率）：每累计3帧音频才检查一次
+            self._partial_check_counter = (
+                getattr(self, "_partial_check_counter", 0) + frames
+            )
+            if self._partial_check_counter >= 3:
                 self._partial_check_counter = 0
-
-            # 每3次才检查一次部分结果
-            if self._partial_check_counter % 3 == 0:
-                partial = (
-                    json.loads(self.recognizer.PartialResult())
-                    .get("partial", "")
-                    .strip()
+                partial = self._strip_unk(
+                    json.loads(self.recognizer.PartialResult()).get("partial", "")
                 )
                 if partial and len(partial) >= 3:
-                    await self._check_wake_word_text(partial)
+                    self._check_wake_word_text(partial, captured_at)
 
         except json.JSONDecodeError as e:
             logger.warning(f"JSON解析错误: {e}")
         except Exception as e:
             logger.error(f"音频数据处理错误: {e}")
+        finally:
+            self.recognize_cpu_total += time.thread_time() - cpu_start
+            elapsed = time.perf_counter() - start
+            self.frames_processed += frames
+            self.samples_processed += len(data) // 2
+            self.recognize_time_total += elapsed
+            if elapsed > self.recognize_time_max:
+                self.recognize_time_max = elapsed
 
-    async def _check_wake_word_text(self, text):
+    def _finish_utterance(self, captured_at):
         """
-        检查文本中的唤醒词.
+        语音门控关闭时取出识别器中尚未输出的最终结果.
+        """
+        try:
+            result = json.loads(self.recognizer.FinalResult())
+            text = self._strip_unk(result.get("text", ""))
+            if len(text) >= 2:
+                self._check_wake_word_text(text, captured_at)
+        except Exception as e:
+            logger.error(f"获取最终识别结果失败: {e}")
+
+    @staticmethod
+    def _strip_unk(text: str) -> str:
+        """
+        去掉语法模式下的垃圾词.
+        """
+        if UNK_TOKEN in text:
+            text = " ".join(token for token in text.split() if token != UNK_TOKEN)
+        return text.strip()
+
+    def _check_wake_word_text(self, text, captured_at):
+        """检查文本中的唤醒词（识别线程中调用）.
+
+        Args:
+            text: 识别文本
+            captured_at: 对应音频的采集时间（time.monotonic）
         """
         if not text or not text.strip():
             return
 
         # 防重复触发检查
-        current_time = time.time()
-        if current_time - self.last_detection_time < self.detection_cooldown:
+        if captured_at - self.last_detection_time < self.detection_cooldown:
             return
 
         # 避免重复处理相同文本
@@ -429,28 +514,35 @@ class WakeWordDetector:
         best_similarity = 0.0
         best_match_info = None
 
-        # 检查每个唤醒词模式
-        for wake_word, pattern in self.wake_word_patterns.items():
-            similarity, match_type = self._calculate_similarity(text_variants, pattern)
-
+        # 一次匹配所有唤醒词，只返回命中的唤醒词
+        for wake_word, match in self._phrase_index.match(
+            text_variants, self.similarity_threshold
+        ).items():
+            similarity = match.similarity
             if similarity > best_similarity and similarity >= self.similarity_threshold:
                 best_similarity = similarity
                 best_match = wake_word
-                best_match_info = match_type
+                best_match_info = match.match_type
 
         # 触发检测
         if best_match:
-            self.last_detection_time = current_time
+            self.last_detection_time = captured_at
             logger.info(
                 f"检测到唤醒词 '{best_match}' "
                 f"(相似度: {best_similarity:.3f}, 匹配类型: {best_match_info})"
             )
 
-            await self._trigger_callbacks(best_match, text)
+            self._emit_detection(best_match, text, captured_at)
             self.recognizer.Reset()
             # 清空缓存避免重复触发
             self._recent_texts.clear()
 
+    def _emit_detection(self, wake_word, text, captured_at):
+        """
+        把检测结果投递到事件循环执行回调（识别线程中调用）.
+        """
+        self._post_to_loop(self._trigger_callbacks(wake_word, text))
+
     async def _trigger_callbacks(self, wake_word, text):
         """
         触发回调函数.
@@ -464,7 +556,32 @@ class WakeWordDetector:
             except Exception as e:
                 logger.error(f"唤醒词回调执行失败: {e}")
 
+    async def _report_error(self, error):
+        """
+        在事件循环中执行错误回调.
+        """
+        if self.on_error:
+            try:
+                if asyncio.iscoroutinefunction(self.on_error):
+                    await self.on_error(error)
+                else:
+                    self.on_error(error)
+            except Exception as callback_error:
+                logger.error(f"执行错误回调时失败: {callback_error}")
 
+    def _post_to_loop(self, coro):
+        """
+        从识别线程把协程投递到事件循环执行.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+        except RuntimeError:
+            # 事件循环已关闭
+            coro.close()
 
     async def stop(self):
         """
@@ -472,12 +589,15 @@ class WakeWordDetector:
         """
         self.is_running_flag = False
 
-        if self.detection_task:
-            self.detection_task.cancel()
-            try:
-                await self.detection_task
-            except asyncio.CancelledError:
-                pass
+        if self._subscription:
+            self._subscription.wake()
+        if self._thread and self._thread.is_alive():
+            await asyncio.to_thread(self._thread.join, 2.0)
+        self._thread = None
+
+        if self._subscription and self.audio_codec:
+            self.audio_codec.capture_bus.unsubscribe(self._subscription)
+            self._subscription = None
 
         logger.info("唤醒词检测器已停止")
 
@@ -491,6 +611,9 @@ class WakeWordDetector:
         """
         恢复检测.
         """
+        # 丢弃暂停期间积压的音频，只检测恢复之后的声音
+        if self._subscription:
+            self._subscription.clear()
         self.paused = False
 
     def is_running(self) -> bool:
@@ -542,8 +665,25 @@ class WakeWordDetector:
         获取性能统计信息.
         """
         cache_info = self._get_text_pinyin_variants.cache_info()
+        frames = max(self.frames_processed, 1)
+        audio_seconds = max(self.samples_processed / self.sample_rate, 1e-6)
         return {
             "enabled": self.enabled,
+            "recognizer_mode": self.recognizer_mode,
+            "frames_processed": self.frames_processed,
+            "audio_seconds": round(self.samples_processed / self.sample_rate, 2),
+            # 每秒音频消耗的识别CPU时间（秒），用于对比不同识别模式
+            "cpu_per_audio_second": round(self.recognize_cpu_total / audio_seconds, 4),
+            "recognize_avg_ms": round(self.recognize_time_total * 1000 / frames, 3),
+            "recognize_max_ms": round(self.recognize_time_max * 1000, 3),
+            "batches_processed": self.batches_processed,
+            "max_batch_frames": self.max_batch_frames,
+            "pending_frames": self._subscription.pending if self._subscription else 0,
+            "detection_lag_ms": round(self.detection_lag_last * 1000, 1),
+            "detection_lag_max_ms": round(self.detection_lag_max * 1000, 1),
+            "speech_gate": (
+                self._speech_gate.get_stats() if self._speech_gate else None
+            ),
             "wake_words_count": len(self.wake_words),
             "similarity_threshold": self.similarity_threshold,
             "max_edit_distance": self.max_edit_distance,
@@ -16,13 +16,14 @@
 
 import ctypes
 import os
+import platform
 import threading
 from ctypes import POINTER, Structure, byref, c_bool, c_float, c_int, c_short, c_void_p
 
 import numpy as np
 
 from src.utils.logging_config import get_logger
-from src.utils.path_resolver import find_resource
+from src.utils.resource_finder import find_file
 
 logger = get_logger(__name__)
 
@@ -30,28 +31,45 @@ logger = get_logger(__name__)
 # 获取DLL文件的绝对路径
 def get_webrtc_dll_path():
     """
-    获取WebRTC APM库的路径.
+    获取当前平台的WebRTC APM库路径.
     """
-    dll_path = find_resource("libs/webrtc_apm/win/x86_64/libwebrtc_apm.dll")
+    system = platform.system().lower()
+    machine = platform.machine().lower()
+    arch = "arm64" if ("arm" in machine or "aarch64" in machine) else "x64"
+    if system.startswith("win"):
+        relative = os.path.join("win", "x86_64", "libwebrtc_apm.dll")
+    elif system == "darwin":
+        relative = os.path.join("mac", arch, "libwebrtc_apm.dylib")
+    else:
+        relative = os.path.join("linux", arch, "libwebrtc_apm.so")
+
+    dll_path = find_file(os.path.join("libs", "webrtc_apm", relative))
     if dll_path:
         return str(dll_path)
 
-    # 备用方案：使用原有逻辑
+    # 备用方案：相对本文件查找
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(os.path.dirname(current_dir))
-    fallback_path = os.path.join(
-        project_root, "libs", "webrtc_apm", "win", "x86_64", "libwebrtc_apm.dll"
-    )
+    fallback_path = os.path.join(project_root, "libs", "webrtc_apm", relative)
     logger.warning(f"未找到WebRTC库，使用备用路径: {fallback_path}")
     return fallback_path
 
 
 # 加载WebRTC APM库
+# 随附的库只覆盖Windows x86_64、macOS x64/arm64和Linux x86_64（需glibc 2.38及以上），
+# 其他平台加载失败时回声消除不可用，原因记录在apm_load_error中
+apm_load_error = None
 try:
     dll_path = get_webrtc_dll_path()
+    if not os.path.exists(dll_path):
+        raise OSError(
+            f"当前平台（{platform.system()} {platform.machine()}）没有随附的库文件: "
+            f"{dll_path}"
+        )
     apm_lib = ctypes.CDLL(dll_path)
     logger.info(f"成功加载WebRTC APM库: {dll_path}")
 except Exception as e:
+    apm_load_error = str(e)
     logger.error(f"加载WebRTC APM库失败: {e}")
     apm_lib = None
 
@@ -338,17 +356,34 @@ class WebRTCProcessor:
     WebRTC音频处理器，提供实时回声消除和音频增强功能.
     """
 
-    def __init__(self, sample_rate=16000, channels=1, frame_size=160):
+    def __init__(
+        self,
+        sample_rate=16000,
+        channels=1,
+        frame_size=160,
+        stream_delay_ms=50,
+        noise_suppression=True,
+        gain_control=True,
+        max_frames=6,
+    ):
         """初始化WebRTC处理器.
 
         Args:
             sample_rate: 采样率，默认16000Hz
             channels: 声道数，默认1（单声道）
             frame_size: 帧大小，默认160样本（10ms @ 16kHz）
+            stream_delay_ms: 播放到录音的回声路径延迟（毫秒）
+            noise_suppression: 是否启用噪声抑制
+            gain_control: 是否启用自动增益
+            max_frames: 单次调用最多处理的子帧数，默认6（60ms）
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.frame_size = frame_size
+        self.stream_delay_ms = int(stream_delay_ms)
+        self.noise_suppression = noise_suppression
+        self.gain_control = gain_control
+        self.max_frames = max(1, int(max_frames))
 
         # WebRTC APM实例
         self.apm = None
@@ -361,8 +396,23 @@ class WebRTCProcessor:
         # 初始化状态
         self._initialized = False
 
-        # 参考信号缓冲区（用于回声消除）
-        self._reference_buffer = []
+        # 预分配的输入输出缓冲区及每个子帧的ctypes指针，处理时不再分配内存
+        capacity = self.max_frames * frame_size
+        self._capture_in = np.zeros(capacity, dtype=np.int16)
+        self._capture_out = np.zeros(capacity, dtype=np.int16)
+        self._render_in = np.zeros(capacity, dtype=np.int16)
+        self._render_out = np.zeros(capacity, dtype=np.int16)
+        self._capture_in_ptrs = self._subframe_pointers(self._capture_in)
+        self._capture_out_ptrs = self._subframe_pointers(self._capture_out)
+        self._render_in_ptrs = self._subframe_pointers(self._render_in)
+        self._render_out_ptrs = self._subframe_pointers(self._render_out)
+
+        # 参考信号环（约1秒，写满时覆盖最旧的数据）
+        self._reference_ring = np.zeros(
+            (max(1, sample_rate // frame_size), frame_size), dtype=np.int16
+        )
+        self._reference_write = 0
+        self._reference_read = 0
         self._reference_lock = threading.Lock()
 
         # 初始化WebRTC APM
@@ -394,12 +444,14 @@ class WebRTCProcessor:
 
                 # 应用配置
                 self.config = create_optimized_apm_config()
+                self.config.NoiseSuppress.Enabled = bool(self.noise_suppression)
+                self.config.GainControl1.Enabled = bool(self.gain_control)
                 result = apm_lib.WebRTC_APM_ApplyConfig(self.apm, byref(self.config))
                 if result != 0:
                     logger.warning(f"应用WebRTC配置失败，错误码: {result}")
 
                 # 设置延迟
-                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, 50)
+                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, self.stream_delay_ms)
 
                 self._initialized = True
                 logger.info("WebRTC处理器初始化成功")
@@ -409,12 +461,114 @@ class WebRTCProcessor:
             logger.error(f"初始化WebRTC处理器失败: {e}")
             return False
 
+    def _subframe_pointers(self, buffer: np.ndarray):
+        """
+        预先生成缓冲区中每个子帧起始位置的ctypes指针.
+        """
+        base = buffer.ctypes.data
+        step = self.frame_size * buffer.itemsize
+        return [
+            ctypes.cast(base + i * step, POINTER(c_short))
+            for i in range(self.max_frames)
+        ]
+
+    def apply_config(self) -> bool:
+        """
+        重新应用self.config（修改配置字段后调用）.
+        """
+        if not self._initialized:
+            return False
+        with self._lock:
+            result = apm_lib.WebRTC_APM_ApplyConfig(self.apm, byref(self.config))
+        if result != 0:
+            logger.warning(f"应用WebRTC配置失败，错误码: {result}")
+            return False
+        return True
+
+    def set_stream_delay(self, delay_ms: int):
+        """
+        更新回声路径延迟（毫秒）.
+        """
+        delay_ms = max(0, int(delay_ms))
+        with self._lock:
+            self.stream_delay_ms = delay_ms
+            if self._initialized:
+                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, delay_ms)
+
+    @property
+    def initialized(self) -> bool:
+        """
+        APM是否初始化成功.
+        """
+        return self._initialized
+
+    def process_capture(self, samples: np.ndarray, out: np.ndarray = None):
+        """批量处理录音（麦克风输入），内部逐个10ms子帧调用APM.
+
+        Args:
+            samples: 一维int16样本，长度为frame_size的整数倍，最多max_frames个子帧
+            out: 可选的输出数组，长度与samples相同
+
+        Returns:
+            np.ndarray: 处理后的样本（未提供out时为内部缓冲区视图，下次调用前有效），
+            未初始化或长度不合法时返回samples
+        """
+        count = len(samples)
+        frames = count // self.frame_size
+        if (
+            not self._initialized
+            or frames == 0
+            or frames > self.max_frames
+            or count % self.frame_size
+        ):
+            return samples
+
+        with self._lock:
+            np.copyto(self._capture_in[:count], samples, casting="unsafe")
+            process = apm_lib.WebRTC_APM_ProcessStream
+            apm, config = self.apm, self.stream_config
+            in_ptrs, out_ptrs = self._capture_in_ptrs, self._capture_out_ptrs
+            for i in range(frames):
+                process(apm, in_ptrs[i], config, config, out_ptrs[i])
+
+            result = self._capture_out[:count]
+            if out is None:
+                return result
+            np.copyto(out, result)
+            return out
+
+    def process_render(self, samples: np.ndarray):
+        """批量处理参考信号（实际播放的音频），应在对应的录音之前调用.
+
+        Args:
+            samples: 一维int16样本，长度为frame_size的整数倍，超过max_frames时分批处理
+        """
+        if not self._initialized:
+            return
+        frames = len(samples) // self.frame_size
+        with self._lock:
+            process = apm_lib.WebRTC_APM_ProcessReverseStream
+            apm, config = self.apm, self.stream_config
+            in_ptrs, out_ptrs = self._render_in_ptrs, self._render_out_ptrs
+            for first in range(0, frames, self.max_frames):
+                batch = min(self.max_frames, frames - first)
+                start = first * self.frame_size
+                stop = start + batch * self.frame_size
+                np.copyto(
+                    self._render_in[: stop - start],
+                    samples[start:stop],
+                    casting="unsafe",
+                )
+                for i in range(batch):
+                    process(apm, in_ptrs[i], config, config, out_ptrs[i])
+
     def process_capture_stream(self, input_data, reference_data=None):
         """处理捕获流（麦克风输入）
 
         Args:
             input_data: 输入音频数据（bytes）
-            reference_data: 参考音频数据（bytes，可选）
+            reference_data: 参考音频数据（bytes或int16数组，可选，
+                如get_reference_data的返回值）
 
         Returns:
             处理后的音频数据（bytes），失败返回原始数据
@@ -424,113 +578,88 @@ class WebRTCProcessor:
             return input_data
 
         try:
-            with self._lock:
-                # 转换输入数据为numpy数组
-                input_array = np.frombuffer(input_data, dtype=np.int16)
-
-                # 检查数据长度
-                if len(input_array) != self.frame_size:
-                    logger.warning(
-                        f"输入数据长度不匹配，期望{self.frame_size}，实际{len(input_array)}"
-                    )
-                    return input_data
-
-                # 创建输入指针
-                input_ptr = input_array.ctypes.data_as(POINTER(c_short))
-
-                # 创建输出缓冲区
-                output_array = np.zeros(self.frame_size, dtype=np.int16)
-                output_ptr = output_array.ctypes.data_as(POINTER(c_short))
-
-                # 处理参考信号（如果提供）
-                if reference_data:
-                    self._process_reference_stream(reference_data)
-
-                # 处理捕获流
-                result = apm_lib.WebRTC_APM_ProcessStream(
-                    self.apm,
-                    input_ptr,
-                    self.stream_config,
-                    self.stream_config,
-                    output_ptr,
+            input_array = np.frombuffer(input_data, dtype=np.int16)
+            if len(input_array) % self.frame_size:
+                logger.warning(
+                    f"输入数据长度不匹配，期望{self.frame_size}的整数倍，"
+                    f"实际{len(input_array)}"
                 )
+                return input_data
 
-                if result != 0:
-                    logger.debug(f"WebRTC处理警告，错误码: {result}")
-                    # 即使有警告，也返回处理后的数据
+            # 处理参考信号（如果提供）；get_reference_data返回数组，不能直接做真值判断
+            if reference_data is not None and len(reference_data):
+                self._process_reference_stream(reference_data)
 
-                return output_array.tobytes()
+            return self.process_capture(input_array).tobytes()
 
         except Exception as e:
             logger.error(f"处理捕获流失败: {e}")
             return input_data
 
+    def process_render_stream(self, reference_data):
+        """处理参考音频（实际播放的音频），应在对应的录音之前调用.
+
+        Args:
+            reference_data: 参考音频数据（bytes或int16数组）
+        """
+        self._process_reference_stream(reference_data)
+
     def _process_reference_stream(self, reference_data):
-        """处理参考流（扬声器输出）
+        """处理参考流（扬声器输出），长度不是子帧整数倍时末尾补零.
 
         Args:
-            reference_data: 参考音频数据（bytes）
+            reference_data: 参考音频数据（bytes或int16数组）
         """
         try:
-            # 转换参考数据为numpy数组
-            ref_array = np.frombuffer(reference_data, dtype=np.int16)
-
-            # 检查数据长度
-            if len(ref_array) != self.frame_size:
-                # 如果长度不匹配，调整到正确长度
-                if len(ref_array) > self.frame_size:
-                    ref_array = ref_array[: self.frame_size]
-                else:
-                    # 补零
-                    padded = np.zeros(self.frame_size, dtype=np.int16)
-                    padded[: len(ref_array)] = ref_array
-                    ref_array = padded
-
-            # 创建参考信号指针
-            ref_ptr = ref_array.ctypes.data_as(POINTER(c_short))
-
-            # 创建参考输出缓冲区（虽然不使用但必须提供）
-            ref_output_array = np.zeros(self.frame_size, dtype=np.int16)
-            ref_output_ptr = ref_output_array.ctypes.data_as(POINTER(c_short))
-
-            # 处理参考流
-            result = apm_lib.WebRTC_APM_ProcessReverseStream(
-                self.apm,
-                ref_ptr,
-                self.stream_config,
-                self.stream_config,
-                ref_output_ptr,
-            )
-
-            if result != 0:
-                logger.debug(f"处理参考流警告，错误码: {result}")
+            ref_array = reference_data
+            if not isinstance(ref_array, np.ndarray):
+                ref_array = np.frombuffer(ref_array, dtype=np.int16)
+            remainder = len(ref_array) % self.frame_size
+            if remainder:
+                whole = len(ref_array) - remainder
+                self.process_render(ref_array[:whole])
+                # 不足一个子帧的部分借用输出缓冲区补零
+                tail = self._render_out[: self.frame_size]
+                tail[:remainder] = ref_array[whole:]
+                tail[remainder:] = 0
+                ref_array = tail
+            self.process_render(ref_array)
 
         except Exception as e:
             logger.error(f"处理参考流失败: {e}")
 
     def add_reference_data(self, reference_data):
-        """添加参考数据到缓冲区.
+        """添加一个子帧的参考数据到环形缓冲区.
 
         Args:
-            reference_data: 参考音频数据（bytes）
+            reference_data: 参考音频数据（bytes或int16数组），长度不足时补零
         """
+        data = reference_data
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(data, dtype=np.int16)
+        data = data[: self.frame_size]
         with self._reference_lock:
-            self._reference_buffer.append(reference_data)
-            # 保持缓冲区大小合理（约1秒的数据）
-            max_buffer_size = self.sample_rate // self.frame_size
-            if len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer = self._reference_buffer[-max_buffer_size:]
+            slots = len(self._reference_ring)
+            row = self._reference_ring[self._reference_write % slots]
+            row[: len(data)] = data
+            row[len(data) :] = 0
+            self._reference_write += 1
+            # 写满时丢弃最旧的一帧
+            if self._reference_write - self._reference_read > slots:
+                self._reference_read = self._reference_write - slots
 
     def get_reference_data(self):
         """获取并移除最旧的参考数据.
 
         Returns:
-            参考音频数据（bytes），如果缓冲区为空返回None
+            参考音频子帧（int16数组视图，下一圈写入前有效），缓冲区为空返回None
         """
         with self._reference_lock:
-            if self._reference_buffer:
-                return self._reference_buffer.pop(0)
-            return None
+            if self._reference_read >= self._reference_write:
+                return None
+            row = self._reference_ring[self._reference_read % len(self._reference_ring)]
+            self._reference_read += 1
+            return row
 
     def close(self):
         """
@@ -543,7 +672,7 @@ class WebRTCProcessor:
             with self._lock:
                 # 清理参考缓冲区
                 with self._reference_lock:
-                    self._reference_buffer.clear()
+                    self._reference_read = self._reference_write
 
                 # 销毁流配置
                 if self.stream_config:
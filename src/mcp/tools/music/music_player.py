@@ -4,12 +4,14 @@
 """
 
 import asyncio
+import os
 import shutil
 import tempfile
 import time
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+import numpy as np
 import pygame
 import requests
 
@@ -115,10 +117,13 @@ class MusicPlayer:
     """
 
     def __init__(self):
-        # 初始化pygame mixer
+        # pygame只用于解码，播放统一走AudioCodec的输出流（与TTS混音并自动压低音量），
+        # 使用dummy驱动避免pygame再单独打开一个音频设备
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.mixer.init(
             frequency=AudioConfig.OUTPUT_SAMPLE_RATE, channels=AudioConfig.CHANNELS
         )
+        self._source = None
 
         # 核心播放状态
         self.current_song = ""
@@ -389,18 +394,17 @@ class MusicPlayer:
 
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_source()
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 解码并播放
+            duration = await self._start_playback(file_path)
 
             # 更新播放状态
             title = metadata.title or "未知标题"
             artist = metadata.artist or "未知艺术家"
             self.current_song = f"{title} - {artist}"
             self.song_id = file_id
-            self.total_duration = metadata.duration or 0
+            self.total_duration = metadata.duration or duration
             self.current_url = str(file_path)  # 本地文件路径
             self.is_playing = True
             self.paused = False
@@ -464,7 +468,7 @@ class MusicPlayer:
         """
         if self.is_playing:
             logger.info(f"歌曲播放完成: {self.current_song}")
-            pygame.mixer.music.stop()
+            self._stop_source()
             self.is_playing = False
             self.paused = False
             self.current_position = self.total_duration
@@ -516,7 +520,8 @@ class MusicPlayer:
 
             elif self.is_playing and self.paused:
                 # 恢复播放
-                pygame.mixer.music.unpause()
+                if self._source is not None:
+                    self._source.resume()
                 self.paused = False
                 self.start_play_time = time.time() - self.current_position
 
@@ -531,7 +536,8 @@ class MusicPlayer:
 
             elif self.is_playing and not self.paused:
                 # 暂停播放
-                pygame.mixer.music.pause()
+                if self._source is not None:
+                    self._source.pause()
                 self.paused = True
                 self.current_position = time.time() - self.start_play_time
 
@@ -560,7 +566,7 @@ class MusicPlayer:
             if not self.is_playing:
                 return {"status": "info", "message": "没有正在播放的歌曲"}
 
-            pygame.mixer.music.stop()
+            self._stop_source()
             current_song = self.current_song
             self.is_playing = False
             self.paused = False
@@ -588,11 +594,9 @@ class MusicPlayer:
             self.current_position = position
             self.start_play_time = time.time() - position
 
-            pygame.mixer.music.rewind()
-            pygame.mixer.music.set_pos(position)
-
-            if self.paused:
-                pygame.mixer.music.pause()
+            # 暂停状态下跳转后仍保持暂停
+            if self._source is not None:
+                self._source.seek(position)
 
             # 更新UI
             pos_str = self._format_time(position)
@@ -736,16 +740,17 @@ class MusicPlayer:
         try:
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_source()
 
             # 检查缓存或下载
             file_path = await self._get_or_download_file(url)
             if not file_path:
                 return False
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 解码并播放
+            duration = await self._start_playback(file_path)
+            if not self.total_duration:
+                self.total_duration = duration
 
             self.current_url = url
             self.is_playing = True
@@ -769,6 +774,42 @@ class MusicPlayer:
             logger.error(f"播放失败: {e}")
             return False
 
+    async def _start_playback(self, file_path: Path) -> float:
+        """解码音频文件并通过AudioCodec的混音器播放.
+
+        Returns:
+            float: 解码得到的音频时长（秒）
+        """
+        audio_codec = getattr(self.app, "audio_codec", None) if self.app else None
+        if audio_codec is None:
+            raise RuntimeError("音频编解码器未初始化，无法播放")
+
+        # 解码耗时较长，放到线程中执行，避免阻塞事件循环
+        samples = await asyncio.to_thread(self._decode_file, file_path)
+
+        if self._source is None:
+            self._source = audio_codec.create_output_source("music", duckable=True)
+        self._source.play(samples)
+        return len(samples) / AudioConfig.OUTPUT_SAMPLE_RATE
+
+    def _stop_source(self):
+        """
+        停止混音器中的音乐音源.
+        """
+        if self._source is not None:
+            self._source.stop()
+
+    @staticmethod
+    def _decode_file(file_path: Path) -> np.ndarray:
+        """
+        将音频文件解码为输出采样率的单声道int16样本.
+        """
+        sound = pygame.mixer.Sound(str(file_path))
+        samples = pygame.sndarray.array(sound)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        return np.ascontiguousarray(samples, dtype=np.int16)
+
     async def _get_or_download_file(self, url: str) -> Optional[Path]:
         """获取或下载文件.
 
@@ -0,0 +1,149 @@
+"""上行音频缓冲.
+
+开始监听时音频通道可能还没打开（冷连接需要数百毫秒握手），
+此前编码出的帧如果直接丢弃，用户开头说的话就丢了。
+请求监听的同时启动缓冲，通道打开并发送开始监听消息后按顺序补发，
+补发完毕再切换为实时发送：
+1. 容量有上限，超出时丢弃最早的帧
+2. 超过最大时长的帧视为过期，不再发送
+3. 统计丢弃帧数，便于评估连接耗时对识别的影响
+"""
+
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OutboundAudioBuffer:
+    """
+    音频通道就绪前的有界上行缓冲.
+    """
+
+    def __init__(self, max_frames: int = 200, max_age_ms: int = 3000):
+        """初始化上行缓冲.
+
+        Args:
+            max_frames: 最多缓存的帧数
+            max_age_ms: 帧的最大缓存时长（毫秒），超时未发送的帧被丢弃
+        """
+        self.max_frames = max(1, int(max_frames))
+        self.max_age = max(0, int(max_age_ms)) / 1000
+        # (编码帧, 入队时间)
+        self._frames = deque()
+        self.active = False
+        self._started_at: Optional[float] = None
+
+        # 统计
+        self.sessions = 0
+        self.sent_frames = 0
+        self.dropped_overflow = 0
+        self.dropped_expired = 0
+        self.discarded_frames = 0
+        self.last_wait_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def start(self, frames: Iterable[Tuple[bytes, float]] = ()):
+        """开始缓冲，之后编码出的帧都应调用push.
+
+        Args:
+            frames: 预先放入的(编码帧, 入队时间)，如唤醒词预录音频
+        """
+        if self.active:
+            return
+        self._frames.clear()
+        self.active = True
+        self._started_at = time.monotonic()
+        self.sessions += 1
+        for frame, queued_at in frames:
+            self._append(frame, queued_at)
+
+    def push(self, frame: bytes):
+        """
+        缓存一帧编码音频.
+        """
+        self._append(frame, time.monotonic())
+
+    async def drain(
+        self, send: Callable[[bytes], Awaitable[None]], release: bool = True
+    ) -> int:
+        """按顺序发送缓存的帧.
+
+        发送期间新push的帧追加到末尾，同样会被发送。
+
+        Args:
+            send: 发送一帧的协程函数
+            release: 发送完毕后是否结束缓冲，恢复实时发送
+
+        Returns:
+            int: 本次发送的帧数
+        """
+        if not self.active:
+            return 0
+        sent = 0
+        while self._frames:
+            self._expire(time.monotonic())
+            if not self._frames:
+                break
+            frame, _ = self._frames.popleft()
+            await send(frame)
+            sent += 1
+        self.sent_frames += sent
+
+        if release:
+            # 缓冲已空且此处没有await，之后的帧直接走实时发送
+            self.active = False
+            self.last_wait_ms = (time.monotonic() - self._started_at) * 1000
+            if sent:
+                logger.debug(
+                    f"音频通道就绪，补发缓冲音频 {sent} 帧"
+                    f"（等待 {self.last_wait_ms:.0f}ms）"
+                )
+        return sent
+
+    def cancel(self):
+        """
+        结束缓冲并丢弃未发送的帧（如连接失败）.
+        """
+        if not self.active:
+            return
+        self.discarded_frames += len(self._frames)
+        self._frames.clear()
+        self.active = False
+
+    def get_stats(self) -> dict:
+        """
+        获取缓冲统计信息.
+        """
+        return {
+            "active": self.active,
+            "buffered_frames": len(self._frames),
+            "sessions": self.sessions,
+            "sent_frames": self.sent_frames,
+            "dropped_overflow": self.dropped_overflow,
+            "dropped_expired": self.dropped_expired,
+            "discarded_frames": self.discarded_frames,
+            "last_wait_ms": round(self.last_wait_ms, 1),
+        }
+
+    def _append(self, frame: bytes, queued_at: float):
+        if len(self._frames) >= self.max_frames:
+            self._frames.popleft()
+            self.dropped_overflow += 1
+        self._frames.append((frame, queued_at))
+
+    def _expire(self, now: float):
+        """
+        丢弃超过最大缓存时长的帧.
+        """
+        if not self.max_age:
+            return
+        deadline = now - self.max_age
+        while self._frames and self._frames[0][1] < deadline:
+            self._frames.popleft()
+            self.dropped_expired += 1
@@ -0,0 +1,196 @@
+"""端到端音频延迟统计.
+
+按阶段记录每一帧音频的耗时（单位秒，基于time.monotonic），
+每个阶段保留最近N个样本的滚动窗口，用于计算p50/p95/p99：
+
+上行: capture(ADC->录音回调) -> encode(回调->编码完成)
+      -> dispatch(编码完成->事件循环) -> send(事件循环->socket写入完成)
+下行: receive(收到数据包->开始解码) -> decode(解码耗时)
+      -> playout(解码完成->DAC输出)，downlink为收到数据包到DAC输出的总延迟
+事件循环: loop_lag(定时器实际唤醒时间比预期晚多少)，反映事件循环被阻塞的程度
+唤醒词: wakeword(采集->识别完成)，反映唤醒词检测落后于录音的程度
+打断: barge_in(用户开始说话->发出打断)，包含判定所需的最短语音时长
+
+record()只做数组赋值，可以在音频回调中调用；每个阶段应只由一个线程写入。
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _StageWindow:
+    """
+    单个阶段的滚动样本窗口（预分配）.
+    """
+
+    def __init__(self, size: int):
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def add(self, value: float):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+
+    def summary(self) -> dict:
+        filled = min(self.count, len(self.samples))
+        if filled == 0:
+            return {"count": 0}
+
+        values = self.samples[:filled] * 1000
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "count": self.count,
+            "mean_ms": round(float(values.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(values.max()), 3),
+        }
+
+
+class LatencyMonitor:
+    """
+    音频链路各阶段延迟的滚动统计（单例）.
+    """
+
+    _instance = None
+
+    # 上行和下行各阶段，按链路顺序排列
+    STAGES = (
+        "capture",
+        "encode",
+        "dispatch",
+        "send",
+        "receive",
+        "decode",
+        "playout",
+        "downlink",
+        "loop_lag",
+        "wakeword",
+        "barge_in",
+    )
+
+    def __init__(self):
+        config = ConfigManager.get_instance()
+        self.enabled = config.get_config("AUDIO_OPTIONS.LATENCY_MONITOR.ENABLED", True)
+        self.window_size = max(
+            10, int(config.get_config("AUDIO_OPTIONS.LATENCY_MONITOR.WINDOW", 1000))
+        )
+        self.loop_lag_interval = (
+            max(
+                10,
+                int(
+                    config.get_config(
+                        "AUDIO_OPTIONS.LATENCY_MONITOR.LOOP_LAG_INTERVAL_MS", 50
+                    )
+                ),
+            )
+            / 1000
+        )
+        self._windows: Dict[str, _StageWindow] = {
+            stage: _StageWindow(self.window_size) for stage in self.STAGES
+        }
+        self._started_at = time.time()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取延迟统计实例.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def record(self, stage: str, seconds: float):
+        """记录一个阶段耗时.
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒），负值会被忽略
+        """
+        if not self.enabled or seconds < 0:
+            return
+        window = self._windows.get(stage)
+        if window is None:
+            window = self._windows[stage] = _StageWindow(self.window_size)
+        window.add(seconds)
+
+    async def watch_event_loop(self):
+        """
+        持续测量事件循环延迟：定时休眠，记录实际唤醒时间超出预期的部分.
+        """
+        if not self.enabled:
+            return
+
+        interval = self.loop_lag_interval
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            self.record("loop_lag", max(0.0, time.monotonic() - expected))
+
+    def get_stats(self) -> dict:
+        """
+        获取各阶段的延迟分位数（毫秒）.
+        """
+        return {
+            stage: window.summary()
+            for stage, window in list(self._windows.items())
+            if window.count
+        }
+
+    def reset(self):
+        """
+        清空所有统计样本.
+        """
+        for window in self._windows.values():
+            window.count = 0
+        self._started_at = time.time()
+
+    def dump_json(self, path: Optional[Path] = None) -> Optional[Path]:
+        """将统计结果写入JSON文件.
+
+        Args:
+            path: 输出路径，默认写入项目logs目录
+
+        Returns:
+            Optional[Path]: 写入的文件路径，未启用或无数据时返回None
+        """
+        stats = self.get_stats()
+        if not self.enabled or not stats:
+            return None
+
+        if path is None:
+            from src.utils.resource_finder import get_project_root
+
+            log_dir = get_project_root() / "logs"
+            log_dir.mkdir(exist_ok=True)
+            path = log_dir / time.strftime("latency_%Y%m%d_%H%M%S.json")
+
+        report = {
+            "started_at": time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(self._started_at)
+            ),
+            "dumped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "window_size": self.window_size,
+            "stages": stats,
+        }
+        try:
+            path = Path(path)
+            path.write_text(
+                json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            logger.info(f"音频延迟统计已写入: {path}")
+            return path
+        except Exception as e:
+            logger.error(f"写入音频延迟统计失败: {e}")
+            return None
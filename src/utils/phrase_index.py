@@ -0,0 +1,323 @@
+"""预编译的短语匹配索引.
+
+用于唤醒词和指令关键词的拼音匹配，构建一次后对每条识别文本只做线性扫描：
+1. Aho-Corasick自动机：一次扫描找出文本中所有精确出现的短语
+2. 模糊匹配先用鸽巢原理过滤：允许k处编辑的短语切成k+1段，
+   至少有一段精确出现在文本中，这些片段同样放入自动机，只有命中片段的短语才进入下一步；
+   切片短于MIN_PIECE时几乎任何文本都会命中，过滤失效，因此减小该短语允许的编辑距离，
+   直到切片足够长（短于2*MIN_PIECE的短语只做精确匹配）；
+   候选再用q-gram计数过滤：编辑k处最多破坏k*q个q-gram，文本中出现的q-gram不足时直接排除
+3. Myers位并行算法计算短语与文本任意子串的最小编辑距离，超过上限立即放弃；
+   相似度为1 - 距离/短语长度，不限制短语长度
+4. 首字母子序列匹配按首字母分桶，只检查首字母出现在文本中的短语
+5. 结果按短语的添加顺序排列，相似度相同时调用方取最先添加的短语
+
+短语数量增加时，每条文本的开销主要取决于文本长度和文本中实际出现（或近似出现）的短语数，
+而不是短语总数。
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class AhoCorasick:
+    """
+    多模式精确匹配自动机.
+    """
+
+    def __init__(self):
+        # 每个状态：子节点表、失败指针、以该状态结尾的模式编号
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: int):
+        """添加模式串.
+
+        Args:
+            pattern: 非空模式串
+            value: 命中时返回的编号
+        """
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append(value)
+        self._built = False
+
+    def build(self):
+        """
+        按广度优先计算失败指针，并合并后缀状态的输出.
+        """
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """扫描文本.
+
+        Yields:
+            Tuple[int, int]: (模式结束位置, 模式编号)
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for value in output[state]:
+                yield index, value
+
+
+def bounded_edit_distance(pattern: str, text: str, max_distance: int) -> Optional[int]:
+    """Myers位并行算法：pattern与text任意子串之间的最小编辑距离.
+
+    Args:
+        pattern: 模式串
+        text: 被搜索的文本
+        max_distance: 距离上限
+
+    Returns:
+        Optional[int]: 最小编辑距离，超过上限时返回None
+    """
+    m = len(pattern)
+    if m == 0:
+        return 0
+    if m - len(text) > max_distance:
+        return None
+
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv = full, 0
+    score = best = m
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # 文本侧起点不计代价（子串匹配），第0行保持为0，移位时不补1
+        ph = (ph << 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+        if score < best:
+            best = score
+            if best == 0:
+                break
+    return best if best <= max_distance else None
+
+
+@dataclass
+class PhraseMatch:
+    """
+    一条匹配结果.
+    """
+
+    key: Hashable
+    similarity: float
+    match_type: str
+    distance: int
+
+
+class PhraseIndex:
+    """
+    按变体类型（如标准拼音、首字母）分组的短语匹配索引.
+    """
+
+    # 模糊匹配切片的最短长度
+    MIN_PIECE = 3
+    # q-gram计数过滤的gram长度
+    QGRAM = 3
+
+    def __init__(self, max_edit_distance: int = 1, subsequence_score: float = 0.0):
+        """初始化索引.
+
+        Args:
+            max_edit_distance: 模糊匹配允许的最大编辑距离（另受短语长度一半的限制）
+            subsequence_score: 首字母短语作为子序列出现时的相似度，0表示不检查
+        """
+        self.max_edit_distance = max(0, int(max_edit_distance))
+        self.subsequence_score = subsequence_score
+        # 变体类型 -> [(短语键, 模式串, 允许的编辑距离)]
+        self._phrases: Dict[str, List[Tuple[Hashable, str, int]]] = {}
+        self._automata: Dict[str, AhoCorasick] = {}
+        # 变体类型 -> 自动机编号 -> (短语序号, 是否为整串)
+        self._entries: Dict[str, List[Tuple[int, bool]]] = {}
+        # 变体类型 -> 每个短语的q-gram列表
+        self._qgrams: Dict[str, List[List[str]]] = {}
+        # 首字母 -> 首字母变体的短语序号
+        self._initials_by_first: Dict[str, List[int]] = {}
+        # 短语键 -> 首次添加的顺序
+        self._key_order: Dict[Hashable, int] = {}
+
+    def add(self, key: Hashable, variant: str, pattern: str):
+        """添加一个短语变体.
+
+        Args:
+            key: 短语标识（如唤醒词原文）
+            variant: 变体类型
+            pattern: 该变体的模式串
+        """
+        if not pattern:
+            return
+        # 切片短于MIN_PIECE时逐步减小允许的编辑距离，而不是直接关闭模糊匹配，
+        # 保证调大max_edit_distance不会让短短语的匹配变差
+        max_distance = min(self.max_edit_distance, len(pattern) // 2)
+        while max_distance and len(pattern) // (max_distance + 1) < self.MIN_PIECE:
+            max_distance -= 1
+        self._key_order.setdefault(key, len(self._key_order))
+        self._phrases.setdefault(variant, []).append((key, pattern, max_distance))
+        self._qgrams.setdefault(variant, []).append(self._grams(pattern))
+        self._automata.pop(variant, None)
+
+    def build(self):
+        """
+        为每种变体构建自动机：整串用于精确匹配，切片用于模糊匹配候选过滤.
+        """
+        for variant, phrases in self._phrases.items():
+            automaton = AhoCorasick()
+            entries: List[Tuple[int, bool]] = []
+            for index, (_, pattern, max_distance) in enumerate(phrases):
+                automaton.add(pattern, len(entries))
+                entries.append((index, True))
+                if max_distance:
+                    for piece in self._split(pattern, max_distance + 1):
+                        automaton.add(piece, len(entries))
+                        entries.append((index, False))
+            automaton.build()
+            self._automata[variant] = automaton
+            self._entries[variant] = entries
+
+        self._initials_by_first = {}
+        for index, (_, pattern, _) in enumerate(self._phrases.get("initials", [])):
+            if len(pattern) >= 2:
+                self._initials_by_first.setdefault(pattern[0], []).append(index)
+
+    def match(
+        self, texts: Dict[str, str], min_similarity: float = 0.0
+    ) -> Dict[Hashable, PhraseMatch]:
+        """匹配一条文本的各个变体.
+
+        Args:
+            texts: 变体类型 -> 文本
+            min_similarity: 调用方的相似度阈值，据此收紧允许的编辑距离，
+                达不到阈值的模糊匹配不再计算
+
+        Returns:
+            Dict[Hashable, PhraseMatch]: 每个命中短语的最佳匹配，按短语添加顺序排列
+        """
+        best: Dict[Hashable, PhraseMatch] = {}
+        for variant, phrases in self._phrases.items():
+            text = texts.get(variant)
+            if not text:
+                continue
+            if variant not in self._automata:
+                self.build()
+
+            exact: Set[int] = set()
+            candidates: Set[int] = set()
+            entries = self._entries[variant]
+            for _, entry in self._automata[variant].iter_matches(text):
+                index, whole = entries[entry]
+                (exact if whole else candidates).add(index)
+
+            for index in exact:
+                key = phrases[index][0]
+                self._keep(best, PhraseMatch(key, 1.0, f"exact_{variant}", 0))
+
+            text_grams = None
+            qgrams = self._qgrams[variant]
+            for index in candidates - exact:
+                key, pattern, max_distance = phrases[index]
+                max_distance = min(
+                    max_distance, int(len(pattern) * (1.0 - min_similarity) + 1e-9)
+                )
+                if not max_distance:
+                    continue
+                grams = qgrams[index]
+                required = len(grams) - max_distance * self.QGRAM
+                if required > 0:
+                    if text_grams is None:
+                        text_grams = set(self._grams(text))
+                    if sum(gram in text_grams for gram in grams) < required:
+                        continue
+                distance = bounded_edit_distance(pattern, text, max_distance)
+                if distance is not None:
+                    similarity = 1.0 - distance / len(pattern)
+                    self._keep(best, PhraseMatch(key, similarity, variant, distance))
+
+            if self.subsequence_score and variant == "initials":
+                for first in set(text):
+                    for index in self._initials_by_first.get(first, ()):
+                        key, pattern, _ = phrases[index]
+                        if index not in exact and self._is_subsequence(pattern, text):
+                            match = PhraseMatch(key, self.subsequence_score, variant, -1)
+                            self._keep(best, match)
+        return {
+            key: best[key]
+            for key in sorted(best, key=self._key_order.__getitem__)
+        }
+
+    def __len__(self) -> int:
+        return sum(len(phrases) for phrases in self._phrases.values())
+
+    @staticmethod
+    def _keep(best: Dict[Hashable, PhraseMatch], match: PhraseMatch):
+        current = best.get(match.key)
+        if current is None or match.similarity > current.similarity:
+            best[match.key] = match
+
+    @classmethod
+    def _grams(cls, text: str) -> List[str]:
+        q = cls.QGRAM
+        return [text[i : i + q] for i in range(len(text) - q + 1)]
+
+    @staticmethod
+    def _split(pattern: str, parts: int) -> List[str]:
+        """
+        把模式串切成parts段（尽量等长）.
+        """
+        size, extra = divmod(len(pattern), parts)
+        pieces, start = [], 0
+        for i in range(parts):
+            end = start + size + (1 if i < extra else 0)
+            pieces.append(pattern[start:end])
+            start = end
+        return [piece for piece in pieces if piece]
+
+    @staticmethod
+    def _is_subsequence(pattern: str, text: str) -> bool:
+        it = iter(text)
+        return all(char in it for char in pattern)